@@ -0,0 +1,345 @@
+"""Benchmark of reading PDFs with `PDFTextReader`.
+
+A fixed set of PDFs is read a number of times, and for each PDF the throughput,
+the number of OCR calls, the peak memory and the time spent in each stage is
+reported. The stages map to the steps of reading a page as follows:
+
+    box_detection: `_find_anonymized_boxes`
+    underline_detection: `_line_anonymization_to_boxes`
+    table_detection: `_find_tables`
+    layout: `_get_text_from_boxes`
+
+OCR is timed as its own stage, and is thus not part of the stages above.
+The results are compared against a baseline saved by an earlier run.
+"""
+
+import copy
+import os
+import platform
+import statistics
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, List
+
+import torch
+from omegaconf import DictConfig
+from PIL import Image
+from pypdf import PdfReader
+from tabulate import tabulate
+
+from ._constants import DPI
+from ._profiling import peak_rss_mb, reset_peak_rss
+from ._text_extraction import PDFTextReader
+from ._utils import read_json, save_dict_to_json
+
+logger = getLogger(__name__)
+
+
+class PDFBenchmark:
+    """Benchmark of reading PDFs with `PDFTextReader`.
+
+    The OCR cache and page checkpoints are disabled, such that every read
+    does the full work.
+
+    Args:
+        config (DictConfig):
+            Config file
+
+    Attributes:
+        config (DictConfig):
+            Config file
+        reader (PDFTextReader):
+            Reader of the PDFs.
+        results_path (Path):
+            Path to the results of the latest run.
+        baseline_path (Path):
+            Path to the baseline results.
+    """
+
+    def __init__(self, config: DictConfig) -> None:
+        """Initializes the PDFBenchmark."""
+        self.config = config
+        self.results_path = Path(config.benchmark.paths.results)
+        self.baseline_path = Path(config.benchmark.paths.baseline)
+
+        reader_config = copy.deepcopy(config)
+        reader_config.process.ocr_cache = False
+        reader_config.process.resume = False
+        self.reader = PDFTextReader(config=reader_config)
+
+    def run(self) -> List[str]:
+        """Runs the benchmark, and compares the results against the baseline.
+
+        If `benchmark.save_baseline` is True, the results are saved
+        as the new baseline instead.
+
+        Returns:
+            regressions (List[str]):
+                Descriptions of the regressions found.
+        """
+        pdf_paths = self._pdf_paths()
+        self.reader.wait_for_tika_server()
+
+        results = {
+            "machine": self._machine(),
+            "pdfs": {
+                name: self._benchmark_pdf(pdf_path=pdf_path)
+                for name, pdf_path in pdf_paths.items()
+            },
+        }
+        self._log_results(results=results)
+        self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        save_dict_to_json(results, self.results_path)
+        logger.info(f"Results saved at {self.results_path}")
+
+        if self.config.benchmark.save_baseline:
+            self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            save_dict_to_json(results, self.baseline_path)
+            logger.info(f"Baseline saved at {self.baseline_path}")
+            return []
+
+        if not self.baseline_path.exists():
+            logger.warning(
+                f"No baseline at {self.baseline_path}. "
+                "Use 'benchmark.save_baseline=True' to save one."
+            )
+            return []
+
+        baseline = read_json(self.baseline_path)
+        if baseline["machine"] != results["machine"]:
+            logger.warning(
+                "The baseline was made on another machine or with other settings: "
+                f"{baseline['machine']}"
+            )
+        regressions = compare_to_baseline(
+            results=results,
+            baseline=baseline,
+            max_regression=self.config.benchmark.max_regression,
+            stage_seconds_min=self.config.benchmark.stage_seconds_min,
+        )
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if not regressions:
+            logger.info("No regressions compared to the baseline.")
+        return regressions
+
+    def _pdf_paths(self) -> Dict[str, Path]:
+        """Get the PDFs to benchmark, and build the synthetic PDFs.
+
+        Returns:
+            dict:
+                Path to each PDF, by name.
+        """
+        pdf_paths = {
+            name: Path(pdf_path)
+            for name, pdf_path in self.config.benchmark.bundled_pdfs.items()
+        }
+        pdf_paths.update(
+            make_synthetic_pdfs(
+                pdf_dir=Path(self.config.benchmark.paths.pdf_dir),
+                page_image_dir=Path(self.config.benchmark.paths.page_image_dir),
+                synthetic_pdfs=self.config.benchmark.synthetic_pdfs,
+            )
+        )
+        return pdf_paths
+
+    def _benchmark_pdf(self, pdf_path: Path) -> dict:
+        """Reads a PDF `benchmark.repeats` times.
+
+        Args:
+            pdf_path (Path):
+                Path to PDF.
+
+        Returns:
+            dict:
+                Results of the PDF. Times are medians of the repeats.
+        """
+        logger.info(f"Benchmarking {pdf_path}")
+        n_pages = len(PdfReader(pdf_path).pages)
+        if self.config.benchmark.warmup:
+            self.reader.extract_text(pdf_path=pdf_path)
+
+        runs = []
+        for _ in range(self.config.benchmark.repeats):
+            self.reader.timer.reset()
+            reset_peak_rss()
+            start = time.perf_counter()
+            self.reader.extract_text(pdf_path=pdf_path)
+            runs.append(
+                {
+                    "seconds": time.perf_counter() - start,
+                    # Peak RSS of this process, i.e. without page workers.
+                    "peak_rss_mb": peak_rss_mb(),
+                    "stages": self.reader.timer.summary(),
+                }
+            )
+
+        seconds = statistics.median(run["seconds"] for run in runs)
+        # The OCR calls are the same in every run.
+        ocr = runs[0]["stages"].get("ocr", {})
+        stage_names = {name for run in runs for name in run["stages"]}
+        return {
+            "pages": n_pages,
+            "seconds": round(seconds, 3),
+            "pages_per_second": round(n_pages / seconds, 3),
+            "ocr_calls_per_page": round(ocr.get("calls", 0) / n_pages, 2),
+            "ocr_crops_per_page": round(ocr.get("crops", 0) / n_pages, 2),
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+            "stage_seconds_per_page": {
+                name: round(
+                    statistics.median(
+                        run["stages"].get(name, {}).get("seconds", 0.0) for run in runs
+                    )
+                    / n_pages,
+                    4,
+                )
+                for name in sorted(stage_names)
+            },
+        }
+
+    def _machine(self) -> Dict[str, object]:
+        """Get the machine and the settings the benchmark is run with.
+
+        Returns:
+            dict:
+                Machine and settings.
+        """
+        return {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "hardware_used": "gpu" if torch.cuda.is_available() else "cpu",
+            "page_workers": self.config.process.page_workers,
+            "ocr_batch_size": self.config.process.ocr_batch_size,
+            "ocr_recognition_only": self.config.process.ocr_recognition_only,
+            "skip_clean_pages": self.config.process.skip_clean_pages,
+        }
+
+    @staticmethod
+    def _log_results(results: dict) -> None:
+        """Logs the results as a table.
+
+        Args:
+            results (dict):
+                Results of the benchmark.
+        """
+        stage_names = sorted(
+            {
+                name
+                for result in results["pdfs"].values()
+                for name in result["stage_seconds_per_page"]
+            }
+        )
+        rows = [
+            [
+                name,
+                result["pages"],
+                result["pages_per_second"],
+                result["ocr_calls_per_page"],
+                result["peak_rss_mb"],
+            ]
+            + [
+                result["stage_seconds_per_page"].get(stage, 0.0)
+                for stage in stage_names
+            ]
+            for name, result in results["pdfs"].items()
+        ]
+        headers = ["pdf", "pages", "pages/s", "ocr calls/page", "peak rss (mb)"]
+        headers += [f"{stage} (s/page)" for stage in stage_names]
+        logger.info("\n" + tabulate(rows, headers=headers))
+
+
+def make_synthetic_pdfs(
+    pdf_dir: Path, page_image_dir: Path, synthetic_pdfs: Dict[str, List[str]]
+) -> Dict[str, Path]:
+    """Builds PDFs from page images.
+
+    The pages are stored as images at the DPI the PDFs are rasterized at, such
+    that reading a synthetic PDF gives the same image as the page image.
+
+    Args:
+        pdf_dir (Path):
+            Directory to write the PDFs to.
+        page_image_dir (Path):
+            Directory with the page images.
+        synthetic_pdfs (dict):
+            File names of the page images of each PDF, by name.
+
+    Returns:
+        dict:
+            Path to each PDF, by name.
+    """
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    pdf_paths = {}
+    for name, image_names in synthetic_pdfs.items():
+        images = [
+            Image.open(page_image_dir / image_name).convert("L")
+            for image_name in image_names
+        ]
+        pdf_path = pdf_dir / f"{name}.pdf"
+        images[0].save(
+            pdf_path, save_all=True, append_images=images[1:], resolution=DPI
+        )
+        pdf_paths[name] = pdf_path
+    return pdf_paths
+
+
+def compare_to_baseline(
+    results: dict,
+    baseline: dict,
+    max_regression: float,
+    stage_seconds_min: float = 0.0,
+) -> List[str]:
+    """Compares the results of the benchmark against a baseline.
+
+    Only the PDFs in both the results and the baseline are compared.
+
+    Args:
+        results (dict):
+            Results of the benchmark.
+        baseline (dict):
+            Baseline results.
+        max_regression (float):
+            A PDF has regressed if it is read more than this fraction slower, or
+            uses more than this fraction more memory, than in the baseline.
+        stage_seconds_min (float, optional):
+            Stages that are slower by less than this number of seconds per page
+            are ignored.
+
+    Returns:
+        regressions (List[str]):
+            Descriptions of the regressions found.
+    """
+    regressions = []
+    for name, result in results["pdfs"].items():
+        base = baseline["pdfs"].get(name)
+        if base is None:
+            continue
+
+        if result["pages_per_second"] < base["pages_per_second"] * (1 - max_regression):
+            regressions.append(
+                f"{name}: {result['pages_per_second']} pages/s "
+                f"(baseline {base['pages_per_second']})"
+            )
+        if result["ocr_calls_per_page"] > base["ocr_calls_per_page"]:
+            regressions.append(
+                f"{name}: {result['ocr_calls_per_page']} OCR calls per page "
+                f"(baseline {base['ocr_calls_per_page']})"
+            )
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * (1 + max_regression):
+            regressions.append(
+                f"{name}: {result['peak_rss_mb']} MB peak RSS "
+                f"(baseline {base['peak_rss_mb']})"
+            )
+        for stage, seconds in result["stage_seconds_per_page"].items():
+            base_seconds = base["stage_seconds_per_page"].get(stage, 0.0)
+            if (
+                seconds > base_seconds * (1 + max_regression)
+                and seconds - base_seconds > stage_seconds_min
+            ):
+                regressions.append(
+                    f"{name}: {stage} takes {seconds} s/page "
+                    f"(baseline {base_seconds})"
+                )
+    return regressions
@@ -0,0 +1,618 @@
+"""Index of the status of each case, used instead of probing case directories."""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+from omegaconf import DictConfig
+
+from ._constants import N_FILES_RAW_CASE_DIR
+from ._processed_store import ProcessedStore
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _locked(method: Callable[..., T]) -> Callable[..., T]:
+    """Makes a method of CaseIndex hold the lock of the index while it runs.
+
+    Args:
+        method (Callable):
+            Method of CaseIndex.
+
+    Returns:
+        Callable:
+            Method holding the lock.
+    """
+
+    @functools.wraps(method)
+    def locked_method(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return locked_method
+
+
+class CaseIndex:
+    """SQLite index of the status of each case.
+
+    For each case, the index records when it was scraped, processed and
+    finalized, together with the sizes of its files and the hashes of its PDF
+    and tabular data.
+    Thus, the Scraper, the Processor and the DatasetBuilder can look up the
+    status of a case with a single query, instead of listing its directory.
+
+    The index also records the case IDs found not to exist, such that the
+    Scraper does not have to load their pages again.
+
+    Every update is done in its own transaction. The index can be shared by
+    multiple threads, e.g. the browser sessions of the Scraper, as every method
+    holds a lock while it uses the database.
+
+    Args:
+        path (Path or None):
+            Path to the SQLite database. If None, the index is kept in memory.
+
+    Attributes:
+        path (Path or None):
+            Path to the SQLite database.
+        created (bool):
+            True if the database did not exist before, and is thus empty.
+    """
+
+    def __init__(self, path: Optional[Path]) -> None:
+        """Initializes the CaseIndex."""
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.RLock()
+        if self.path is None:
+            self.created = True
+            self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+        else:
+            self.created = not self.path.exists()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # The index might be read by multiple worker processes.
+            self._connection = sqlite3.connect(
+                self.path, timeout=60, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cases ("
+            "case_id INTEGER PRIMARY KEY, "
+            "scraped_ns INTEGER, "
+            "pdf_size INTEGER, "
+            "pdf_sha256 TEXT, "
+            "tabular_data_size INTEGER, "
+            "processed_ns INTEGER, "
+            "processed_size INTEGER, "
+            "finalized_ns INTEGER)"
+        )
+        # Added after the first version of the index.
+        columns = [
+            row[1] for row in self._connection.execute("PRAGMA table_info(cases)")
+        ]
+        if "tabular_data_sha256" not in columns:
+            self._connection.execute(
+                "ALTER TABLE cases ADD COLUMN tabular_data_sha256 TEXT"
+            )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS missing_cases ("
+            "case_id INTEGER PRIMARY KEY, "
+            "checked_ns INTEGER, "
+            "last_scraped_case_id INTEGER)"
+        )
+        self._connection.commit()
+
+    @_locked
+    def is_scraped(self, case_id: str) -> bool:
+        """Checks if a case has been scraped.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if case has been scraped. False otherwise.
+        """
+        return self._is_set(column="scraped_ns", case_id=case_id)
+
+    @_locked
+    def is_processed(self, case_id: str) -> bool:
+        """Checks if a case has been processed.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if case has been processed. False otherwise.
+        """
+        return self._is_set(column="processed_ns", case_id=case_id)
+
+    @_locked
+    def is_finalized(self, case_id: str) -> bool:
+        """Checks if a case is in the final dataset.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if case is in the final dataset. False otherwise.
+        """
+        return self._is_set(column="finalized_ns", case_id=case_id)
+
+    @_locked
+    def is_missing(self, case_id: str) -> bool:
+        """Checks if a case ID is known not to exist.
+
+        A case ID is only known not to exist, if it was below the highest
+        scraped case ID when it was found not to exist. Case IDs above it
+        might just not have been given to a case yet.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if no case had the ID when it was last checked, and the ID
+                was below the highest scraped case ID then. False otherwise.
+        """
+        row = self._connection.execute(
+            "SELECT 1 FROM missing_cases "
+            "WHERE case_id = ? AND case_id < last_scraped_case_id",
+            (int(case_id),),
+        ).fetchone()
+        return row is not None
+
+    @_locked
+    def get_tabular_data_sha256(self, case_id: str) -> Optional[str]:
+        """Get the hash of the tabular data of a case, as it was last scraped.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            str or None:
+                Hash, see `hash_tabular_data`. None if the case has not been
+                scraped, or was recorded from the data on disk.
+        """
+        row = self._connection.execute(
+            "SELECT tabular_data_sha256 FROM cases WHERE case_id = ?", (int(case_id),)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    @_locked
+    def last_scraped_case_id(self) -> Optional[int]:
+        """Get the highest ID of a scraped case.
+
+        Returns:
+            int or None:
+                Highest case ID, None if no case has been scraped.
+        """
+        (case_id,) = self._connection.execute(
+            "SELECT MAX(case_id) FROM cases WHERE scraped_ns IS NOT NULL"
+        ).fetchone()
+        return case_id
+
+    @_locked
+    def scraped_case_ids(self) -> List[str]:
+        """Get the IDs of all scraped cases.
+
+        Returns:
+            List[str]:
+                Case IDs in ascending order.
+        """
+        rows = self._connection.execute(
+            "SELECT case_id FROM cases WHERE scraped_ns IS NOT NULL ORDER BY case_id"
+        )
+        return [str(case_id) for (case_id,) in rows]
+
+    @_locked
+    def set_scraped(
+        self,
+        case_id: str,
+        pdf_path: Path,
+        tabular_data_path: Path,
+        tabular_data: Optional[dict] = None,
+    ) -> bool:
+        """Records that a case has been scraped.
+
+        If the raw data of the case differs from when it was last scraped,
+        the case is recorded as not processed. The raw data is compared by
+        the hashes of the PDF document and the tabular data, or by the sizes
+        of the files, if a hash was not recorded last time.
+
+        Args:
+            case_id (str):
+                Case ID
+            pdf_path (Path):
+                Path to the PDF document of the case.
+            tabular_data_path (Path):
+                Path to the tabular data of the case.
+            tabular_data (dict, optional):
+                Tabular data of the case. If given, its hash is recorded, such
+                that changes to the case can be found, see `hash_tabular_data`.
+
+        Returns:
+            bool:
+                True if the case is new, or its raw data has changed.
+                False otherwise.
+        """
+        scraped = dict(
+            pdf_size=pdf_path.stat().st_size,
+            pdf_sha256=_sha256(path=pdf_path),
+            tabular_data_size=tabular_data_path.stat().st_size,
+            tabular_data_sha256=(
+                hash_tabular_data(tabular_data=tabular_data)
+                if tabular_data is not None
+                else None
+            ),
+        )
+        row = self._connection.execute(
+            "SELECT pdf_size, pdf_sha256, tabular_data_size, tabular_data_sha256 "
+            "FROM cases WHERE case_id = ? AND scraped_ns IS NOT NULL",
+            (int(case_id),),
+        ).fetchone()
+        changed = row is None or any(
+            _differs(
+                size=scraped[f"{name}_size"],
+                sha256=scraped[f"{name}_sha256"],
+                size_old=size_old,
+                sha256_old=sha256_old,
+            )
+            for name, size_old, sha256_old in [
+                ("pdf", row[0], row[1]),
+                ("tabular_data", row[2], row[3]),
+            ]
+        )
+
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM missing_cases WHERE case_id = ?", (int(case_id),)
+            )
+            if changed:
+                scraped.update(processed_ns=None, processed_size=None)
+            self._upsert(case_id=case_id, scraped_ns=time.time_ns(), **scraped)
+        return changed
+
+    @_locked
+    def set_unscraped(self, case_id: str) -> None:
+        """Records that the raw data of a case is missing.
+
+        The case is recorded as not scraped, such that it is scraped again.
+
+        Args:
+            case_id (str):
+                Case ID
+        """
+        with self._connection:
+            self._clear_scraped(case_id=case_id)
+
+    @_locked
+    def set_missing(self, case_id: str) -> None:
+        """Records that no case has the given ID.
+
+        The highest scraped case ID is recorded with it, see `is_missing`.
+
+        Args:
+            case_id (str):
+                Case ID
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO missing_cases (case_id, checked_ns, last_scraped_case_id) "
+                "VALUES (?, ?, ?) "
+                "ON CONFLICT (case_id) DO UPDATE SET "
+                "checked_ns = excluded.checked_ns, "
+                "last_scraped_case_id = excluded.last_scraped_case_id",
+                (int(case_id), time.time_ns(), self.last_scraped_case_id()),
+            )
+
+    @_locked
+    def set_exists(self, case_id: str) -> None:
+        """Records that a case has the given ID, without it being scraped.
+
+        Args:
+            case_id (str):
+                Case ID
+        """
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM missing_cases WHERE case_id = ?", (int(case_id),)
+            )
+
+    @_locked
+    def set_processed(self, case_id: str, size: int) -> None:
+        """Records that a case has been processed.
+
+        Args:
+            case_id (str):
+                Case ID
+            size (int):
+                Size of the stored processed data.
+        """
+        with self._connection:
+            self._upsert(
+                case_id=case_id, processed_ns=time.time_ns(), processed_size=size
+            )
+
+    @_locked
+    def set_finalized(self, case_ids: Iterable[str]) -> None:
+        """Records which cases are in the final dataset.
+
+        All other cases are recorded as not being in the final dataset.
+
+        Args:
+            case_ids (Iterable[str]):
+                IDs of the cases in the final dataset.
+        """
+        finalized_ns = time.time_ns()
+        with self._connection:
+            self._connection.execute("UPDATE cases SET finalized_ns = NULL")
+            for case_id in case_ids:
+                self._upsert(case_id=case_id, finalized_ns=finalized_ns)
+
+    @_locked
+    def sync(
+        self,
+        data_raw_dir: Path,
+        processed_store: ProcessedStore,
+        pdf_name: str,
+        tabular_data_name: str,
+    ) -> None:
+        """Records the status of all cases from the data on disk.
+
+        Used to build the index for data scraped and processed before the index
+        existed, and to rebuild it if it does not match the data on disk. Cases
+        whose raw or processed data is missing are recorded as not scraped or
+        not processed. Cases whose files have the sizes recorded in the index
+        are left as they are, and the PDF documents are not hashed, as that
+        would mean reading all of them. All cases are recorded in a single
+        transaction.
+
+        Args:
+            data_raw_dir (Path):
+                Path to raw data directory.
+            processed_store (ProcessedStore):
+                Storage of processed data.
+            pdf_name (str):
+                File name of the PDF document in a raw case directory.
+            tabular_data_name (str):
+                File name of the tabular data in a raw case directory.
+        """
+        logger.info("Building the case index from the data on disk...")
+        now_ns = time.time_ns()
+        scraped = {
+            case_id: (pdf_size, tabular_data_size)
+            for case_id, pdf_size, tabular_data_size in self._connection.execute(
+                "SELECT case_id, pdf_size, tabular_data_size FROM cases "
+                "WHERE scraped_ns IS NOT NULL"
+            )
+        }
+        processed = dict(
+            self._connection.execute(
+                "SELECT case_id, processed_size FROM cases "
+                "WHERE processed_ns IS NOT NULL"
+            ).fetchall()
+        )
+        scraped_on_disk = set()
+        processed_on_disk = set()
+        with self._connection:
+            if data_raw_dir.exists():
+                for case_dir in data_raw_dir.iterdir():
+                    if not _raw_case_dir_complete(case_dir=case_dir):
+                        continue
+                    case_id = int(case_dir.name)
+                    sizes = (
+                        (case_dir / pdf_name).stat().st_size,
+                        (case_dir / tabular_data_name).stat().st_size,
+                    )
+                    scraped_on_disk.add(case_id)
+                    if scraped.get(case_id) == sizes:
+                        continue
+                    self._upsert(
+                        case_id=str(case_id),
+                        scraped_ns=now_ns,
+                        pdf_size=sizes[0],
+                        pdf_sha256=None,
+                        tabular_data_size=sizes[1],
+                        tabular_data_sha256=None,
+                    )
+
+            for case_id in processed_store.case_ids():
+                if not processed_store.exists(case_id=case_id):
+                    continue
+                _, size = processed_store.stat(case_id=case_id)
+                processed_on_disk.add(int(case_id))
+                if processed.get(int(case_id)) == size:
+                    continue
+                self._upsert(case_id=case_id, processed_ns=now_ns, processed_size=size)
+
+            for case_id in set(scraped) - scraped_on_disk:
+                self._clear_scraped(case_id=str(case_id))
+            for case_id in set(processed) - processed_on_disk:
+                self._upsert(
+                    case_id=str(case_id), processed_ns=None, processed_size=None
+                )
+
+        logger.info(
+            f"Case index: {len(scraped_on_disk)} scraped cases, "
+            f"{len(processed_on_disk)} processed cases"
+        )
+
+    def _is_set(self, column: str, case_id: str) -> bool:
+        """Checks if a status column is set for a case.
+
+        Args:
+            column (str):
+                Name of the column.
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if the column is set. False otherwise.
+        """
+        row = self._connection.execute(
+            f"SELECT 1 FROM cases WHERE case_id = ? AND {column} IS NOT NULL",
+            (int(case_id),),
+        ).fetchone()
+        return row is not None
+
+    def _clear_scraped(self, case_id: str) -> None:
+        """Clears the columns recorded when a case is scraped.
+
+        Args:
+            case_id (str):
+                Case ID
+        """
+        self._upsert(
+            case_id=case_id,
+            scraped_ns=None,
+            pdf_size=None,
+            pdf_sha256=None,
+            tabular_data_size=None,
+            tabular_data_sha256=None,
+        )
+
+    def _upsert(self, case_id: str, **values) -> None:
+        """Inserts a case, or updates the given columns if it exists.
+
+        Args:
+            case_id (str):
+                Case ID
+            **values:
+                Values of the columns to set.
+        """
+        columns = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values)
+        self._connection.execute(
+            f"INSERT INTO cases (case_id, {columns}) VALUES (?, {placeholders}) "
+            f"ON CONFLICT (case_id) DO UPDATE SET {updates}",
+            (int(case_id), *values.values()),
+        )
+
+
+def open_case_index(
+    config: DictConfig, data_raw_dir: Path, processed_store: ProcessedStore
+) -> CaseIndex:
+    """Opens the case index given by `paths.case_index`.
+
+    If the index does not exist, or `sync_case_index` is True, it is built from
+    the data on disk. When testing, an index in memory is built from the test
+    data instead.
+
+    Args:
+        config (DictConfig):
+            Config file
+        data_raw_dir (Path):
+            Path to raw data directory.
+        processed_store (ProcessedStore):
+            Storage of processed data.
+
+    Returns:
+        CaseIndex:
+            Case index.
+    """
+    case_index = CaseIndex(
+        path=Path(config.paths.case_index) if not config.testing else None
+    )
+    if case_index.created or config.sync_case_index:
+        case_index.sync(
+            data_raw_dir=data_raw_dir,
+            processed_store=processed_store,
+            pdf_name=config.file_names.pdf_document,
+            tabular_data_name=config.file_names.tabular_data,
+        )
+    return case_index
+
+
+def hash_tabular_data(tabular_data: dict) -> str:
+    """Computes the SHA-256 hash of the tabular data of a case.
+
+    The hash does not depend on the order of the keys, or on how the
+    tabular data is formatted on disk.
+
+    Args:
+        tabular_data (dict):
+            Tabular data
+
+    Returns:
+        str:
+            Hexadecimal hash.
+    """
+    data = json.dumps(tabular_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _differs(
+    size: int, sha256: Optional[str], size_old: int, sha256_old: Optional[str]
+) -> bool:
+    """Checks if a file differs from when it was last recorded.
+
+    Args:
+        size (int):
+            Size of the file.
+        sha256 (str or None):
+            Hash of the file, None if not known.
+        size_old (int):
+            Size of the file when it was last recorded.
+        sha256_old (str or None):
+            Hash of the file when it was last recorded, None if not known.
+
+    Returns:
+        bool:
+            True if the file differs. False otherwise.
+    """
+    if sha256 is not None and sha256_old is not None:
+        return sha256 != sha256_old
+    return size != size_old
+
+
+def _raw_case_dir_complete(case_dir: Path) -> bool:
+    """Checks if a raw case directory contains all the scraped data.
+
+    If a case has been scraped successfully, then the case directory exists
+    and contains two files: the PDF document and the tabular data.
+
+    Args:
+        case_dir (Path):
+            Path to case directory
+
+    Returns:
+        bool:
+            True if case has been scraped. False otherwise.
+    """
+    return case_dir.is_dir() and len(os.listdir(case_dir)) == N_FILES_RAW_CASE_DIR
+
+
+def _sha256(path: Path) -> str:
+    """Computes the SHA-256 hash of a file.
+
+    Args:
+        path (Path):
+            Path to the file.
+
+    Returns:
+        str:
+            Hexadecimal hash.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024**2), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,138 @@
+"""Feed of the cases touched by the Scraper, consumed by the later stages.
+
+The feed is a JSONL file, to which the Scraper appends a line for each case it
+saves. The Processor and the DatasetBuilder each keep an offset into the feed,
+such that they only have to look at the cases touched since their last run.
+"""
+
+import json
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from ._utils import atomic_writer, read_json
+
+logger = getLogger(__name__)
+
+
+class ChangeFeed:
+    """Feed of new and changed cases.
+
+    Each line of the feed is a JSON object with the case ID, the change ("new",
+    "changed" or "unchanged") and the time of the change in nanoseconds. The
+    offset of each consumer (in bytes) is kept in a JSON file next to the feed.
+
+    Args:
+        path (Path):
+            Path to the feed.
+
+    Attributes:
+        path (Path):
+            Path to the feed.
+        offsets_path (Path):
+            Path to the offsets of the consumers.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initializes the ChangeFeed."""
+        self.path = Path(path)
+        self.offsets_path = self.path.with_name(self.path.stem + ".offsets.json")
+
+    def append(self, case_id: str, change: str) -> None:
+        """Appends a case to the feed.
+
+        Args:
+            case_id (str):
+                Case ID
+            change (str):
+                "new" if the case has not been scraped before, "changed" if its
+                raw data differs from when it was last scraped, and "unchanged"
+                otherwise.
+        """
+        record = {"case_id": str(case_id), "change": change, "time_ns": time.time_ns()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Each line is written with a single write, such that lines appended by
+        # multiple browser sessions are not interleaved.
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def end(self) -> int:
+        """Get the offset of the end of the feed.
+
+        Returns:
+            int:
+                Size of the feed in bytes, 0 if there is no feed.
+        """
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def offset(self, consumer: str) -> int:
+        """Get the offset up to which a consumer has read the feed.
+
+        Args:
+            consumer (str):
+                Name of the consumer, e.g. "process".
+
+        Returns:
+            int:
+                Offset in bytes, 0 if the consumer has not read the feed.
+        """
+        if not self.offsets_path.exists():
+            return 0
+        return read_json(self.offsets_path).get(consumer, 0)
+
+    def read(self, consumer: str, until: Optional[int] = None) -> Tuple[List[str], int]:
+        """Reads the cases added to the feed since a consumer last read it.
+
+        Args:
+            consumer (str):
+                Name of the consumer, e.g. "process".
+            until (int, optional):
+                Offset to read up to, e.g. the offset of an earlier stage.
+                If None, the feed is read to the end.
+
+        Returns:
+            case_ids (List[str]):
+                IDs of the new and changed cases, in ascending order. Cases
+                scraped again without changes are left out.
+            offset (int):
+                Offset to commit, when the cases have been handled.
+        """
+        offset = self.offset(consumer=consumer)
+        end = self.end()
+        if offset > end:
+            logger.warning(
+                f"The offset of {consumer} is past the end of {self.path}. "
+                "Reading the feed from the start."
+            )
+            offset = 0
+        if until is not None:
+            end = min(end, until)
+        if offset >= end:
+            return [], offset
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(end - offset)
+        # A line that is still being written is left for the next read.
+        data = data[: data.rfind(b"\n") + 1]
+        records = [json.loads(line) for line in data.splitlines()]
+        case_ids = {
+            record["case_id"] for record in records if record["change"] != "unchanged"
+        }
+        return sorted(case_ids, key=int), offset + len(data)
+
+    def commit(self, consumer: str, offset: int) -> None:
+        """Records the offset up to which a consumer has handled the feed.
+
+        Args:
+            consumer (str):
+                Name of the consumer, e.g. "process".
+            offset (int):
+                Offset returned by `read`.
+        """
+        offsets = read_json(self.offsets_path) if self.offsets_path.exists() else {}
+        offsets[consumer] = offset
+        self.offsets_path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_writer(file_name=self.offsets_path, buffer_size=-1) as f:
+            f.write(json.dumps(offsets).encode())
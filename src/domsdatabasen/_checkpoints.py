@@ -0,0 +1,222 @@
+"""Durable state used to resume processing after a crash.
+
+`WorkQueue` keeps the cases that `Processor.process_all` has left to process, and
+`PageCheckpoints` keeps the pages of a PDF that `PDFTextReader.extract_text` has
+already read. Both are stored in SQLite, and every update is committed right away.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from ._utils import json_default
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """Connects to a SQLite database, which might be shared by multiple processes.
+
+    Args:
+        path (Path):
+            Path to the SQLite database.
+
+    Returns:
+        sqlite3.Connection:
+            Connection to the database.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+class WorkQueue:
+    """Durable queue of the cases left to process.
+
+    Args:
+        path (Path):
+            Path to the SQLite database.
+
+    Attributes:
+        path (Path):
+            Path to the SQLite database.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initializes the WorkQueue."""
+        self.path = Path(path)
+        self._connection = _connect(path=self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS queue ("
+            "case_id INTEGER PRIMARY KEY, "
+            "done INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.commit()
+
+    def pending(self) -> List[str]:
+        """Get the cases left to process.
+
+        Returns:
+            List[str]:
+                Case IDs in ascending order.
+        """
+        rows = self._connection.execute(
+            "SELECT case_id FROM queue WHERE done = 0 ORDER BY case_id"
+        )
+        return [str(case_id) for (case_id,) in rows]
+
+    def put(self, case_ids: List[str]) -> None:
+        """Replaces the queue with the given cases.
+
+        Args:
+            case_ids (List[str]):
+                Case IDs to process.
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM queue")
+            self._connection.executemany(
+                "INSERT INTO queue (case_id) VALUES (?)",
+                [(int(case_id),) for case_id in case_ids],
+            )
+
+    def done(self, case_id: str) -> None:
+        """Marks a case as processed.
+
+        Args:
+            case_id (str):
+                Case ID
+        """
+        with self._connection:
+            self._connection.execute(
+                "UPDATE queue SET done = 1 WHERE case_id = ?", (int(case_id),)
+            )
+
+    def clear(self) -> None:
+        """Empties the queue."""
+        with self._connection:
+            self._connection.execute("DELETE FROM queue")
+
+
+class PageCheckpoints:
+    """Durable store of the pages read from PDFs that are not fully read yet.
+
+    A PDF is identified by its path, size and modification time. Thus, the
+    checkpoints of a PDF are not used if the PDF has been replaced.
+
+    Args:
+        path (Path):
+            Path to the SQLite database.
+
+    Attributes:
+        path (Path):
+            Path to the SQLite database.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initializes the PageCheckpoints."""
+        self.path = Path(path)
+        self._connection = _connect(path=self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "pdf_key TEXT NOT NULL, "
+            "page_number INTEGER NOT NULL, "
+            "page TEXT NOT NULL, "
+            "boxes TEXT NOT NULL, "
+            "box_anonymization INTEGER NOT NULL, "
+            "underline_anonymization INTEGER NOT NULL, "
+            "PRIMARY KEY (pdf_key, page_number))"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def pdf_key(pdf_path: Path) -> str:
+        """Key of a PDF.
+
+        Args:
+            pdf_path (Path):
+                Path to PDF.
+
+        Returns:
+            str:
+                Key of the PDF.
+        """
+        stat = pdf_path.stat()
+        return f"{pdf_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def load(
+        self, pdf_key: str
+    ) -> Dict[str, Tuple[Dict[str, str], List[dict], bool, bool]]:
+        """Loads the pages of a PDF read so far.
+
+        Args:
+            pdf_key (str):
+                Key of the PDF, see `pdf_key`.
+
+        Returns:
+            dict:
+                For each page number, the page, its boxes, and the values of
+                `box_anonymization` and `underline_anonymization` after the page
+                was read, as returned by `PDFTextReader._read_page`.
+        """
+        rows = self._connection.execute(
+            "SELECT page_number, page, boxes, box_anonymization, "
+            "underline_anonymization FROM pages WHERE pdf_key = ?",
+            (pdf_key,),
+        )
+        return {
+            str(page_number): (
+                json.loads(page),
+                json.loads(boxes),
+                bool(box),
+                bool(line),
+            )
+            for page_number, page, boxes, box, line in rows
+        }
+
+    def save(
+        self,
+        pdf_key: str,
+        page_number: str,
+        page: Dict[str, str],
+        boxes: List[dict],
+        box_anonymization: bool,
+        underline_anonymization: bool,
+    ) -> None:
+        """Saves a page that has been read.
+
+        Args:
+            pdf_key (str):
+                Key of the PDF, see `pdf_key`.
+            page_number (str):
+                Page number (1-indexed).
+            page (dict):
+                Text and extraction method of the page.
+            boxes (List[dict]):
+                Boxes the text of the page is built from.
+            box_anonymization (bool):
+                `box_anonymization` after the page was read.
+            underline_anonymization (bool):
+                `underline_anonymization` after the page was read.
+        """
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    pdf_key,
+                    int(page_number),
+                    json.dumps(page),
+                    json.dumps(boxes, default=json_default),
+                    box_anonymization,
+                    underline_anonymization,
+                ),
+            )
+
+    def clear(self, pdf_key: str) -> None:
+        """Removes the pages of a PDF, when it has been fully read.
+
+        Args:
+            pdf_key (str):
+                Key of the PDF, see `pdf_key`.
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM pages WHERE pdf_key = ?", (pdf_key,))
@@ -7,6 +7,8 @@ but these constants should be kept the same.
 # Scraper
 N_FILES_RAW_CASE_DIR = 2
 N_FILES_PROCESSED_CASE_DIR = 1
+# Chrome writes to a temporary file until a download is complete
+PARTIAL_DOWNLOAD_SUFFIXES = (".crdownload", ".tmp")
 
 # Processor
 DPI = 300
@@ -15,3 +17,12 @@ LENGTH_SIX_LETTERS = 150  # Approx length of box of 4 letters
 
 TAB_PIXEL_LENGTH = 50
 NEW_LINE_PIXEL_LENGTH = 50
+
+# PDF content stream operators used to find pages without anonymization or tables
+PDF_OPERATORS_FILL = {b"f", b"F", b"f*"}
+PDF_OPERATORS_STROKE = {b"S", b"s"}
+PDF_OPERATORS_FILL_AND_STROKE = {b"B", b"B*", b"b", b"b*"}
+PDF_OPERATORS_FILL_COLOR = {b"g", b"rg", b"k", b"sc", b"scn", b"cs"}
+PDF_OPERATORS_STROKE_COLOR = {b"G", b"RG", b"K", b"SC", b"SCN", b"CS"}
+# Images, XObjects and shadings might contain anything.
+PDF_OPERATORS_NOT_CLEAN = {b"Do", b"sh", b"BI", b"INLINE IMAGE"}
@@ -0,0 +1,171 @@
+"""Download of PDF documents in the background, while cases are being scraped."""
+
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple, Union
+
+from ._http_client import HTTPCaseClient
+
+
+@dataclass
+class DownloadJob:
+    """PDF document of a case to download.
+
+    Attributes:
+        case_id (str):
+            Case ID
+        case_dir (Path):
+            Path to case directory, where the PDF document is saved.
+        pdf_path (Path):
+            Path to save the PDF document at.
+        tabular_data (dict):
+            Tabular data of the case, saved when the PDF document is downloaded.
+    """
+
+    case_id: str
+    case_dir: Path
+    pdf_path: Path
+    tabular_data: dict
+
+
+class AsyncPDFDownloader:
+    """Downloads PDF documents on an asyncio event loop in a background thread.
+
+    Jobs are put on a bounded queue, which is consumed by `concurrency`
+    download tasks. If the queue is full, `submit` blocks until a download
+    has finished, such that the scraper can not get too far ahead of the
+    downloads. The HTTP client is blocking, so each download task runs its
+    requests in a thread of the event loop.
+
+    The result of each job is put on `done`, such that the scraper can save
+    the case in its own thread.
+
+    Args:
+        http_client (HTTPCaseClient):
+            Client used to download the PDF documents.
+        concurrency (int):
+            Maximum number of downloads at a time.
+        max_pending (int):
+            Maximum number of jobs waiting to be downloaded.
+
+    Attributes:
+        http_client (HTTPCaseClient):
+            Client used to download the PDF documents.
+        done (queue.Queue):
+            Finished jobs, with True if the PDF document was downloaded,
+            False if the case is not accessible, or the exception raised.
+    """
+
+    def __init__(
+        self, http_client: HTTPCaseClient, concurrency: int, max_pending: int
+    ) -> None:
+        """Initializes the AsyncPDFDownloader."""
+        self.http_client = http_client
+        self.done: queue.Queue = queue.Queue()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._jobs: asyncio.Queue = self._run(self._make_queue(max_pending))
+        self._tasks: List[asyncio.Task] = self._run(self._start_tasks(concurrency))
+
+    def submit(self, job: DownloadJob) -> None:
+        """Queues a PDF document for download.
+
+        Blocks while the queue is full.
+
+        Args:
+            job (DownloadJob):
+                PDF document to download.
+        """
+        self._run(self._jobs.put(job))
+
+    def completed(self) -> List[Tuple[DownloadJob, Union[bool, Exception]]]:
+        """Get the jobs finished since the last call, without waiting.
+
+        Returns:
+            List[Tuple[DownloadJob, Union[bool, Exception]]]:
+                Finished jobs and their results, see `done`.
+        """
+        completed = []
+        while not self.done.empty():
+            completed.append(self.done.get_nowait())
+        return completed
+
+    def join(self) -> None:
+        """Waits until all queued PDF documents have been downloaded."""
+        self._run(self._jobs.join())
+
+    def close(self) -> None:
+        """Stops the downloads and the event loop. Queued jobs are dropped."""
+        if self._loop.is_closed():
+            return
+        self._run(self._stop_tasks())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine):
+        """Runs a coroutine on the event loop, and waits for its result.
+
+        Args:
+            coroutine (Coroutine):
+                Coroutine to run.
+
+        Returns:
+            Any:
+                Result of the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    async def _make_queue(maxsize: int) -> asyncio.Queue:
+        """Makes the queue of jobs on the event loop.
+
+        Args:
+            maxsize (int):
+                Maximum size of the queue.
+
+        Returns:
+            asyncio.Queue:
+                Queue of jobs.
+        """
+        return asyncio.Queue(maxsize=maxsize)
+
+    async def _start_tasks(self, n_tasks: int) -> List[asyncio.Task]:
+        """Starts the download tasks on the event loop.
+
+        Args:
+            n_tasks (int):
+                Number of download tasks.
+
+        Returns:
+            List[asyncio.Task]:
+                Download tasks.
+        """
+        return [asyncio.create_task(self._download_jobs()) for _ in range(n_tasks)]
+
+    async def _stop_tasks(self) -> None:
+        """Cancels the download tasks, and waits for running downloads to stop."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.get_running_loop().shutdown_default_executor()
+
+    async def _download_jobs(self) -> None:
+        """Downloads the PDF documents of jobs from the queue, until cancelled."""
+        while True:
+            job = await self._jobs.get()
+            try:
+                result: Union[bool, Exception] = await asyncio.to_thread(
+                    self.http_client.download_pdf,
+                    case_id=job.case_id,
+                    pdf_path=job.pdf_path,
+                )
+            except Exception as e:
+                result = e
+            self.done.put((job, result))
+            self._jobs.task_done()
@@ -3,3 +3,11 @@
 
 class PDFDownloadException(Exception):
     pass
+
+
+class HTTPScrapeException(Exception):
+    pass
+
+
+class RawDataNotFoundException(Exception):
+    pass
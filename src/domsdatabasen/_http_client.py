@@ -0,0 +1,293 @@
+"""Client for the JSON and PDF endpoints behind domsdatabasen.dk.
+
+Used by the Scraper when `scrape.backend` is "http", such that a case can be
+scraped with two HTTP requests instead of loading its page in a browser.
+"""
+
+import json
+import os
+import re
+from logging import getLogger
+from pathlib import Path
+from typing import Any, List, Optional
+
+import urllib3
+from omegaconf import DictConfig
+
+from ._exceptions import HTTPScrapeException
+from ._xpaths import XPATHS_TABULAR_DATA
+
+logger = getLogger(__name__)
+
+
+class HTTPCaseClient:
+    """Reads cases from the JSON and PDF endpoints behind domsdatabasen.dk.
+
+    All requests go through a pool of persistent connections. Requests that
+    fail with a connection error or a 429/5xx status are retried with a backoff.
+
+    Args:
+        config (DictConfig):
+            Config file
+
+    Attributes:
+        config (DictConfig):
+            Config file
+        http (urllib3.PoolManager):
+            Pool of HTTP connections.
+    """
+
+    def __init__(self, config: DictConfig) -> None:
+        """Initializes the HTTPCaseClient."""
+        self.config = config
+        http_config = config.scrape.http
+        self.http = urllib3.PoolManager(
+            maxsize=http_config.pool_size,
+            block=True,
+            timeout=urllib3.Timeout(total=http_config.timeout),
+            retries=urllib3.Retry(
+                total=http_config.retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False,
+            ),
+            headers={"User-Agent": http_config.user_agent},
+        )
+
+    def get_case(self, case_id: str) -> Optional[dict]:
+        """Get the JSON of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            dict or None:
+                JSON of the case, None if no case has the given ID.
+
+        Raises:
+            HTTPScrapeException:
+                If the case could not be read.
+        """
+        url = self._url(path=self.config.scrape.http.case_path, case_id=case_id)
+        response = self._request(url=url)
+        if response.status == 404:
+            return None
+        if response.status != 200:
+            raise HTTPScrapeException(f"GET {url} returned {response.status}")
+        try:
+            return json.loads(response.data)
+        except ValueError as e:
+            raise HTTPScrapeException(f"GET {url} did not return JSON: {e}") from e
+
+    def tabular_data(self, case: dict) -> dict:
+        """Get the tabular data of a case from its JSON.
+
+        The field of each key of the tabular data is given by
+        `scrape.http.fields`. Lists are joined by commas, booleans
+        are written as "Ja" or "Nej", and null values are empty.
+
+        Args:
+            case (dict):
+                JSON of the case.
+
+        Returns:
+            tabular_data (dict):
+                Tabular data, with the same keys as when scraped with a browser.
+
+        Raises:
+            HTTPScrapeException:
+                If a field is not in the JSON.
+        """
+        fields = self.config.scrape.http.fields
+        tabular_data = {
+            key: _to_text(_get_field(case=case, field=fields[key]))
+            for key in XPATHS_TABULAR_DATA
+        }
+        tabular_data["Dato"] = _format_date(
+            _to_text(_get_field(case=case, field=fields["Dato"]))
+        )
+        return tabular_data
+
+    def download_pdf(self, case_id: str, pdf_path: Path) -> bool:
+        """Downloads the PDF document of a case.
+
+        The PDF document is streamed to a temporary file, which
+        is moved to `pdf_path` when the download is complete.
+
+        Args:
+            case_id (str):
+                Case ID
+            pdf_path (Path):
+                Path to save the PDF document at.
+
+        Returns:
+            bool:
+                True if the PDF document was downloaded. False if the
+                case is not accessible.
+
+        Raises:
+            HTTPScrapeException:
+                If the PDF document could not be downloaded.
+        """
+        url = self._url(path=self.config.scrape.http.pdf_path, case_id=case_id)
+        response = self._request(url=url, preload_content=False)
+        try:
+            if response.status in (403, 404, 410):
+                return False
+            if response.status != 200:
+                raise HTTPScrapeException(f"GET {url} returned {response.status}")
+
+            pdf_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = pdf_path.with_name(pdf_path.name + ".part")
+            with open(tmp_path, "wb") as f:
+                for chunk in response.stream(1024**2):
+                    f.write(chunk)
+            with open(tmp_path, "rb") as f:
+                is_pdf = f.read(5) == b"%PDF-"
+            if not is_pdf:
+                tmp_path.unlink()
+                raise HTTPScrapeException(f"GET {url} did not return a PDF")
+            os.replace(tmp_path, pdf_path)
+            return True
+        finally:
+            response.release_conn()
+
+    def list_case_ids(self) -> List[int]:
+        """Get the IDs of all cases from the endpoint listing them.
+
+        The endpoint is given by `scrape.http.list_path`, and must return a
+        JSON list with an item for each case. The case ID of an item is given
+        by `scrape.http.list_field`, or is the item itself if it is not an object.
+
+        Returns:
+            List[int]:
+                Case IDs in ascending order.
+
+        Raises:
+            HTTPScrapeException:
+                If the case IDs could not be read.
+        """
+        http_config = self.config.scrape.http
+        url = http_config.base_url.rstrip("/") + http_config.list_path
+        response = self._request(url=url)
+        if response.status != 200:
+            raise HTTPScrapeException(f"GET {url} returned {response.status}")
+        try:
+            items = json.loads(response.data)
+            return sorted(
+                int(
+                    _get_field(case=item, field=http_config.list_field)
+                    if isinstance(item, dict)
+                    else item
+                )
+                for item in items
+            )
+        except (TypeError, ValueError) as e:
+            raise HTTPScrapeException(
+                f"GET {url} did not return a list of cases: {e}"
+            ) from e
+
+    def _request(self, url: str, preload_content: bool = True) -> urllib3.HTTPResponse:
+        """Sends a GET request.
+
+        Args:
+            url (str):
+                URL
+            preload_content (bool):
+                If False, the body is not read, such that it can be streamed.
+
+        Returns:
+            urllib3.HTTPResponse:
+                Response
+
+        Raises:
+            HTTPScrapeException:
+                If the request failed after all retries.
+        """
+        try:
+            return self.http.request("GET", url, preload_content=preload_content)
+        except urllib3.exceptions.HTTPError as e:
+            raise HTTPScrapeException(f"GET {url} failed: {e}") from e
+
+    def _url(self, path: str, case_id: str) -> str:
+        """Get the URL of an endpoint for a case.
+
+        Args:
+            path (str):
+                Path of the endpoint, with the case ID as "{case_id}".
+            case_id (str):
+                Case ID
+
+        Returns:
+            str:
+                URL
+        """
+        base_url = self.config.scrape.http.base_url.rstrip("/")
+        return base_url + path.format(case_id=case_id)
+
+
+def _get_field(case: dict, field: str) -> Any:
+    """Get a field from the JSON of a case.
+
+    Args:
+        case (dict):
+            JSON of the case.
+        field (str):
+            Keys of the field, separated by dots.
+
+    Returns:
+        Any:
+            Value of the field.
+
+    Raises:
+        HTTPScrapeException:
+            If the field is not in the JSON.
+    """
+    value: Any = case
+    for key in field.split("."):
+        if not isinstance(value, dict) or key not in value:
+            raise HTTPScrapeException(f"Field {field} is not in the case JSON")
+        value = value[key]
+    return value
+
+
+def _to_text(value: Any) -> str:
+    """Converts a value from the JSON of a case to text.
+
+    Args:
+        value (Any):
+            Value
+
+    Returns:
+        str:
+            Text, as it is shown on the page of the case.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Ja" if value else "Nej"
+    if isinstance(value, list):
+        return ", ".join(_to_text(item) for item in value)
+    return str(value).strip()
+
+
+def _format_date(date: str) -> str:
+    """Formats a date as "dd-mm-yyyy", as it is shown on the page of the case.
+
+    Args:
+        date (str):
+            Date on the format "dd-mm-yyyy" or "yyyy-mm-dd", optionally with a time.
+
+    Returns:
+        str:
+            Date on the format "dd-mm-yyyy", empty if no date is found.
+    """
+    found = re.search(r"\d{2}-\d{2}-\d{4}", date)
+    if found:
+        return found.group()
+    found = re.search(r"(\d{4})-(\d{2})-(\d{2})", date)
+    if found:
+        year, month, day = found.groups()
+        return f"{day}-{month}-{year}"
+    return ""
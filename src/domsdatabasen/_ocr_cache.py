@@ -0,0 +1,239 @@
+"""On-disk cache of easyocr results, keyed by the pixels of the image read."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ._utils import json_default
+
+logger = getLogger(__name__)
+
+
+class OCRCache:
+    """SQLite cache of easyocr results.
+
+    A result is stored under a hash of the image bytes (and shape) together with
+    the easyocr method and reader settings used to read the image. Thus, if an
+    image has been read before with the same settings, the result is returned from
+    the cache instead of running easyocr again.
+
+    When the cache grows beyond `max_size_mb`, the least recently used results
+    are evicted.
+
+    Args:
+        path (Path):
+            Path to the SQLite database.
+        settings (str):
+            Reader settings, which are part of every key.
+        max_size_mb (int):
+            Maximum size of the cached results in megabytes.
+
+    Attributes:
+        path (Path):
+            Path to the SQLite database.
+        settings (str):
+            Reader settings, which are part of every key.
+        max_size (int):
+            Maximum size of the cached results in bytes.
+        hits (int):
+            Number of results found in the cache.
+        misses (int):
+            Number of results not found in the cache.
+    """
+
+    # Number of insertions between checks of the size of the cache.
+    _SIZE_CHECK_INTERVAL = 1000
+
+    def __init__(self, path: Path, settings: str, max_size_mb: int) -> None:
+        """Initializes the OCRCache."""
+        self.path = Path(path)
+        self.settings = settings
+        self.max_size = max_size_mb * 1024**2
+        self.hits = 0
+        self.misses = 0
+        self._n_inserted = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The cache might be shared by multiple worker processes.
+        self._connection = sqlite3.connect(self.path, timeout=60)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            "key TEXT PRIMARY KEY, "
+            "result TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ocr_cache_last_access "
+            "ON ocr_cache (last_access)"
+        )
+        self._connection.commit()
+
+    def read(
+        self,
+        method: str,
+        images: List[np.ndarray],
+        read_function: Callable[[List[np.ndarray]], List[list]],
+    ) -> List[list]:
+        """Read images, using cached results where possible.
+
+        Args:
+            method (str):
+                Name of the easyocr method used to read the images.
+            images (List[np.ndarray]):
+                Images to read.
+            read_function (Callable):
+                Function reading a list of images with easyocr. Only called
+                with the images that are not in the cache.
+
+        Returns:
+            results (List[list]):
+                Result from easyocr for each image.
+        """
+        keys = [self._key(method=method, image=image) for image in images]
+        results: List[Optional[list]] = [self._get(key=key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        self.hits += len(images) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            results_missing = read_function([images[i] for i in missing])
+            for i, result in zip(missing, results_missing):
+                results[i] = result
+                self._put(key=keys[i], result=result)
+
+        # Commit right away (also for hits, which update `last_access`), as
+        # an open transaction would lock the cache for other processes.
+        self._connection.commit()
+        return results  # type: ignore[return-value]
+
+    def log_stats(self) -> None:
+        """Logs the number of cache hits and misses."""
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0
+        logger.info(
+            f"OCR cache: {self.hits} hits, {self.misses} misses "
+            f"(hit rate {hit_rate:.1%})"
+        )
+
+    def _key(self, method: str, image: np.ndarray) -> str:
+        """Key of an image read with a given method.
+
+        Args:
+            method (str):
+                Name of the easyocr method.
+            image (np.ndarray):
+                Image to read.
+
+        Returns:
+            str:
+                Key of the image.
+        """
+        image = np.ascontiguousarray(image)
+        h = hashlib.sha256()
+        h.update(f"{self.settings}|{method}|{image.shape}|{image.dtype}".encode())
+        h.update(image.tobytes())
+        return h.hexdigest()
+
+    def _get(self, key: str) -> Optional[list]:
+        """Get a cached result.
+
+        Args:
+            key (str):
+                Key of the result.
+
+        Returns:
+            result (list or None):
+                Cached result, None if the key is not in the cache.
+        """
+        row = self._connection.execute(
+            "SELECT result FROM ocr_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._connection.execute(
+            "UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+        )
+        return self._deserialize(result=row[0])
+
+    def _put(self, key: str, result: list) -> None:
+        """Put a result in the cache.
+
+        Args:
+            key (str):
+                Key of the result.
+            result (list):
+                Result from easyocr.
+        """
+        serialized = self._serialize(result=result)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?)",
+            (key, serialized, len(serialized), time.time()),
+        )
+        self._n_inserted += 1
+        if self._n_inserted % self._SIZE_CHECK_INTERVAL == 0:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Evicts the least recently used results if the cache is too large.
+
+        Results are evicted until the cache is at 90% of its maximum size.
+        """
+        (size,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM ocr_cache"
+        ).fetchone()
+        if size <= self.max_size:
+            return
+
+        size_target = 0.9 * self.max_size
+        rows = self._connection.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY last_access"
+        )
+        keys_to_evict = []
+        for key, size_ in rows:
+            if size <= size_target:
+                break
+            keys_to_evict.append((key,))
+            size -= size_
+        rows.close()
+        self._connection.executemany(
+            "DELETE FROM ocr_cache WHERE key = ?", keys_to_evict
+        )
+        logger.info(f"Evicted {len(keys_to_evict)} results from the OCR cache")
+
+    @staticmethod
+    def _serialize(result: list) -> str:
+        """Serialize an easyocr result to JSON.
+
+        Args:
+            result (list):
+                Result from easyocr.
+
+        Returns:
+            str:
+                Serialized result.
+        """
+        return json.dumps(result, default=json_default)
+
+    @staticmethod
+    def _deserialize(result: str) -> list:
+        """Deserialize an easyocr result from JSON.
+
+        Args:
+            result (str):
+                Serialized result.
+
+        Returns:
+            list:
+                Result from easyocr, with each box as a tuple
+                (corners, text, confidence).
+        """
+        return [tuple(box) for box in json.loads(result)]
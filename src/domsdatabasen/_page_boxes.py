@@ -0,0 +1,114 @@
+"""Compact storage of the boxes read on each page of a PDF.
+
+The boxes of all pages of a PDF are stored column-wise in a single compressed
+numpy archive, such that the text of the pages can be rebuilt from the boxes
+(e.g. after changing the layout code) without running OCR again.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def save_page_boxes(
+    path: Path,
+    pages: Dict[str, Dict[str, str]],
+    page_boxes: Dict[str, List[dict]],
+) -> None:
+    """Saves the pages of a PDF and the boxes read on each page.
+
+    Args:
+        path (Path):
+            Path to the archive (.npz).
+        pages (dict):
+            Pages with text and extraction method.
+        page_boxes (dict):
+            Boxes with coordinates, text, origin and (optionally) confidence
+            for each page. Pages read with pypdf have no boxes.
+    """
+    page_numbers = list(pages.keys())
+    boxes = [
+        (page_number, box)
+        for page_number in page_numbers
+        for box in page_boxes.get(page_number, [])
+    ]
+
+    columns = {
+        "page_number": np.array(page_numbers, dtype=str),
+        "page_text": np.array([pages[p]["text"] for p in page_numbers], dtype=str),
+        "page_extraction_method": np.array(
+            [pages[p]["extraction_method"] for p in page_numbers], dtype=str
+        ),
+        "box_page_number": np.array([p for p, _ in boxes], dtype=str),
+        "box_coordinates": np.array(
+            [box["coordinates"] for _, box in boxes], dtype=np.float64
+        ).reshape(-1, 4),
+        "box_text": np.array([box["text"] for _, box in boxes], dtype=str),
+        "box_confidence": np.array(
+            [box.get("confidence", np.nan) for _, box in boxes], dtype=np.float64
+        ),
+        "box_origin": np.array([box["origin"] for _, box in boxes], dtype=str),
+    }
+
+    # Write to a temporary file first, such that a crash never leaves
+    # a partially written archive behind.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path_tmp = path.with_name(path.name + ".tmp")
+    with open(path_tmp, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(path_tmp, path)
+
+
+def load_page_boxes(
+    path: Path,
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, List[dict]]]:
+    """Loads the pages of a PDF and the boxes read on each page.
+
+    Args:
+        path (Path):
+            Path to the archive (.npz).
+
+    Returns:
+        pages (dict):
+            Pages with text and extraction method.
+        page_boxes (dict):
+            Boxes with coordinates, text, origin and (if known) confidence
+            for each page.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        columns = {key: data[key] for key in data.files}
+
+    pages = {
+        str(page_number): {
+            "text": str(text),
+            "extraction_method": str(extraction_method),
+        }
+        for page_number, text, extraction_method in zip(
+            columns["page_number"],
+            columns["page_text"],
+            columns["page_extraction_method"],
+        )
+    }
+
+    page_boxes: Dict[str, List[dict]] = {page_number: [] for page_number in pages}
+    for page_number, coordinates, text, confidence, origin in zip(
+        columns["box_page_number"],
+        columns["box_coordinates"],
+        columns["box_text"],
+        columns["box_confidence"],
+        columns["box_origin"],
+    ):
+        box = {
+            "coordinates": tuple(
+                int(c) if c.is_integer() else c for c in coordinates.tolist()
+            ),
+            "text": str(text),
+            "origin": str(origin),
+        }
+        if not np.isnan(confidence):
+            box["confidence"] = float(confidence)
+        page_boxes[str(page_number)].append(box)
+
+    return pages, page_boxes
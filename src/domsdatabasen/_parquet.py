@@ -0,0 +1,182 @@
+"""Sharded Parquet output of the final dataset."""
+
+import shutil
+from datetime import date, datetime
+from logging import getLogger
+from pathlib import Path
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ._xpaths import XPATHS_TABULAR_DATA
+
+logger = getLogger(__name__)
+
+# Same columns, and in the same order, as the samples made by
+# `DatasetBuilder.make_dataset_sample`. The fields of the tabular data are free
+# text on the site (e.g. "Påstandsbeløb"), so they are kept as strings, while the
+# date of the case is stored as a date.
+DATASET_SCHEMA = pa.schema(
+    [pa.field("case_id", pa.string())]
+    + [pa.field(key, pa.string()) for key in XPATHS_TABULAR_DATA]
+    + [
+        pa.field("Dato", pa.date32()),
+        pa.field("text", pa.string()),
+        pa.field("text_anonymized", pa.string()),
+        pa.field("text_len", pa.int64()),
+        pa.field("text_anon_len", pa.int64()),
+    ]
+)
+
+
+class ParquetDatasetWriter:
+    """Writes dataset samples to sharded Parquet files.
+
+    The shards are written to a temporary directory, which replaces `dir_path`
+    when the writer is closed. If writing fails, `dir_path` is left untouched.
+    The shards are named `train-xxxxx-of-yyyyy.parquet`, such that they are
+    recognized as the train split by the Hugging Face Hub.
+
+    The writer is used as a context manager, in which `write` is called with
+    each sample.
+
+    Args:
+        dir_path (Path):
+            Directory to write the shards to.
+        shard_size (int):
+            Number of samples in a shard, rounded up to whole row groups.
+        row_group_size (int):
+            Number of samples in a row group.
+        compression (str):
+            Compression codec, e.g. "zstd" or "snappy".
+
+    Attributes:
+        dir_path (Path):
+            Directory to write the shards to.
+        shard_size (int):
+            Number of samples in a shard, rounded up to whole row groups.
+        row_group_size (int):
+            Number of samples in a row group.
+        compression (str):
+            Compression codec.
+    """
+
+    def __init__(
+        self, dir_path: Path, shard_size: int, row_group_size: int, compression: str
+    ) -> None:
+        """Initializes the ParquetDatasetWriter."""
+        self.dir_path = Path(dir_path)
+        self.shard_size = shard_size
+        self.row_group_size = row_group_size
+        self.compression = compression
+
+        self._dir_path_tmp = self.dir_path.with_name(self.dir_path.name + ".tmp")
+        self._rows: List[dict] = []
+        self._shard_paths: List[Path] = []
+        self._shard_writer: Optional[pq.ParquetWriter] = None
+        self._n_rows_shard = 0
+
+    def __enter__(self) -> "ParquetDatasetWriter":
+        """Creates the temporary directory for the shards."""
+        if self._dir_path_tmp.exists():
+            shutil.rmtree(self._dir_path_tmp)
+        self._dir_path_tmp.mkdir(parents=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Publishes the shards, or removes them if writing failed."""
+        if exc_type is None:
+            self._write_row_group()
+            self._close_shard()
+            self._publish()
+        else:
+            if self._shard_writer is not None:
+                self._shard_writer.close()
+            shutil.rmtree(self._dir_path_tmp, ignore_errors=True)
+
+    def write(self, sample: dict) -> None:
+        """Writes a dataset sample.
+
+        Args:
+            sample (dict):
+                Dataset sample.
+        """
+        self._rows.append({**sample, "Dato": _parse_date(sample.get("Dato", ""))})
+        if len(self._rows) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self) -> None:
+        """Writes the buffered samples as a row group."""
+        if not self._rows:
+            return
+
+        if self._shard_writer is None:
+            shard_path = self._dir_path_tmp / f"{len(self._shard_paths):05d}.parquet"
+            self._shard_writer = pq.ParquetWriter(
+                shard_path, schema=DATASET_SCHEMA, compression=self.compression
+            )
+            self._shard_paths.append(shard_path)
+
+        table = pa.Table.from_pylist(self._rows, schema=DATASET_SCHEMA)
+        self._shard_writer.write_table(table, row_group_size=self.row_group_size)
+        self._n_rows_shard += len(self._rows)
+        self._rows = []
+
+        if self._n_rows_shard >= self.shard_size:
+            self._close_shard()
+
+    def _close_shard(self) -> None:
+        """Closes the current shard."""
+        if self._shard_writer is not None:
+            self._shard_writer.close()
+        self._shard_writer = None
+        self._n_rows_shard = 0
+
+    def _publish(self) -> None:
+        """Names the shards and moves them to `dir_path`."""
+        n_shards = len(self._shard_paths)
+        for i, shard_path in enumerate(self._shard_paths):
+            shard_path.rename(
+                self._dir_path_tmp / f"train-{i:05d}-of-{n_shards:05d}.parquet"
+            )
+
+        if self.dir_path.exists():
+            shutil.rmtree(self.dir_path)
+        self._dir_path_tmp.rename(self.dir_path)
+        logger.info(f"Wrote {n_shards} Parquet shards to {self.dir_path}")
+
+
+def _parse_date(date_str: str) -> Optional[date]:
+    """Parses the date of a case.
+
+    Args:
+        date_str (str):
+            Date on the format "dd-mm-yyyy", as scraped from the site.
+
+    Returns:
+        date or None:
+            Date, None if the case has no date.
+    """
+    if not date_str:
+        return None
+    return datetime.strptime(date_str, "%d-%m-%Y").date()
+
+
+def count_parquet_rows(dir_path: Path) -> int:
+    """Counts the rows of the Parquet shards in a directory.
+
+    Only the metadata of the shards is read.
+
+    Args:
+        dir_path (Path):
+            Directory with Parquet shards.
+
+    Returns:
+        int:
+            Number of rows.
+    """
+    return sum(
+        pq.read_metadata(shard_path).num_rows
+        for shard_path in Path(dir_path).glob("*.parquet")
+    )
@@ -0,0 +1,372 @@
+"""Storage backends for the processed data of cases.
+
+The processed data of a case is what `Processor` extracts from the raw data,
+and what `DatasetBuilder` builds the final dataset from.
+"""
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from omegaconf import DictConfig
+
+from ._constants import N_FILES_PROCESSED_CASE_DIR
+from ._utils import read_json, save_dict_to_json
+
+
+class ProcessedStore(ABC):
+    """Interface of a storage backend for processed data."""
+
+    @abstractmethod
+    def exists(self, case_id: str) -> bool:
+        """Checks if a case has been processed.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if the processed data of the case is stored. False otherwise.
+        """
+
+    @abstractmethod
+    def load(self, case_id: str) -> dict:
+        """Loads the processed data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            processed_data (dict):
+                Processed data
+        """
+
+    @abstractmethod
+    def save(self, processed_data: dict) -> None:
+        """Saves the processed data of a case.
+
+        Args:
+            processed_data (dict):
+                Processed data, including the case ID.
+        """
+
+    @abstractmethod
+    def case_ids(self) -> List[str]:
+        """Get the IDs of all processed cases.
+
+        Returns:
+            List[str]:
+                Case IDs in ascending order.
+        """
+
+    @abstractmethod
+    def stat(self, case_id: str) -> Tuple[int, int]:
+        """Get the state of the processed data of a case.
+
+        The state changes whenever the processed data is saved again,
+        and is used to find changed cases when building the dataset.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            Tuple[int, int]:
+                Time of the last save (in nanoseconds) and size of the stored data.
+        """
+
+
+class JSONProcessedStore(ProcessedStore):
+    """Stores the processed data of each case as a JSON file in its own directory.
+
+    Args:
+        dir_path (Path):
+            Path to processed data directory.
+        file_name (str):
+            Name of the JSON file in each case directory.
+        indent (int or None):
+            Indentation of the JSON files. None for compact JSON.
+
+    Attributes:
+        dir_path (Path):
+            Path to processed data directory.
+        file_name (str):
+            Name of the JSON file in each case directory.
+        indent (int or None):
+            Indentation of the JSON files.
+    """
+
+    def __init__(self, dir_path: Path, file_name: str, indent: Optional[int]) -> None:
+        """Initializes the JSONProcessedStore."""
+        self.dir_path = Path(dir_path)
+        self.file_name = file_name
+        self.indent = indent
+
+    def exists(self, case_id: str) -> bool:
+        """Checks if a case has been processed.
+
+        If a case has been processed, the case directory will
+        exist and will contain one file with the processed data.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if the processed data of the case is stored. False otherwise.
+        """
+        case_dir = self.dir_path / str(case_id)
+        return (
+            case_dir.exists()
+            and len(os.listdir(case_dir)) == N_FILES_PROCESSED_CASE_DIR
+        )
+
+    def load(self, case_id: str) -> dict:
+        """Loads the processed data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            processed_data (dict):
+                Processed data
+        """
+        return read_json(file_path=self.dir_path / str(case_id) / self.file_name)
+
+    def save(self, processed_data: dict) -> None:
+        """Saves the processed data of a case.
+
+        Args:
+            processed_data (dict):
+                Processed data, including the case ID.
+        """
+        case_dir = self.dir_path / str(processed_data["case_id"])
+        case_dir.mkdir(parents=True, exist_ok=True)
+        save_dict_to_json(processed_data, case_dir / self.file_name, indent=self.indent)
+
+    def case_ids(self) -> List[str]:
+        """Get the IDs of all processed cases.
+
+        Returns:
+            List[str]:
+                Case IDs in ascending order.
+        """
+        if not self.dir_path.exists():
+            return []
+        case_ids = [
+            case_path.name
+            for case_path in self.dir_path.iterdir()
+            if case_path.is_dir()  # Exclude .gitkeep
+        ]
+        return sorted(case_ids, key=lambda case_id: int(case_id))
+
+    def stat(self, case_id: str) -> Tuple[int, int]:
+        """Get the state of the processed data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            Tuple[int, int]:
+                Modification time (in nanoseconds) and size of the JSON file.
+        """
+        stat = (self.dir_path / str(case_id) / self.file_name).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+
+class SQLiteProcessedStore(ProcessedStore):
+    """Stores the processed data of all cases in a single SQLite database.
+
+    The processed data is stored as zlib-compressed compact JSON, indexed by
+    case ID. This keeps the processed data in one file, instead of one
+    directory per case, which is much faster on network filesystems.
+
+    The database is only created when the first case is saved.
+
+    Args:
+        path (Path):
+            Path to the SQLite database.
+        compression_level (int):
+            zlib compression level (0-9).
+
+    Attributes:
+        path (Path):
+            Path to the SQLite database.
+        compression_level (int):
+            zlib compression level.
+    """
+
+    def __init__(self, path: Path, compression_level: int) -> None:
+        """Initializes the SQLiteProcessedStore."""
+        self.path = Path(path)
+        self.compression_level = compression_level
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def exists(self, case_id: str) -> bool:
+        """Checks if a case has been processed.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if the processed data of the case is stored. False otherwise.
+        """
+        row = self._fetchone("SELECT 1 FROM processed WHERE case_id = ?", case_id)
+        return row is not None
+
+    def load(self, case_id: str) -> dict:
+        """Loads the processed data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            processed_data (dict):
+                Processed data
+        """
+        row = self._fetchone("SELECT data FROM processed WHERE case_id = ?", case_id)
+        if row is None:
+            raise KeyError(f"Case {case_id} is not in {self.path}")
+        return json.loads(zlib.decompress(row[0]))
+
+    def save(self, processed_data: dict) -> None:
+        """Saves the processed data of a case.
+
+        Args:
+            processed_data (dict):
+                Processed data, including the case ID.
+        """
+        data = zlib.compress(
+            json.dumps(processed_data, separators=(",", ":")).encode(),
+            self.compression_level,
+        )
+        connection = self._connect(create=True)
+        assert connection is not None
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?)",
+                (str(processed_data["case_id"]), data, time.time_ns(), len(data)),
+            )
+
+    def case_ids(self) -> List[str]:
+        """Get the IDs of all processed cases.
+
+        Returns:
+            List[str]:
+                Case IDs in ascending order.
+        """
+        connection = self._connect()
+        if connection is None:
+            return []
+        case_ids = [
+            row[0] for row in connection.execute("SELECT case_id FROM processed")
+        ]
+        return sorted(case_ids, key=lambda case_id: int(case_id))
+
+    def stat(self, case_id: str) -> Tuple[int, int]:
+        """Get the state of the processed data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            Tuple[int, int]:
+                Time of the last save (in nanoseconds) and size of the stored data.
+        """
+        row = self._fetchone(
+            "SELECT updated_ns, size FROM processed WHERE case_id = ?", case_id
+        )
+        if row is None:
+            raise KeyError(f"Case {case_id} is not in {self.path}")
+        return row[0], row[1]
+
+    def _fetchone(self, query: str, case_id: str) -> Optional[tuple]:
+        """Runs a query for a single case.
+
+        Args:
+            query (str):
+                Query with a single parameter, the case ID.
+            case_id (str):
+                Case ID
+
+        Returns:
+            tuple or None:
+                First row of the result, None if there is no result
+                (or no database).
+        """
+        connection = self._connect()
+        if connection is None:
+            return None
+        return connection.execute(query, (str(case_id),)).fetchone()
+
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """Connects to the database.
+
+        Args:
+            create (bool):
+                If True, the database is created if it does not exist.
+
+        Returns:
+            sqlite3.Connection or None:
+                Connection, None if the database does not exist
+                and `create` is False.
+        """
+        if self._connection is None:
+            if not self.path.exists() and not create:
+                return None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS processed ("
+                "case_id TEXT PRIMARY KEY, "
+                "data BLOB NOT NULL, "
+                "updated_ns INTEGER NOT NULL, "
+                "size INTEGER NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+
+def get_processed_store(config: DictConfig, dir_path: Path) -> ProcessedStore:
+    """Get the storage backend for processed data given by `processed_store.backend`.
+
+    Args:
+        config (DictConfig):
+            Config file
+        dir_path (Path):
+            Path to processed data directory.
+
+    Returns:
+        ProcessedStore:
+            Storage backend.
+    """
+    backend = config.processed_store.backend
+    if backend == "json":
+        return JSONProcessedStore(
+            dir_path=dir_path, file_name=config.file_names.processed_data, indent=4
+        )
+    elif backend == "json_compact":
+        return JSONProcessedStore(
+            dir_path=dir_path, file_name=config.file_names.processed_data, indent=None
+        )
+    elif backend == "sqlite":
+        return SQLiteProcessedStore(
+            path=Path(dir_path) / config.file_names.processed_store,
+            compression_level=config.processed_store.compression_level,
+        )
+    raise ValueError(f"Unknown processed store backend: {backend}")
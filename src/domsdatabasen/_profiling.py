@@ -0,0 +1,268 @@
+"""Timing of the stages of processing a case, and export of the timings."""
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ._utils import atomic_writer
+
+# Stages in the order they are reported in.
+STAGES = [
+    "rasterize",
+    "clean_page_check",
+    "box_detection",
+    "underline_detection",
+    "table_detection",
+    "ocr",
+    "layout",
+    "pypdf",
+    "tika",
+]
+
+
+class StageTimer:
+    """Accumulates the time spent in each stage of processing.
+
+    Stages can be nested, e.g. OCR calls made during box detection. The time of a
+    nested stage is only counted for that stage, and not for the enclosing stage,
+    such that the times of the stages add up to the time spent in them in total.
+    Stages running in other threads (e.g. Tika) are timed separately, and thus
+    overlap with the stages of the main thread.
+
+    Attributes:
+        stages (dict):
+            For each stage, the time spent in it (`seconds`), the number of times
+            it was entered (`calls`), and any counters added to it.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the StageTimer."""
+        self.stages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str, **counters: float) -> Iterator[None]:
+        """Times a stage.
+
+        Args:
+            name (str):
+                Name of the stage.
+            **counters:
+                Counters to add to the stage, e.g. the number of crops read.
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        stack: List[list] = self._local.stack
+        now = time.perf_counter()
+        if stack:
+            # Pause the enclosing stage.
+            self._add(name=stack[-1][0], seconds=now - stack[-1][1])
+        stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            name_, start = stack.pop()
+            self._add(name=name_, seconds=now - start, calls=1, **counters)
+            if stack:
+                # Resume the enclosing stage.
+                stack[-1][1] = now
+
+    def merge(self, stages: Dict[str, Dict[str, float]]) -> None:
+        """Adds the timings of another timer, e.g. from a worker process.
+
+        Args:
+            stages (dict):
+                Timings, see `summary`.
+        """
+        for name, values in stages.items():
+            self._add(name=name, **values)
+
+    def reset(self) -> None:
+        """Removes all timings."""
+        with self._lock:
+            self.stages.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Get the timings.
+
+        Returns:
+            dict:
+                For each stage entered, the time spent in it (`seconds`), the
+                number of times it was entered (`calls`), and its counters.
+        """
+        with self._lock:
+            names = [name for name in STAGES if name in self.stages] + sorted(
+                set(self.stages) - set(STAGES)
+            )
+            return {
+                name: {
+                    key: round(value, 6) if key == "seconds" else int(value)
+                    for key, value in self.stages[name].items()
+                }
+                for name in names
+            }
+
+    def _add(self, name: str, **values: float) -> None:
+        """Adds values to a stage.
+
+        Args:
+            name (str):
+                Name of the stage.
+            **values:
+                Values to add, e.g. `seconds` and `calls`.
+        """
+        with self._lock:
+            for key, value in values.items():
+                self.stages[name][key] += value
+
+
+def reset_peak_rss() -> None:
+    """Resets the peak resident set size of this process, if possible.
+
+    Only possible on Linux. Elsewhere, the peak of the lifetime
+    of the process is reported by `peak_rss_mb`.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Get the peak resident set size of this process.
+
+    Returns:
+        float:
+            Peak resident set size in megabytes since `reset_peak_rss`,
+            or 0.0 if it is not available on this platform (e.g. Windows).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        # Only available on Unix.
+        import resource
+    except ImportError:
+        return 0.0
+    # Kilobytes on Linux, bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    unit = 1024**2 if sys.platform == "darwin" else 1024
+    return round(max_rss / unit, 1)
+
+
+class TraceExporter:
+    """Exports the timings of processed cases.
+
+    Args:
+        export_format (str):
+            "jsonl" to append the process info of each case to a JSONL trace, or
+            "prometheus" to keep a Prometheus text file with the total timings
+            of the run up to date.
+        path (Path):
+            Path to the trace or the Prometheus text file.
+
+    Attributes:
+        export_format (str):
+            "jsonl" or "prometheus".
+        path (Path):
+            Path to the trace or the Prometheus text file.
+    """
+
+    def __init__(self, export_format: str, path: Path) -> None:
+        """Initializes the TraceExporter."""
+        if export_format not in ("jsonl", "prometheus"):
+            raise ValueError(f"Unknown trace export format: {export_format}")
+        self.export_format = export_format
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._totals = StageTimer()
+        self._n_cases = 0
+        self._peak_rss_mb = 0.0
+
+    def export(self, case_id: str, process_info: dict) -> None:
+        """Exports the timings of a processed case.
+
+        Args:
+            case_id (str):
+                Case ID
+            process_info (dict):
+                Process info of the case, with the timings of each stage.
+        """
+        if self.export_format == "jsonl":
+            record = {"case_id": case_id, "time": time.time(), **process_info}
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            return
+
+        self._totals.merge(stages=process_info.get("stages", {}))
+        self._n_cases += 1
+        self._peak_rss_mb = float(process_info.get("peak_rss_mb", 0.0))
+        self._write_prometheus()
+
+    def _write_prometheus(self) -> None:
+        """Writes the total timings in the Prometheus text format."""
+        prefix = "domsdatabasen_process"
+        lines = [
+            f"# HELP {prefix}_cases_total Number of cases processed in this run.",
+            f"# TYPE {prefix}_cases_total counter",
+            f"{prefix}_cases_total {self._n_cases}",
+            f"# HELP {prefix}_peak_rss_megabytes Peak RSS of the last case.",
+            f"# TYPE {prefix}_peak_rss_megabytes gauge",
+            f"{prefix}_peak_rss_megabytes {self._peak_rss_mb}",
+        ]
+        stages = self._totals.summary()
+        counters = sorted({key for values in stages.values() for key in values})
+        for key in counters:
+            metric = f"{prefix}_stage_{key}_total"
+            lines += [
+                f"# HELP {metric} Total {key} of each processing stage in this run.",
+                f"# TYPE {metric} counter",
+            ]
+            lines += [
+                f'{metric}{{stage="{name}"}} {values[key]}'
+                for name, values in stages.items()
+                if key in values
+            ]
+
+        with atomic_writer(file_name=self.path, buffer_size=-1) as f:
+            f.write(("\n".join(lines) + "\n").encode())
+
+
+def get_trace_exporter(
+    export_format: Optional[str], jsonl_path: Path, prometheus_path: Path
+) -> Optional[TraceExporter]:
+    """Get the exporter of the timings of processed cases.
+
+    Args:
+        export_format (str or None):
+            "jsonl", "prometheus" or None to not export the timings.
+        jsonl_path (Path):
+            Path to the JSONL trace.
+        prometheus_path (Path):
+            Path to the Prometheus text file.
+
+    Returns:
+        TraceExporter or None:
+            Exporter, None if the timings are not exported.
+    """
+    if not export_format:
+        return None
+    return TraceExporter(
+        export_format=export_format,
+        path=jsonl_path if export_format == "jsonl" else prometheus_path,
+    )
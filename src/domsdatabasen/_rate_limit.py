@@ -0,0 +1,39 @@
+"""Rate limit shared by everything that sends requests to domsdatabasen.dk."""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Spaces out requests, such that at most `rate` requests are sent per second.
+
+    The limiter is thread-safe, such that a single limiter can be shared by
+    multiple browser sessions. Each call to `wait` reserves the next free slot,
+    and then sleeps until that slot, without blocking other threads meanwhile.
+
+    Args:
+        rate (float or None):
+            Maximum number of requests per second. None or 0 for no limit.
+
+    Attributes:
+        interval (float):
+            Minimum number of seconds between two requests.
+    """
+
+    def __init__(self, rate: Optional[float]) -> None:
+        """Initializes the RateLimiter."""
+        self.interval = 1 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        """Waits until the next request can be sent."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
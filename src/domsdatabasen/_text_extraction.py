@@ -1,10 +1,27 @@
 """Code to read text from PDFs obtained from domsdatabasen.dk."""
 
+import multiprocessing
+import os
 import re
-import tempfile
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
 from logging import getLogger
+from multiprocessing.pool import Pool
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlparse
 
 import cv2
 import easyocr
@@ -15,20 +32,31 @@ from img2table.document import Image as TableImage
 from img2table.tables.objects.extraction import ExtractedTable, TableCell
 from omegaconf import DictConfig
 from pdf2image import convert_from_path
-from pypdf import PdfReader
+from pypdf import PageObject, PdfReader
 from skimage import measure
 from skimage.filters import rank
 from skimage.measure._regionprops import RegionProperties
 from tika import parser
+from tika import tika as tika_client
 from tqdm import tqdm
 
+from ._checkpoints import PageCheckpoints
 from ._constants import (
     BOX_HEIGHT_LOWER_BOUND,
     DPI,
     LENGTH_SIX_LETTERS,
     NEW_LINE_PIXEL_LENGTH,
+    PDF_OPERATORS_FILL,
+    PDF_OPERATORS_FILL_AND_STROKE,
+    PDF_OPERATORS_FILL_COLOR,
+    PDF_OPERATORS_NOT_CLEAN,
+    PDF_OPERATORS_STROKE,
+    PDF_OPERATORS_STROKE_COLOR,
     TAB_PIXEL_LENGTH,
 )
+from ._ocr_cache import OCRCache
+from ._page_boxes import load_page_boxes, save_page_boxes
+from ._profiling import StageTimer
 
 logger = getLogger(__name__)
 
@@ -45,14 +73,95 @@ class PDFTextReader:
             Config file
         reader (easyocr.Reader):
             Easyocr reader
+        ocr_cache (OCRCache or None):
+            Cache of easyocr results, None if `process.ocr_cache` is False.
+        page_checkpoints (PageCheckpoints or None):
+            Pages read from PDFs that are not fully read yet, None if
+            `process.resume` is False.
+        tika_server_endpoint (str):
+            Endpoint of the Tika server.
+        timer (StageTimer):
+            Time spent in each stage of reading PDFs, e.g. rasterization and OCR.
     """
 
     def __init__(self, config: DictConfig):
         """Initialize PDFTextReader."""
         self.config = config
-        self.reader = easyocr.Reader(["da"], gpu=torch.cuda.is_available())
+        gpu = torch.cuda.is_available()
+        self.reader = easyocr.Reader(["da"], gpu=gpu)
+        self.ocr_cache = (
+            OCRCache(
+                path=Path(config.process.paths.ocr_cache),
+                settings=f"easyocr={easyocr.__version__}|lang=da|gpu={gpu}",
+                max_size_mb=config.process.ocr_cache_max_size_mb,
+            )
+            if config.process.ocr_cache
+            else None
+        )
+        self.page_checkpoints = (
+            PageCheckpoints(path=Path(config.process.paths.page_checkpoints))
+            if config.process.resume
+            and not config.testing
+            and not config.process.page_number
+            else None
+        )
+        self.timer = StageTimer()
+        self._page_pool: Optional[Pool] = None
+
+        # Tika runs in a background thread, such that reading a PDF with Tika
+        # overlaps with reading it with easyocr. The Tika server is started
+        # here, while easyocr is loading, and is used by all worker processes.
+        self.tika_server_endpoint = config.process.tika_server_endpoint
+        self._tika_executor = ThreadPoolExecutor(max_workers=1)
+        self._tika_server: Future = self._tika_executor.submit(
+            self._start_tika_server,
+            client_only=multiprocessing.current_process().daemon,
+        )
+
+    def wait_for_tika_server(self) -> bool:
+        """Waits until the Tika server has been started.
+
+        Must be called before starting worker processes, as they
+        do not start the Tika server themselves.
+
+        Returns:
+            bool:
+                True if the Tika server is running. False otherwise.
+        """
+        return self._tika_server.result()
+
+    def _start_tika_server(self, client_only: bool) -> bool:
+        """Starts a local Tika server, unless it is already running.
+
+        Afterwards, the tika client sends its requests directly to the server,
+        instead of checking if the server is running before every request.
+        The server keeps running after the process exits, such that it
+        can be reused by the next run. If the server could not be started,
+        the client is left to check for the server before every request.
 
-    def extract_text(self, pdf_path: Path) -> dict[Any, Any]:
+        Args:
+            client_only (bool):
+                If True, the server is assumed to be started by another process.
+
+        Returns:
+            bool:
+                True if the Tika server is running. False otherwise.
+        """
+        if not client_only:
+            url = urlparse(self.tika_server_endpoint)
+            try:
+                tika_client.checkTikaServer(
+                    scheme=url.scheme, serverHost=url.hostname, port=url.port
+                )
+            except Exception as e:
+                logger.error(f"Error starting tika server: {e}")
+                return False
+        tika_client.TikaClientOnly = True
+        return True
+
+    def extract_text(
+        self, pdf_path: Path, boxes_path: Optional[Path] = None
+    ) -> dict[Any, Any]:
         """Extracts text from a PDF using easyocr or pypdf.
 
         Some text is anonymized with boxes, and some text
@@ -64,19 +173,36 @@ class PDFTextReader:
         If a page has no anonymization or tables,
         the text is read with pypdf.
 
+        If `process.resume` is True, every page read is checkpointed, such that
+        the pages already read are not read again if reading the PDF is
+        interrupted and started over.
+
         Args:
             pdf_path (Path):
                 Path to PDF.
+            boxes_path (Path, optional):
+                If given, the boxes read on each page are saved here,
+                such that the text can be rebuilt with `relayout`
+                without reading the PDF again.
 
         Returns:
             pdf_data (dict):
                 Data about PDF - which anonymization that is used,
                 and text + extraction method for each page.
         """
+        text_tika = self._tika_executor.submit(
+            self._read_text_with_tika_timed, pdf_path=str(pdf_path)
+        )
         pdf_reader = PdfReader(pdf_path)
+        pdf_key = (
+            PageCheckpoints.pdf_key(pdf_path=pdf_path)
+            if self.page_checkpoints is not None
+            else None
+        )
+        checkpoints = self._load_page_checkpoints(pdf_key=pdf_key)
 
-        images = self._get_images(pdf_path=pdf_path)
         pages: Dict[str, Dict[str, str]] = {}
+        page_boxes: Dict[str, List[dict]] = {}
 
         # I have not seen a single PDF that uses both methods.
         # Try both methods until it is known which method is used.
@@ -84,93 +210,583 @@ class PDFTextReader:
         box_anonymization = True
         underline_anonymization = True
 
-        for i, image in tqdm(enumerate(images), desc="Reading PDF", total=len(images)):
-            page_num = str(i + 1)
-            logger.info(f"Reading page {page_num}")
+        if self._use_page_workers():
+            (
+                pages,
+                page_boxes,
+                box_anonymization,
+                underline_anonymization,
+            ) = self._read_pages_parallel(
+                pdf_path=pdf_path,
+                pdf_reader=pdf_reader,
+                pdf_key=pdf_key,
+                checkpoints=checkpoints,
+            )
+        else:
+            n_pages = 1 if self.config.process.page_number else len(pdf_reader.pages)
+            clean_pages = self._clean_pages(pdf_reader=pdf_reader, n_pages=n_pages)
+            images = self._get_images(
+                pdf_path=pdf_path,
+                page_numbers=[
+                    i + 1
+                    for i in range(n_pages)
+                    if i not in clean_pages and str(i + 1) not in checkpoints
+                ],
+            )
+            for i in tqdm(range(n_pages), desc="Reading PDF"):
+                page_number = str(i + 1)
+                if i in clean_pages:
+                    # No need to rasterize pages without anonymization or tables.
+                    pages[page_number] = self._read_page_with_pypdf(
+                        pdf_reader=pdf_reader, page_idx=i
+                    )
+                    continue
+                if page_number in checkpoints:
+                    (
+                        pages[page_number],
+                        page_boxes[page_number],
+                        box_anonymization_,
+                        underline_anonymization_,
+                    ) = checkpoints[page_number]
+                    box_anonymization = box_anonymization and box_anonymization_
+                    underline_anonymization = (
+                        underline_anonymization and underline_anonymization_
+                    )
+                    continue
+                (
+                    pages[page_number],
+                    page_boxes[page_number],
+                    box_anonymization,
+                    underline_anonymization,
+                ) = self._read_page(
+                    image=next(images),
+                    page_idx=i,
+                    pdf_reader=pdf_reader,
+                    box_anonymization=box_anonymization,
+                    underline_anonymization=underline_anonymization,
+                )
+                self._save_page_checkpoint(
+                    pdf_key=pdf_key,
+                    page_number=page_number,
+                    page=pages[page_number],
+                    boxes=page_boxes[page_number],
+                    box_anonymization=box_anonymization,
+                    underline_anonymization=underline_anonymization,
+                )
+
+        pdf_data = self._pdf_data(
+            pages=pages,
+            box_anonymization=box_anonymization,
+            underline_anonymization=underline_anonymization,
+            text_tika=text_tika.result(),
+        )
+        if boxes_path is not None:
+            save_page_boxes(path=boxes_path, pages=pages, page_boxes=page_boxes)
+        if pdf_key is not None:
+            assert self.page_checkpoints is not None
+            self.page_checkpoints.clear(pdf_key=pdf_key)
+        if self.ocr_cache is not None:
+            self.ocr_cache.log_stats()
+        return pdf_data
+
+    def relayout(self, boxes_path: Path) -> Dict[str, Dict[str, str]]:
+        """Rebuilds the text of the pages of a PDF from its saved boxes.
+
+        No OCR is run, so this is a cheap way of applying changes in the
+        code that orders and joins the boxes to already processed PDFs.
+
+        Args:
+            boxes_path (Path):
+                Path to the boxes saved by `extract_text`.
+
+        Returns:
+            pages (dict):
+                Pages with text and extraction method.
+        """
+        pages, page_boxes = load_page_boxes(path=boxes_path)
+        for page_number, page in pages.items():
+            # Pages read with pypdf have no boxes, and their text is kept as is.
+            if page["extraction_method"] == "easyocr":
+                page_text = self._get_text_from_boxes(boxes=page_boxes[page_number])
+                page["text"] = page_text.strip()
+        return pages
+
+    def _read_page(
+        self,
+        image: np.ndarray,
+        page_idx: int,
+        pdf_reader: PdfReader,
+        box_anonymization: bool,
+        underline_anonymization: bool,
+    ) -> Tuple[Dict[str, str], List[dict], bool, bool]:
+        """Reads the text of a single page.
+
+        Args:
+            image (np.ndarray):
+                Image of the page.
+            page_idx (int):
+                Index of the page (0-indexed).
+            pdf_reader (PdfReader):
+                Reader of the PDF, used if the page has no anonymization or tables.
+            box_anonymization (bool):
+                False if it is known that box anonymization is not used in the PDF.
+            underline_anonymization (bool):
+                False if it is known that underline anonymization is not used
+                in the PDF.
+
+        Returns:
+            page (dict):
+                Text and extraction method of the page.
+            boxes (List[dict]):
+                Boxes the text of the page is built from. Empty if the page
+                is read with pypdf.
+            box_anonymization (bool):
+                Updated `box_anonymization`.
+            underline_anonymization (bool):
+                Updated `underline_anonymization`.
+        """
+        logger.info(f"Reading page {page_idx + 1}")
+
+        page = {
+            "text": "",
+            "extraction_method": "",
+        }
+
+        anonymized_boxes = []
+        anonymized_boxes_underlines = []
+        underlines = []
+        table_boxes = []
+
+        if page_idx == 0:
+            image = self._remove_logo(image=image)
+
+        if box_anonymization:
+            anonymized_boxes = self._extract_anonymized_boxes(image=image)
+
+            # If box anonymization is used, then
+            # don't try to find underline anonymization.
+            if anonymized_boxes:
+                underline_anonymization = False
+
+        if underline_anonymization:
+            (
+                anonymized_boxes_underlines,
+                underlines,
+            ) = self._extract_underline_anonymization_boxes(image=image)
+
+            # If underlines anonymization is used, then
+            # don't try to find box anonymization.
+            if anonymized_boxes_underlines:
+                box_anonymization = False
+
+        # Use a pdf reader if no signs of anonymization are found.
+        if not anonymized_boxes and not anonymized_boxes_underlines:
+            tables = self._find_tables(image=image.copy(), read_tables=False)
+            if not tables:
+                page = self._read_page_with_pypdf(
+                    pdf_reader=pdf_reader, page_idx=page_idx
+                )
+                return page, [], box_anonymization, underline_anonymization
+
+        all_anonymized_boxes = anonymized_boxes + anonymized_boxes_underlines
+
+        image_processed = self._process_image(
+            image=image.copy(),
+            anonymized_boxes=all_anonymized_boxes,
+            underlines=underlines,
+        )
+
+        image_processed_inverted = cv2.bitwise_not(image_processed)
+        table_boxes = self._find_tables(
+            image=image_processed_inverted, read_tables=True
+        )
+
+        image_final = self._remove_tables(
+            image=image_processed, table_boxes=table_boxes
+        )
+
+        main_text_boxes = self._get_main_text_boxes(image=image_final)
+
+        # Merge all boxes and get text from them.
+        all_boxes = (
+            [
+                {**box, "origin": self.config.process.origin_main}
+                for box in main_text_boxes
+            ]
+            + all_anonymized_boxes
+            + [
+                {**box, "origin": self.config.process.origin_table}
+                for box in table_boxes
+            ]
+        )
+        with self.timer.stage("layout"):
+            page_text = self._get_text_from_boxes(boxes=all_boxes)
+
+        page["text"] = page_text.strip()
+        page["extraction_method"] = "easyocr"
+        return page, all_boxes, box_anonymization, underline_anonymization
+
+    def _read_page_with_pypdf(
+        self, pdf_reader: PdfReader, page_idx: int
+    ) -> Dict[str, str]:
+        """Reads the text of a single page with pypdf.
+
+        Args:
+            pdf_reader (PdfReader):
+                Reader of the PDF.
+            page_idx (int):
+                Index of the page (0-indexed).
+
+        Returns:
+            page (dict):
+                Text and extraction method of the page.
+        """
+        with self.timer.stage("pypdf"):
+            page_text = pdf_reader.pages[page_idx].extract_text()
+        page = {
+            "text": page_text.strip(),
+            "extraction_method": "pypdf",
+        }
+        return page
+
+    def _clean_pages(self, pdf_reader: PdfReader, n_pages: int) -> Set[int]:
+        """Finds the pages that can be read with pypdf without rasterizing them.
 
-            pages[page_num] = {
-                "text": "",
-                "extraction_method": "",
+        Args:
+            pdf_reader (PdfReader):
+                Reader of the PDF.
+            n_pages (int):
+                Number of pages in PDF.
+
+        Returns:
+            clean_pages (Set[int]):
+                Indices (0-indexed) of pages that are clean.
+        """
+        if not self.config.process.skip_clean_pages or self.config.process.page_number:
+            return set()
+
+        with self.timer.stage("clean_page_check"):
+            clean_pages = {
+                i
+                for i in range(n_pages)
+                if self._page_is_clean(page=pdf_reader.pages[i])
             }
+        logger.info(f"{len(clean_pages)} of {n_pages} pages are clean")
+        return clean_pages
 
-            anonymized_boxes = []
-            anonymized_boxes_underlines = []
-            underlines = []
-            table_boxes = []
+    def _page_is_clean(self, page: PageObject) -> bool:
+        """Checks if a page can be proven to have no anonymization or tables.
 
-            if i == 0:
-                image = self._remove_logo(image=image)
+        The content stream of the page is inspected. A page is clean if nothing
+        is drawn on it except text and light (e.g. white) fills and strokes.
+        That is, no dark filled rectangles (box anonymization), no dark strokes
+        or thin rectangles (underline anonymization and table rulings),
+        and no images, which might contain any of these.
 
-            if box_anonymization:
-                anonymized_boxes = self._extract_anonymized_boxes(image=image)
+        Args:
+            page (PageObject):
+                Page to check.
 
-                # If box anonymization is used, then
-                # don't try to find underline anonymization.
-                if anonymized_boxes:
-                    underline_anonymization = False
+        Returns:
+            bool:
+                True if page is clean. False otherwise.
+        """
+        annotations = page.get("/Annots") or []
+        if any(
+            annotation.get_object().get("/Subtype") != "/Link"
+            for annotation in annotations
+        ):
+            return False
 
-            if underline_anonymization:
-                (
-                    anonymized_boxes_underlines,
-                    underlines,
-                ) = self._extract_underline_anonymization_boxes(image=image)
-
-                # If underlines anonymization is used, then
-                # don't try to find box anonymization.
-                if anonymized_boxes_underlines:
-                    box_anonymization = False
-
-            # Use a pdf reader if no signs of anonymization are found.
-            if not anonymized_boxes and not anonymized_boxes_underlines:
-                tables = self._find_tables(image=image.copy(), read_tables=False)
-                if not tables:
-                    current_page = pdf_reader.pages[i]
-                    page_text = current_page.extract_text()
-                    pages[page_num]["text"] = page_text.strip()
-                    pages[page_num]["extraction_method"] = "pypdf"
-                    # Continue to next page.
-                    continue
+        try:
+            content = page.get_contents()
+            operations = content.operations if content is not None else []
+        except Exception as e:
+            logger.error(f"Error parsing page content: {e}")
+            return False
+
+        # Initial fill and stroke colors are black.
+        fill_light, stroke_light = False, False
+        stack = []
+        for operands, operator in operations:
+            if operator in PDF_OPERATORS_NOT_CLEAN:
+                return False
+            elif operator == b"q":
+                stack.append((fill_light, stroke_light))
+            elif operator == b"Q":
+                if stack:
+                    fill_light, stroke_light = stack.pop()
+            elif operator in PDF_OPERATORS_FILL_COLOR:
+                fill_light = self._light_color(operands=operands, operator=operator)
+            elif operator in PDF_OPERATORS_STROKE_COLOR:
+                stroke_light = self._light_color(operands=operands, operator=operator)
+            elif operator in PDF_OPERATORS_FILL and not fill_light:
+                return False
+            elif operator in PDF_OPERATORS_STROKE and not stroke_light:
+                return False
+            elif operator in PDF_OPERATORS_FILL_AND_STROKE and not (
+                fill_light and stroke_light
+            ):
+                return False
+        return True
+
+    def _light_color(self, operands: list, operator: bytes) -> bool:
+        """Checks if a color set in a content stream is light.
+
+        Args:
+            operands (list):
+                Operands of the color operator.
+            operator (bytes):
+                Color operator.
+
+        Returns:
+            bool:
+                True if the color is light. False otherwise, also if the color
+                can not be determined (e.g. patterns or a new color space).
+        """
+        if not operands or not all(
+            isinstance(operand, (int, float)) for operand in operands
+        ):
+            return False
+
+        components = [float(operand) for operand in operands]
+        threshold = self.config.process.vector_light_color_min
+        if operator in (b"k", b"K") or len(components) == 4:
+            # CMYK
+            return max(components) <= 1 - threshold
+        # Gray or RGB
+        return min(components) >= threshold
 
-            all_anonymized_boxes = anonymized_boxes + anonymized_boxes_underlines
+    def _use_page_workers(self) -> bool:
+        """Checks if pages should be read in parallel by a pool of page workers.
 
-            image_processed = self._process_image(
-                image=image.copy(),
-                anonymized_boxes=all_anonymized_boxes,
-                underlines=underlines,
+        Page workers are not used when debugging a single page, and they cannot
+        be used from within a worker process of `Processor.process_all`,
+        as worker processes are not allowed to have children.
+
+        Returns:
+            bool:
+                True if pages should be read in parallel. False otherwise.
+        """
+        return (
+            self.config.process.page_workers > 1
+            and not self.config.process.page_number
+            and not multiprocessing.current_process().daemon
+        )
+
+    def _read_pages_parallel(
+        self,
+        pdf_path: Path,
+        pdf_reader: PdfReader,
+        pdf_key: Optional[str],
+        checkpoints: Dict[str, Tuple[Dict[str, str], List[dict], bool, bool]],
+    ) -> Tuple[Dict[str, Dict[str, str]], Dict[str, List[dict]], bool, bool]:
+        """Reads the pages of a PDF in parallel.
+
+        The first pages are read here until the anonymization method is known
+        (or `process.pages_to_determine_anonymization` pages have been read).
+        The remaining pages are then read by the page workers, and the pages
+        are returned in page order.
+
+        Args:
+            pdf_path (Path):
+                Path to PDF.
+            pdf_reader (PdfReader):
+                Reader of the PDF.
+            pdf_key (str or None):
+                Key of the PDF in the page checkpoints, None if pages
+                are not checkpointed.
+            checkpoints (dict):
+                Pages already read, see `PageCheckpoints.load`.
+
+        Returns:
+            pages (dict):
+                Pages with text and extraction method.
+            page_boxes (dict):
+                Boxes read on each page.
+            box_anonymization (bool):
+                True if anonymized boxes are used in PDF. False otherwise.
+            underline_anonymization (bool):
+                True if underlines are used in PDF. False otherwise.
+        """
+        n_pages = len(pdf_reader.pages)
+        clean_pages = self._clean_pages(pdf_reader=pdf_reader, n_pages=n_pages)
+        pages: Dict[str, Dict[str, str]] = {
+            str(i + 1): self._read_page_with_pypdf(pdf_reader=pdf_reader, page_idx=i)
+            for i in clean_pages
+        }
+        page_boxes: Dict[str, List[dict]] = {}
+        box_anonymization = True
+        underline_anonymization = True
+        for page_number, (
+            page,
+            boxes,
+            box_anonymization_,
+            underline_anonymization_,
+        ) in checkpoints.items():
+            pages[page_number] = page
+            page_boxes[page_number] = boxes
+            box_anonymization = box_anonymization and box_anonymization_
+            underline_anonymization = (
+                underline_anonymization and underline_anonymization_
             )
+        page_indices = [
+            i
+            for i in range(n_pages)
+            if i not in clean_pages and str(i + 1) not in checkpoints
+        ]
 
-            image_processed_inverted = cv2.bitwise_not(image_processed)
-            table_boxes = self._find_tables(
-                image=image_processed_inverted, read_tables=True
+        n_read = 0
+        while (
+            n_read < len(page_indices)
+            and n_read < self.config.process.pages_to_determine_anonymization
+            and box_anonymization
+            and underline_anonymization
+        ):
+            page_idx = page_indices[n_read]
+            image = self._get_image(pdf_path=pdf_path, page_number=page_idx + 1)
+            (
+                pages[str(page_idx + 1)],
+                page_boxes[str(page_idx + 1)],
+                box_anonymization,
+                underline_anonymization,
+            ) = self._read_page(
+                image=image,
+                page_idx=page_idx,
+                pdf_reader=pdf_reader,
+                box_anonymization=box_anonymization,
+                underline_anonymization=underline_anonymization,
+            )
+            self._save_page_checkpoint(
+                pdf_key=pdf_key,
+                page_number=str(page_idx + 1),
+                page=pages[str(page_idx + 1)],
+                boxes=page_boxes[str(page_idx + 1)],
+                box_anonymization=box_anonymization,
+                underline_anonymization=underline_anonymization,
             )
+            n_read += 1
 
-            image_final = self._remove_tables(
-                image=image_processed, table_boxes=table_boxes
+        tasks = [
+            (str(pdf_path), i, box_anonymization, underline_anonymization)
+            for i in page_indices[n_read:]
+        ]
+        results = self._get_page_pool().imap(_read_page_in_worker, tasks)
+        for i, (
+            (page, boxes, box_anonymization_, underline_anonymization_),
+            stages,
+        ) in tqdm(
+            zip(page_indices[n_read:], results),
+            desc="Reading PDF",
+            total=len(tasks),
+        ):
+            self.timer.merge(stages=stages)
+            pages[str(i + 1)] = page
+            page_boxes[str(i + 1)] = boxes
+            box_anonymization = box_anonymization and box_anonymization_
+            underline_anonymization = (
+                underline_anonymization and underline_anonymization_
+            )
+            self._save_page_checkpoint(
+                pdf_key=pdf_key,
+                page_number=str(i + 1),
+                page=page,
+                boxes=boxes,
+                box_anonymization=box_anonymization_,
+                underline_anonymization=underline_anonymization_,
             )
 
-            main_text_boxes = self._get_main_text_boxes(image=image_final)
+        # Pages must be in page order, as they are joined in that order.
+        pages = {str(i + 1): pages[str(i + 1)] for i in range(n_pages)}
+        return pages, page_boxes, box_anonymization, underline_anonymization
 
-            # Merge all boxes and get text from them.
-            all_boxes = main_text_boxes + all_anonymized_boxes + table_boxes
-            page_text = self._get_text_from_boxes(boxes=all_boxes)
+    def _load_page_checkpoints(
+        self, pdf_key: Optional[str]
+    ) -> Dict[str, Tuple[Dict[str, str], List[dict], bool, bool]]:
+        """Loads the pages of a PDF read before reading it was interrupted.
 
-            pages[page_num]["text"] = page_text.strip()
-            pages[page_num]["extraction_method"] = "easyocr"
+        Args:
+            pdf_key (str or None):
+                Key of the PDF in the page checkpoints, None if pages
+                are not checkpointed.
 
-        pdf_data = self._pdf_data(
-            pages=pages,
+        Returns:
+            dict:
+                Pages already read, see `PageCheckpoints.load`.
+        """
+        if pdf_key is None:
+            return {}
+        assert self.page_checkpoints is not None
+        checkpoints = self.page_checkpoints.load(pdf_key=pdf_key)
+        if checkpoints:
+            logger.info(f"Resuming PDF with {len(checkpoints)} pages already read")
+        return checkpoints
+
+    def _save_page_checkpoint(
+        self,
+        pdf_key: Optional[str],
+        page_number: str,
+        page: Dict[str, str],
+        boxes: List[dict],
+        box_anonymization: bool,
+        underline_anonymization: bool,
+    ) -> None:
+        """Checkpoints a page that has been read.
+
+        Args:
+            pdf_key (str or None):
+                Key of the PDF in the page checkpoints. Nothing is saved if None.
+            page_number (str):
+                Page number (1-indexed).
+            page (dict):
+                Text and extraction method of the page.
+            boxes (List[dict]):
+                Boxes the text of the page is built from.
+            box_anonymization (bool):
+                `box_anonymization` after the page was read.
+            underline_anonymization (bool):
+                `underline_anonymization` after the page was read.
+        """
+        if pdf_key is None:
+            return
+        assert self.page_checkpoints is not None
+        self.page_checkpoints.save(
+            pdf_key=pdf_key,
+            page_number=page_number,
+            page=page,
+            boxes=boxes,
             box_anonymization=box_anonymization,
             underline_anonymization=underline_anonymization,
-            pdf_path=pdf_path,
         )
-        return pdf_data
+
+    def _get_page_pool(self) -> Pool:
+        """Returns the pool of page workers, and creates it if necessary.
+
+        The pool is kept alive between PDFs, such that every page worker
+        only builds its easyocr reader once.
+
+        Returns:
+            Pool:
+                Pool of page workers.
+        """
+        if self._page_pool is None:
+            self.wait_for_tika_server()
+            page_workers = self.config.process.page_workers
+            # Use spawn, as torch does not play well with forked processes.
+            context = multiprocessing.get_context("spawn")
+            self._page_pool = context.Pool(
+                processes=page_workers,
+                initializer=_init_page_worker,
+                initargs=(self.config, page_workers),
+            )
+        return self._page_pool
 
     def _pdf_data(
         self,
         pages: Dict[str, Dict[str, str]],
         box_anonymization: bool,
         underline_anonymization: bool,
-        pdf_path: Path,
+        text_tika: str,
     ) -> dict[str, Union[str, Dict[str, str]]]:
         """Get data about PDF.
 
@@ -181,8 +797,8 @@ class PDFTextReader:
                 True if anonymized boxes are used in PDF. False otherwise.
             underline_anonymization (bool):
                 True if underlines are used in PDF. False otherwise.
-            pdf_path (Path):
-                Path to PDF.
+            text_tika (str):
+                Text read from PDF with Tika.
 
         Returns:
             pdf_data (dict):
@@ -195,7 +811,7 @@ class PDFTextReader:
         )
         pdf_data["anonymization_method"] = anonymization_method
         pdf_data["pages"] = pages
-        pdf_data["text_tika"] = self._read_text_with_tika(pdf_path=str(pdf_path))
+        pdf_data["text_tika"] = text_tika
         return pdf_data
 
     def _anonymization_used(
@@ -233,7 +849,7 @@ class PDFTextReader:
             main_text_boxes (List[dict]):
                 List of boxes with coordinates and text.
         """
-        result = self.reader.readtext(image=image)
+        result = self._readtext(image=image)
 
         main_text_boxes = [self._change_box_format(easyocr_box=box) for box in result]
         return main_text_boxes
@@ -251,16 +867,14 @@ class PDFTextReader:
             anonymized_boxes_with_text (List[dict]):
                 List of anonymized boxes with coordinates and text.
         """
-        anonymized_boxes = self._find_anonymized_boxes(image=image.copy())
+        with self.timer.stage("box_detection"):
+            anonymized_boxes = self._find_anonymized_boxes(image=image.copy())
 
-        anonymized_boxes_with_text = [
-            self._read_text_from_anonymized_box(
-                image=image.copy(),
-                anonymized_box=anonymized_box,
+            anonymized_boxes_with_text = self._read_text_from_anonymized_boxes(
+                image=image,
+                anonymized_boxes=anonymized_boxes,
                 invert=self.config.process.invert_find_anonymized_boxes,
             )
-            for anonymized_box in anonymized_boxes
-        ]
 
         return anonymized_boxes_with_text
 
@@ -279,55 +893,109 @@ class PDFTextReader:
             underlines (List[tuple]):
                 List of underlines with coordinates.
         """
-        anonymized_boxes_underlines, underlines = self._line_anonymization_to_boxes(
-            image=image.copy(),
-        )
+        with self.timer.stage("underline_detection"):
+            (
+                anonymized_boxes_underlines,
+                underlines,
+            ) = self._line_anonymization_to_boxes(image=image.copy())
 
-        anonymized_boxes_underlines_ = [
-            self._read_text_from_anonymized_box(
-                image.copy(),
-                box,
+            anonymized_boxes_underlines_ = self._read_text_from_anonymized_boxes(
+                image=image,
+                anonymized_boxes=anonymized_boxes_underlines,
                 invert=self.config.process.invert_find_underline_anonymizations,
             )
-            for box in anonymized_boxes_underlines
-        ]
         return anonymized_boxes_underlines_, underlines
 
-    def _get_images(self, pdf_path: Path) -> List[np.ndarray]:
+    def _get_image(self, pdf_path: Path, page_number: int) -> np.ndarray:
+        """Get a single grayscale image from PDF.
+
+        Args:
+            pdf_path (Path):
+                Path to PDF.
+            page_number (int):
+                Page number (1-indexed).
+
+        Returns:
+            image (np.ndarray):
+                Grayscale image of the page.
+        """
+        with self.timer.stage("rasterize"):
+            return self._rasterize(
+                pdf_path=pdf_path, first_page=page_number, last_page=page_number
+            )[0]
+
+    def _get_images(
+        self, pdf_path: Path, page_numbers: List[int]
+    ) -> Iterator[np.ndarray]:
         """Get images from PDF.
 
-        Returns all images from PDF, except if debugging a single page.
-        In that case page self.config.process.page_number is returned.
+        Yields the images of the given pages, except if debugging a single page.
+        In that case page self.config.process.page_number is yielded.
+
+        The pages are rasterized lazily, at most `process.rasterization_window`
+        consecutive pages at a time, such that memory usage does not grow with
+        the number of pages.
 
         Args:
             pdf_path (Path):
                 Path to PDF.
+            page_numbers (List[int]):
+                Page numbers (1-indexed, ascending) of the pages to rasterize.
 
-        Returns:
-            images (List[np.ndarray]):
-                List of images from PDF.
+        Yields:
+            image (np.ndarray):
+                Grayscale image of the next page.
         """
         if self.config.process.page_number:
             # Used for debugging a single page
-            images = list(
-                map(
-                    np.array,
-                    convert_from_path(
-                        pdf_path,
-                        dpi=DPI,
-                        first_page=self.config.process.page_number,
-                        last_page=self.config.process.page_number,
-                    ),
-                )
+            yield self._get_image(
+                pdf_path=pdf_path, page_number=self.config.process.page_number
             )
-        else:
-            images = list(map(np.array, convert_from_path(pdf_path=pdf_path, dpi=DPI)))
+            return
+
+        window = self.config.process.rasterization_window
+        windows: List[List[int]] = []
+        for page_number in page_numbers:
+            if (
+                windows
+                and windows[-1][-1] == page_number - 1
+                and len(windows[-1]) < window
+            ):
+                windows[-1].append(page_number)
+            else:
+                windows.append([page_number])
 
-        # Grayscale
-        images = list(
-            map(lambda image: cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), images)
+        for window_ in windows:
+            # Do not time the pages while they are being read.
+            with self.timer.stage("rasterize"):
+                images = self._rasterize(
+                    pdf_path=pdf_path, first_page=window_[0], last_page=window_[-1]
+                )
+            yield from images
+
+    @staticmethod
+    def _rasterize(pdf_path: Path, first_page: int, last_page: int) -> List[np.ndarray]:
+        """Rasterize a range of pages from PDF to grayscale images.
+
+        Args:
+            pdf_path (Path):
+                Path to PDF.
+            first_page (int):
+                First page to rasterize (1-indexed).
+            last_page (int):
+                Last page to rasterize (inclusive).
+
+        Returns:
+            images (List[np.ndarray]):
+                Grayscale images of the pages.
+        """
+        images = convert_from_path(
+            pdf_path,
+            dpi=DPI,
+            first_page=first_page,
+            last_page=last_page,
         )
-        return images
+        return [cv2.cvtColor(np.array(image), cv2.COLOR_BGR2GRAY) for image in images]
 
     def _find_tables(self, image: np.ndarray, read_tables: bool = False) -> List[dict]:
         """Extract tables from the image.
@@ -344,14 +1012,13 @@ class PDFTextReader:
             table_boxes (List[dict]):
                 List of tables with coordinates and text.
         """
-        with tempfile.NamedTemporaryFile(suffix=".png") as tmp:
-            cv2.imwrite(tmp.name, image)
-            table_image = TableImage(src=tmp.name, detect_rotation=False)
-            try:
+        table_image = _ArrayTableImage(src=b"", array=image, detect_rotation=False)
+        try:
+            with self.timer.stage("table_detection"):
                 tables = table_image.extract_tables()
-            except Exception as e:
-                logger.error(f"Error extracting tables: {e}")
-                return []
+        except Exception as e:
+            logger.error(f"Error extracting tables: {e}")
+            return []
 
         if not read_tables:
             return tables
@@ -559,7 +1226,7 @@ class PDFTextReader:
             text (str):
                 Text from subimage of cell.
         """
-        result = self.reader.readtext(image=crop_refined)
+        result = self._readtext(image=crop_refined)
         if not result:
             text = ""
         else:
@@ -1523,17 +2190,92 @@ class PDFTextReader:
             anonymized_box (dict):
                 Anonymized box with anonymized text.
         """
+        return self._read_text_from_anonymized_boxes(
+            image=image, anonymized_boxes=[anonymized_box], invert=invert
+        )[0]
+
+    def _read_text_from_anonymized_boxes(
+        self,
+        image: np.ndarray,
+        anonymized_boxes: List[dict],
+        invert: bool = False,
+    ) -> List[dict]:
+        """Read text from all anonymized boxes of a page.
+
+        The crops of all the boxes are read with easyocr in one batch,
+        see `_readtext_batch`, and the results are mapped back to their boxes.
+
+        Args:
+            image (np.ndarray):
+                Image of the current page.
+            anonymized_boxes (List[dict]):
+                Anonymized boxes with coordinates.
+            invert (bool):
+                Whether to invert the image or not.
+                Easyocr seems to work best with white text on black background.
+
+        Returns:
+            anonymized_boxes (List[dict]):
+                Anonymized boxes with anonymized text.
+        """
         # Easyocr seems to work best with white text on black background.
         if invert:
             image = cv2.bitwise_not(image)
 
+        crops_per_box = [
+            self._anonymized_box_to_crops(image=image, anonymized_box=anonymized_box)
+            for anonymized_box in anonymized_boxes
+        ]
+
+        crops = [
+            crop
+            for crops_per_word, _ in crops_per_box
+            for crops_to_read in crops_per_word
+            for crop in crops_to_read
+        ]
+        results = iter(self._readtext_batch(crops=crops))
+
+        for anonymized_box, (crops_per_word, split) in zip(
+            anonymized_boxes, crops_per_box
+        ):
+            texts = []
+            for crops_to_read in crops_per_word:
+                results_ = [next(results) for _ in crops_to_read]
+                texts.append(self._text_from_results(results=results_))
+
+            if not split:
+                text = texts[0] if texts else ""
+            else:
+                text = " ".join(text for text in texts if text).strip()
+
+            anonymized_box["text"] = f"<anonym>{text}</anonym>" if text else ""
+
+        return anonymized_boxes
+
+    def _anonymized_box_to_crops(
+        self, image: np.ndarray, anonymized_box: dict
+    ) -> Tuple[List[List[np.ndarray]], bool]:
+        """Get the crops to read text from for an anonymized box.
+
+        Args:
+            image (np.ndarray):
+                Image of the current page (already inverted if necessary).
+            anonymized_box (dict):
+                Anonymized box with coordinates.
+
+        Returns:
+            crops_per_word (List[List[np.ndarray]]):
+                For each word in the box, the crops to read text from.
+                Empty if the box is empty.
+            split (bool):
+                True if the box has been split into multiple words.
+        """
         crop = self._box_to_crop(box=anonymized_box, image=image)
         if self._empty_image(
             image=crop,
             binarize_threshold=self.config.process.threshold_binarize_process_crop,
         ):
-            anonymized_box["text"] = ""
-            return anonymized_box
+            return [], False
 
         crop_cleaned = self._remove_boundary_noise(
             crop=crop.copy(),
@@ -1543,8 +2285,7 @@ class PDFTextReader:
             image=crop_cleaned,
             binarize_threshold=self.config.process.threshold_binarize_process_crop,
         ):
-            anonymized_box["text"] = ""
-            return anonymized_box
+            return [], False
 
         crop_refined, anonymized_box_refined = self._refine_box(
             crop=crop_cleaned,
@@ -1560,8 +2301,7 @@ class PDFTextReader:
             )
             or self._too_small(crop=crop_refined, anonymized_box=anonymized_box_refined)
         ):
-            anonymized_box["text"] = ""
-            return anonymized_box
+            return [], False
 
         # Make a box for each word in the box
         # I get better results with easyocr using this approach.
@@ -1575,11 +2315,9 @@ class PDFTextReader:
                 binary_threshold=self.config.process.threshold_binarize_process_crop,
                 refine_padding=self.config.process.anonymized_box_crop_padding,
             )
-            text = self._read_text_from_crop(crops=crops_to_read)
-            anonymized_box["text"] = f"<anonym>{text}</anonym>" if text else ""
-            return anonymized_box
+            return [crops_to_read], False
 
-        texts = []
+        crops_per_word = []
         for anonymized_box_ in anonymized_boxes:
             crop = self._box_refined_to_crop(
                 box_refined=anonymized_box_, crop_refined=crop_refined
@@ -1595,16 +2333,9 @@ class PDFTextReader:
                 binary_threshold=self.config.process.threshold_binarize_process_crop,
                 refine_padding=self.config.process.anonymized_box_crop_padding,
             )
+            crops_per_word.append(crops_to_read)
 
-            # Read text from image with easyocr
-            text = self._read_text_from_crop(crops=crops_to_read)
-
-            texts.append(text)
-
-        text_all = " ".join(text for text in texts if text).strip()
-
-        anonymized_box["text"] = f"<anonym>{text_all}</anonym>" if text_all else ""
-        return anonymized_box
+        return crops_per_word, True
 
     def _too_small(self, crop: np.ndarray, anonymized_box: dict) -> bool:
         """Determine if crop/box is too small to be classified as relevant.
@@ -1642,7 +2373,22 @@ class PDFTextReader:
         """
         if not crops:
             return ""
-        results = [self.reader.readtext(crop) for crop in crops]
+        results = self._readtext_batch(crops=crops)
+        return self._text_from_results(results=results, cell=cell)
+
+    def _text_from_results(self, results: List[List[tuple]], cell: bool = False) -> str:
+        """Get text from the easyocr results of the crops of a box.
+
+        Args:
+            results (List[List[tuple]]):
+                Results from easyocr, one for each crop of the box.
+            cell (bool):
+                Whether crops are cells or not.
+
+        Returns:
+            text (str):
+                Text from crop.
+        """
         if not any(results):
             return ""
         if len(results) > 1:
@@ -1672,6 +2418,185 @@ class PDFTextReader:
         )
         return text
 
+    def _readtext_batch(self, crops: List[np.ndarray]) -> List[List[tuple]]:
+        """Read text from multiple crops with easyocr.
+
+        If `process.ocr_recognition_only` is True, only the recognizer is used
+        (with detection as fallback), else both detection and recognition is used.
+
+        Args:
+            crops (List[np.ndarray]):
+                Crops to read text from.
+
+        Returns:
+            results (List[List[tuple]]):
+                Result from easyocr for each crop.
+        """
+        if self.config.process.ocr_recognition_only:
+            return self._recognize_crops(crops=crops)
+        return self._detect_and_recognize_batch(crops=crops)
+
+    def _recognize_crops(self, crops: List[np.ndarray]) -> List[List[tuple]]:
+        """Read text from multiple crops with the easyocr recognizer only.
+
+        The crops are already localized tightly around the text, so the text
+        detector is skipped, and the full extent of each crop is used as the
+        text box. Crops where recognition fails (an error, no text or low
+        confidence) are read again with detection, see
+        `_detect_and_recognize_batch`.
+
+        Each crop is recognized on its own, as the easyocr recognizer pads all
+        crops read together to the width of the widest crop, which can change
+        the text read.
+
+        Args:
+            crops (List[np.ndarray]):
+                Crops to read text from.
+
+        Returns:
+            results (List[List[tuple]]):
+                Result from easyocr for each crop.
+        """
+        results = self._ocr(
+            method="recognize",
+            images=crops,
+            read_function=lambda images: [self._recognize(image) for image in images],
+        )
+
+        failed = [
+            i
+            for i, result in enumerate(results)
+            if not result
+            or not result[0][1].strip()
+            or result[0][2] < self.config.process.ocr_recognition_only_confidence_min
+        ]
+        if failed:
+            results_failed = self._detect_and_recognize_batch(
+                crops=[crops[i] for i in failed]
+            )
+            for i, result in zip(failed, results_failed):
+                results[i] = result
+        return results
+
+    def _recognize(self, image: np.ndarray) -> List[tuple]:
+        """Read text from an image with `reader.recognize`.
+
+        Args:
+            image (np.ndarray):
+                Image to read text from.
+
+        Returns:
+            result (List[tuple]):
+                Result from easyocr. Empty if the recognizer failed.
+        """
+        try:
+            return self.reader.recognize(image)
+        except Exception as e:
+            logger.warning(f"Error recognizing text: {e}")
+            return []
+
+    def _detect_and_recognize_batch(self, crops: List[np.ndarray]) -> List[List[tuple]]:
+        """Read text from multiple crops with easyocr (detection and recognition).
+
+        Easyocr can only read a batch of images of the same size. Therefore
+        crops with exactly the same shape are read together,
+        `process.ocr_batch_size` crops at a time. The crops are not padded or
+        resized, so the result of a crop is the same as when it is read alone.
+
+        Args:
+            crops (List[np.ndarray]):
+                Crops to read text from.
+
+        Returns:
+            results (List[List[tuple]]):
+                Result from easyocr for each crop.
+        """
+        batch_size = self.config.process.ocr_batch_size
+        if batch_size <= 1:
+            return [self._readtext(image=crop) for crop in crops]
+
+        batches: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        for i, crop in enumerate(crops):
+            batches[crop.shape].append(i)
+
+        results: List[List[tuple]] = [[] for _ in crops]
+        for indices in batches.values():
+            for j in range(0, len(indices), batch_size):
+                batch = indices[j : j + batch_size]
+                # Results of `readtext` and `readtext_batched` are the same,
+                # so they share cache entries.
+                batch_results = self._ocr(
+                    method="readtext",
+                    images=[crops[i] for i in batch],
+                    read_function=self._readtext_batched,
+                )
+                for i, result in zip(batch, batch_results):
+                    results[i] = result
+        return results
+
+    def _readtext(self, image: np.ndarray) -> List[tuple]:
+        """Read text from an image with `reader.readtext`.
+
+        Args:
+            image (np.ndarray):
+                Image to read text from.
+
+        Returns:
+            result (List[tuple]):
+                Result from easyocr.
+        """
+        return self._ocr(
+            method="readtext",
+            images=[image],
+            read_function=lambda images: [self.reader.readtext(images[0])],
+        )[0]
+
+    def _readtext_batched(self, images: List[np.ndarray]) -> List[List[tuple]]:
+        """Read text from images of the same size with `reader.readtext_batched`.
+
+        Args:
+            images (List[np.ndarray]):
+                Images to read text from.
+
+        Returns:
+            results (List[List[tuple]]):
+                Result from easyocr for each image.
+        """
+        if len(images) == 1:
+            return [self.reader.readtext(images[0])]
+        return self.reader.readtext_batched(images)
+
+    def _ocr(
+        self,
+        method: str,
+        images: List[np.ndarray],
+        read_function: Callable[[List[np.ndarray]], List[list]],
+    ) -> List[list]:
+        """Read images with easyocr, through the OCR cache if it is enabled.
+
+        Args:
+            method (str):
+                Name of the easyocr method used to read the images.
+            images (List[np.ndarray]):
+                Images to read.
+            read_function (Callable):
+                Function reading a list of images with easyocr.
+
+        Returns:
+            results (List[list]):
+                Result from easyocr for each image.
+        """
+        with self.timer.stage(
+            "ocr",
+            crops=len(images),
+            pixels=sum(image.size for image in images),
+        ):
+            if self.ocr_cache is None:
+                return read_function(images)
+            return self.ocr_cache.read(
+                method=method, images=images, read_function=read_function
+            )
+
     def _best_result(self, results: List[List[tuple]]) -> List[tuple]:
         """Returns the best result.
 
@@ -2849,13 +3774,31 @@ class PDFTextReader:
         padded[p:-p, p:-p] = image
         return padded
 
+    def _read_text_with_tika_timed(self, pdf_path: str) -> str:
+        """Read text from pdf with tika, timed as the stage "tika".
+
+        Args:
+            pdf_path (str):
+                Path to pdf.
+
+        Returns:
+            str:
+                Text from pdf.
+        """
+        with self.timer.stage("tika"):
+            return self._read_text_with_tika(
+                pdf_path=pdf_path, server_endpoint=self.tika_server_endpoint
+            )
+
     @staticmethod
-    def _read_text_with_tika(pdf_path: str) -> str:
+    def _read_text_with_tika(pdf_path: str, server_endpoint: str) -> str:
         """Read text from pdf with tika.
 
         Args:
             pdf_path (str):
                 Path to pdf.
+            server_endpoint (str):
+                Endpoint of the Tika server.
 
         Returns:
             str:
@@ -2864,7 +3807,11 @@ class PDFTextReader:
         request_options = {"timeout": 300}
         text = ""
         try:
-            result = parser.from_file(pdf_path, requestOptions=request_options)
+            result = parser.from_file(
+                pdf_path,
+                serverEndpoint=server_endpoint,
+                requestOptions=request_options,
+            )
             if result["status"] == 200:
                 text = result["content"]
         except Exception as e:
@@ -2886,6 +3833,101 @@ class PDFTextReader:
         pdf_text = "\n\n".join(page["text"] for page in pages.values())
         return pdf_text
 
+    def __del__(self):
+        """Closes the pool of page workers and the Tika thread."""
+        page_pool = getattr(self, "_page_pool", None)
+        if page_pool is not None:
+            page_pool.terminate()
+        tika_executor = getattr(self, "_tika_executor", None)
+        if tika_executor is not None:
+            tika_executor.shutdown(wait=False)
+
+
+@dataclass
+class _ArrayTableImage(TableImage):
+    """Image for img2table, given as an in-memory grayscale image.
+
+    img2table decodes the image from `src`. Here the image is used as is,
+    which saves encoding it to PNG and decoding it again.
+    PNG is lossless, so the tables found are the same.
+
+    This overrides internals of img2table, which is therefore pinned to
+    1.2.x in pyproject.toml.
+    """
+
+    array: Optional[np.ndarray] = None
+
+    def validate_array(self, value, **_) -> np.ndarray:
+        """Validates the image (called by img2table)."""
+        if not isinstance(value, np.ndarray) or value.ndim != 2:
+            raise TypeError("Image must be a 2D numpy array (grayscale)")
+        return value.astype(np.uint8, copy=False)
+
+    @cached_property
+    def images(self) -> List[np.ndarray]:
+        """Pages of the document, i.e. the image itself."""
+        return [self.array]
+
+
+# Reader and last opened PDF used by a page worker, see
+# `PDFTextReader._read_pages_parallel`.
+_worker_reader: Optional[PDFTextReader] = None
+_worker_pdf: Tuple[str, Optional[PdfReader]] = ("", None)
+
+
+def _init_page_worker(config: DictConfig, page_workers: int) -> None:
+    """Initializes a page worker with its own PDFTextReader.
+
+    Args:
+        config (DictConfig):
+            Config file
+        page_workers (int):
+            Number of page workers. Used to divide the CPU threads
+            between the page workers.
+    """
+    global _worker_reader
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // page_workers))
+    _worker_reader = PDFTextReader(config=config)
+
+
+def _read_page_in_worker(
+    task: Tuple[str, int, bool, bool]
+) -> Tuple[Tuple[Dict[str, str], List[dict], bool, bool], Dict[str, Dict[str, float]]]:
+    """Reads a single page in a page worker.
+
+    Args:
+        task (tuple):
+            Path to PDF, index of the page, `box_anonymization` and
+            `underline_anonymization`.
+
+    Returns:
+        result (tuple):
+            Page, boxes, and updated `box_anonymization` and
+            `underline_anonymization`, as returned by `PDFTextReader._read_page`.
+        stages (dict):
+            Time spent in each stage of reading the page, see `StageTimer`.
+    """
+    global _worker_pdf
+    assert _worker_reader is not None, "Page worker has not been initialized"
+    pdf_path, page_idx, box_anonymization, underline_anonymization = task
+
+    # Pages of the same PDF are usually sent to the same worker in a row,
+    # so keep the last opened PDF around.
+    if _worker_pdf[0] != pdf_path:
+        _worker_pdf = (pdf_path, PdfReader(pdf_path))
+    pdf_reader = _worker_pdf[1]
+
+    _worker_reader.timer.reset()
+    image = _worker_reader._get_image(pdf_path=Path(pdf_path), page_number=page_idx + 1)
+    result = _worker_reader._read_page(
+        image=image,
+        page_idx=page_idx,
+        pdf_reader=pdf_reader,
+        box_anonymization=box_anonymization,
+        underline_anonymization=underline_anonymization,
+    )
+    return result, _worker_reader.timer.summary()
+
 
 def save_cv2_image_tmp(image):
     """Saves image to tmp.png.
@@ -1,12 +1,16 @@
 """Utility function for the domsdatabasen package."""
 
 import json
-from typing import List
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
 
 import jsonlines
+import numpy as np
 
 
-def save_dict_to_json(dict_, file_path) -> None:
+def save_dict_to_json(dict_, file_path, indent: Optional[int] = 4) -> None:
     """Saves a dictionary to a json file.
 
     Args:
@@ -14,9 +18,35 @@ def save_dict_to_json(dict_, file_path) -> None:
             Dictionary to save
         file_path (Path):
             Path to json file
+        indent (int or None):
+            Indentation of the json file. None for compact json.
     """
     with open(file_path, "w") as f:
-        json.dump(dict_, f, indent=4)
+        json.dump(dict_, f, indent=indent)
+
+
+def json_default(obj):
+    """Serializes the numpy values in results read with easyocr.
+
+    Used as the `default` of `json.dumps`.
+
+    Args:
+        obj (np.ndarray or np.generic):
+            Value that `json` can not serialize itself.
+
+    Returns:
+        list, int, float or bool:
+            The value as plain Python.
+
+    Raises:
+        TypeError:
+            If the value is not a numpy value.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj)}")
 
 
 def read_json(file_path) -> dict:
@@ -30,31 +60,37 @@ def read_json(file_path) -> dict:
         return json.load(f)
 
 
-def init_jsonl(file_name: str) -> None:
-    """Initializes jsonl file.
-
-    The function is used in the DataSetBuilder class to initialize
-    the dataset file, if it does not already exist.
-
-    Args:
-        file_name (str):
-            File name to initialize.
-    """
-    with open(file_name, "w") as _:
-        pass
-
+@contextmanager
+def atomic_writer(file_name: Path, buffer_size: int) -> Iterator[BinaryIO]:
+    """Opens a file for writing, which is only replaced if writing succeeds.
 
-def append_jsonl(data: dict, file_name: str) -> None:
-    """Appends data to jsonl file.
+    The function is used in the DatasetBuilder class to write the dataset.
+    Data is written through a single buffered binary file to a temporary file
+    next to `file_name`, which is renamed to `file_name` when all data has been
+    written. Thus, `file_name` is never left half-written.
 
     Args:
-        data (dict):
-            Data to append.
-        file_name (str):
-            The name of the JSONL file where the data should be appended.
+        file_name (Path):
+            File name to write.
+        buffer_size (int):
+            Size of the write buffer in bytes. The buffer is flushed to disk
+            whenever it is full.
+
+    Yields:
+        BinaryIO:
+            File to write the data to.
     """
-    with jsonlines.open(file_name, mode="a") as writer:
-        writer.write(data)
+    file_name = Path(file_name)
+    file_name_tmp = file_name.with_name(file_name.name + ".tmp")
+    try:
+        with open(file_name_tmp, "wb", buffering=buffer_size) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(file_name_tmp, file_name)
+    finally:
+        if file_name_tmp.exists():
+            file_name_tmp.unlink()
 
 
 def load_jsonl(file_name: str) -> List[dict]:
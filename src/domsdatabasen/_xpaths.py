@@ -6,6 +6,8 @@ XPATHS = {
     "Fejlkode 404": "//h1[contains(text(), 'Fejlkode 404')]",
     "Accept cookies": "//a[@id='CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll']",
     "Øvrige sagsoplysninger": "//span[@class='accordion-title'][contains(text(), 'Øvrige sagsoplysninger')]",
+    # Heading of the last field in "Øvrige sagsoplysninger", which is shown even if the field is empty.
+    "Sagskomplekser": "//h4[contains(text(), 'Sagskomplekser')]",
     "Sagen er ikke tilgængelig": "//h1[contains(text(), 'Sagen er ikke tilgængelig')]",
     "Dato": "//tr[@tabindex='0']//td[1]",
 }
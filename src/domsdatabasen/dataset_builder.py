@@ -1,20 +1,33 @@
 """DatasetBuilder to build the final dataset."""
 
 
+import json
+import multiprocessing
+import os
 import re
+from contextlib import ExitStack
 from logging import getLogger
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
+import jsonlines
 from omegaconf import DictConfig
 
-from domsdatabasen._utils import append_jsonl, init_jsonl, read_json
+from domsdatabasen._case_index import open_case_index
+from domsdatabasen._change_feed import ChangeFeed
+from domsdatabasen._parquet import ParquetDatasetWriter
+from domsdatabasen._processed_store import get_processed_store
+from domsdatabasen._utils import atomic_writer, read_json
 
 logger = getLogger(__name__)
 
 
-class DatasetBuilder:
-    """DatasetBuilder to build the final dataset.
+class DatasetSampleReader:
+    """Reads processed cases and makes dataset samples from them.
+
+    Holds only what is needed to make a dataset sample, such that worker
+    processes can make samples without opening the case index or the change
+    feed of a `DatasetBuilder`.
 
     Args:
         config (DictConfig):
@@ -25,49 +38,32 @@ class DatasetBuilder:
             Configuration object.
         data_processed_dir (Path):
             Path to processed data directory.
-        data_final_dir (Path):
-            Path to final data directory.
-        dataset_path (Path):
-            Path to the dataset file.
+        processed_store (ProcessedStore):
+            Storage of processed data, see `processed_store.backend`.
     """
 
     def __init__(self, config: DictConfig) -> None:
-        """Initializes the DatasetBuilder."""
+        """Initializes the DatasetSampleReader."""
         self.config = config
         self.data_processed_dir = Path(config.paths.data_processed_dir)
-        self.data_final_dir = Path(config.paths.data_final_dir)
-        self.dataset_path = self.data_final_dir / config.file_names.dataset
-
-    def build_dataset(self) -> None:
-        """Build the final dataset."""
-        if self.dataset_path.exists() and not self.config.finalize.force:
-            logger.info(
-                f"Dataset already exists at {self.dataset_path}."
-                "Use 'finalize.force=True' to overwrite."
-            )
-            return
-
-        logger.info("Initializing dataset with path: {dataset_path}")
-        init_jsonl(file_name=self.dataset_path)
-
-        processed_case_paths = [
-            case_path
-            for case_path in self.data_processed_dir.iterdir()
-            if case_path.is_dir()
-        ]
-        logger.info(
-            f"Found {len(processed_case_paths)} cases in {self.data_processed_dir}"
+        self.processed_store = get_processed_store(
+            config=config, dir_path=self.data_processed_dir
         )
 
-        # Process cases in ascending order
-        processed_case_paths = sorted(processed_case_paths, key=lambda p: int(p.stem))
-        for path in processed_case_paths:
-            logger.info(f"Processing case {path.stem}...")
-            processed_data = read_json(path / self.config.file_names.processed_data)
-            dataset_sample = self.make_dataset_sample(processed_data=processed_data)
-            append_jsonl(data=dataset_sample, file_name=self.dataset_path)
+    def _read_dataset_sample(self, case_id: str) -> dict:
+        """Reads a processed case and makes a dataset sample from it.
 
-        logger.info(f"Dataset saved at {self.dataset_path}")
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            dataset_sample (dict):
+                Dataset sample.
+        """
+        logger.info(f"Processing case {case_id}...")
+        processed_data = self.processed_store.load(case_id=case_id)
+        return self.make_dataset_sample(processed_data=processed_data)
 
     def make_dataset_sample(self, processed_data: dict) -> dict:
         """Make a dataset sample from processed data.
@@ -160,3 +156,416 @@ class DatasetBuilder:
         """
         pdf_text = "\n\n".join(page["text"] for page in pages.values())
         return pdf_text
+
+
+class DatasetBuilder(DatasetSampleReader):
+    """DatasetBuilder to build the final dataset.
+
+    Args:
+        config (DictConfig):
+            Configuration object.
+
+    Attributes:
+        config (DictConfig):
+            Configuration object.
+        data_processed_dir (Path):
+            Path to processed data directory.
+        processed_store (ProcessedStore):
+            Storage of processed data, see `processed_store.backend`.
+        case_index (CaseIndex):
+            Index of the status of each case.
+        change_feed (ChangeFeed):
+            Feed of the cases saved by the Scraper.
+        data_final_dir (Path):
+            Path to final data directory.
+        dataset_path (Path):
+            Path to the dataset file.
+        parquet_dir (Path):
+            Path to the directory with the Parquet shards of the dataset.
+        manifest_path (Path):
+            Path to the manifest of the dataset, used to update it incrementally.
+    """
+
+    def __init__(self, config: DictConfig) -> None:
+        """Initializes the DatasetBuilder."""
+        super().__init__(config=config)
+        self.case_index = open_case_index(
+            config=config,
+            data_raw_dir=Path(config.paths.data_raw_dir),
+            processed_store=self.processed_store,
+        )
+        self.change_feed = ChangeFeed(path=Path(config.paths.change_feed))
+        self.data_final_dir = Path(config.paths.data_final_dir)
+        self.dataset_path = self.data_final_dir / config.file_names.dataset
+        self.parquet_dir = self.data_final_dir / config.file_names.parquet_dir
+        self.manifest_path = self.data_final_dir / config.file_names.manifest
+
+    def build_dataset(self) -> None:
+        """Build the final dataset.
+
+        If `finalize.incremental` is True and the dataset has been built before,
+        only new and changed cases are read, see `_update_dataset`. If
+        `finalize.from_change_feed` is also True, only the cases in the change
+        feed are checked for changes, instead of all processed cases.
+        """
+        force = self.config.finalize.force
+        incremental = self.config.finalize.incremental
+
+        if self.dataset_path.exists() and not force and not incremental:
+            logger.info(
+                f"Dataset already exists at {self.dataset_path}."
+                "Use 'finalize.force=True' to overwrite."
+            )
+            return
+
+        manifest = self._read_manifest() if incremental and not force else None
+
+        feed_offset = None
+        if self.config.finalize.from_change_feed:
+            # Only the cases the Processor is done with are read from the feed.
+            feed_case_ids, feed_offset = self.change_feed.read(
+                consumer="finalize",
+                until=self.change_feed.offset(consumer="process"),
+            )
+
+        if manifest is not None and feed_offset is not None:
+            logger.info(f"Found {len(feed_case_ids)} new or changed cases in the feed")
+            # All other cases are unchanged since the dataset was built.
+            case_stats = {
+                case_id: tuple(case["stat"])
+                for case_id, case in manifest["cases"].items()
+            }
+            for case_id in feed_case_ids:
+                if self.processed_store.exists(case_id=case_id):
+                    case_stats[case_id] = self.processed_store.stat(case_id=case_id)
+            case_ids = sorted(case_stats, key=lambda case_id: int(case_id))
+        else:
+            case_ids = self.processed_store.case_ids()
+            logger.info(f"Found {len(case_ids)} cases in {self.data_processed_dir}")
+            # Get the state of the processed cases before reading any of them.
+            case_stats = {
+                case_id: self.processed_store.stat(case_id=case_id)
+                for case_id in case_ids
+            }
+
+        # The manifest is removed while the dataset is written, such that the
+        # dataset is built from scratch next time, if writing fails.
+        self.data_final_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.unlink(missing_ok=True)
+
+        if manifest is None:
+            logger.info(f"Writing dataset to {self.dataset_path}")
+            manifest = self._write_dataset(case_ids=case_ids, case_stats=case_stats)
+        else:
+            manifest = self._update_dataset(
+                case_ids=case_ids,
+                case_stats=case_stats,
+                manifest=manifest,
+            )
+
+        self._save_manifest(manifest=manifest)
+        self.case_index.set_finalized(case_ids=manifest["cases"])
+        if feed_offset is not None:
+            self.change_feed.commit(consumer="finalize", offset=feed_offset)
+        logger.info(f"Dataset saved at {self.dataset_path}")
+
+    def _update_dataset(
+        self,
+        case_ids: List[str],
+        case_stats: Dict[str, Tuple[int, int]],
+        manifest: dict,
+    ) -> dict:
+        """Updates the dataset with new and changed cases.
+
+        If all new cases come after the cases in the dataset, and no cases have
+        changed or been removed, the new cases are appended to the dataset.
+        Otherwise, the dataset is rewritten, where the lines of unchanged cases
+        are copied from the existing dataset.
+
+        Args:
+            case_ids (List[str]):
+                IDs of processed cases, in ascending order.
+            case_stats (dict):
+                State of the processed data of each case, see `ProcessedStore.stat`.
+            manifest (dict):
+                Manifest of the existing dataset.
+
+        Returns:
+            manifest (dict):
+                Manifest of the updated dataset.
+        """
+        cases = manifest["cases"]
+        changed_case_ids = {
+            case_id
+            for case_id, stat in case_stats.items()
+            # The states are stored as lists in the manifest.
+            if case_id not in cases or tuple(cases[case_id]["stat"]) != stat
+        }
+        removed_case_ids = set(cases) - set(case_stats)
+        logger.info(
+            f"{len(changed_case_ids)} new or changed cases, "
+            f"{len(removed_case_ids)} removed cases"
+        )
+        if not changed_case_ids and not removed_case_ids:
+            logger.info("Dataset is up to date.")
+            return manifest
+
+        last_case_id = max((int(case_id) for case_id in cases), default=-1)
+        only_new_cases_at_end = not removed_case_ids and all(
+            case_id not in cases and int(case_id) > last_case_id
+            for case_id in changed_case_ids
+        )
+        # Parquet shards can not be appended to, so they are always rewritten.
+        if only_new_cases_at_end and not self.config.finalize.parquet:
+            logger.info(f"Appending new cases to {self.dataset_path}")
+            return self._append_to_dataset(
+                case_ids=[
+                    case_id for case_id in case_ids if case_id in changed_case_ids
+                ],
+                case_stats=case_stats,
+                manifest=manifest,
+            )
+
+        logger.info(f"Rewriting dataset at {self.dataset_path}")
+        return self._write_dataset(
+            case_ids=case_ids,
+            case_stats=case_stats,
+            manifest=manifest,
+            changed_case_ids=changed_case_ids,
+        )
+
+    def _write_dataset(
+        self,
+        case_ids: List[str],
+        case_stats: Dict[str, Tuple[int, int]],
+        manifest: Optional[dict] = None,
+        changed_case_ids: Optional[Set[str]] = None,
+    ) -> dict:
+        """Writes the dataset, and the Parquet shards if `finalize.parquet` is True.
+
+        The dataset is written to a temporary file, which replaces the existing
+        dataset when all cases have been written.
+
+        Args:
+            case_ids (List[str]):
+                IDs of processed cases, in ascending order.
+            case_stats (dict):
+                State of the processed data of each case, see `ProcessedStore.stat`.
+            manifest (dict, optional):
+                Manifest of the existing dataset. If given, the lines of cases
+                in the manifest, which are not in `changed_case_ids`, are copied
+                from the existing dataset instead of being built again.
+            changed_case_ids (Set[str], optional):
+                IDs of new and changed cases.
+
+        Returns:
+            manifest (dict):
+                Manifest of the written dataset.
+        """
+        cases_old = manifest["cases"] if manifest is not None else {}
+        case_ids_to_copy = set(cases_old) - (changed_case_ids or set())
+        dataset_samples = self._dataset_samples(
+            case_ids=[
+                case_id for case_id in case_ids if case_id not in case_ids_to_copy
+            ]
+        )
+
+        cases = {}
+        offset = 0
+        with ExitStack() as stack:
+            f = stack.enter_context(
+                atomic_writer(
+                    file_name=self.dataset_path,
+                    buffer_size=self.config.finalize.write_buffer_mb * 1024**2,
+                )
+            )
+            jsonl_writer = jsonlines.Writer(f)
+            parquet_writer = (
+                stack.enter_context(
+                    ParquetDatasetWriter(
+                        dir_path=self.parquet_dir,
+                        shard_size=self.config.finalize.parquet_shard_size,
+                        row_group_size=self.config.finalize.parquet_row_group_size,
+                        compression=self.config.finalize.parquet_compression,
+                    )
+                )
+                if self.config.finalize.parquet
+                else None
+            )
+            dataset_old = (
+                stack.enter_context(open(self.dataset_path, "rb"))
+                if case_ids_to_copy
+                else None
+            )
+
+            for case_id in case_ids:
+                if dataset_old is not None and case_id in case_ids_to_copy:
+                    # Copy the line of an unchanged case as is.
+                    dataset_old.seek(cases_old[case_id]["offset"])
+                    line = dataset_old.read(cases_old[case_id]["length"])
+                    length = f.write(line)
+                    if parquet_writer is not None:
+                        parquet_writer.write(json.loads(line))
+                else:
+                    dataset_sample = next(dataset_samples)
+                    length = jsonl_writer.write(dataset_sample)
+                    if parquet_writer is not None:
+                        parquet_writer.write(dataset_sample)
+
+                cases[case_id] = {
+                    "stat": case_stats[case_id],
+                    "offset": offset,
+                    "length": length,
+                }
+                offset += length
+
+        return {"dataset_size": offset, "cases": cases}
+
+    def _append_to_dataset(
+        self,
+        case_ids: List[str],
+        case_stats: Dict[str, Tuple[int, int]],
+        manifest: dict,
+    ) -> dict:
+        """Appends new cases to the dataset.
+
+        If appending fails, the dataset is truncated to its size before appending,
+        such that it still matches the manifest.
+
+        Args:
+            case_ids (List[str]):
+                IDs of new processed cases, in ascending order.
+            case_stats (dict):
+                State of the processed data of each case, see `ProcessedStore.stat`.
+            manifest (dict):
+                Manifest of the existing dataset.
+
+        Returns:
+            manifest (dict):
+                Manifest of the updated dataset.
+        """
+        offset = manifest["dataset_size"]
+        cases = {}
+        try:
+            with open(
+                self.dataset_path,
+                "ab",
+                buffering=self.config.finalize.write_buffer_mb * 1024**2,
+            ) as f:
+                jsonl_writer = jsonlines.Writer(f)
+                dataset_samples = self._dataset_samples(case_ids=case_ids)
+                for case_id, dataset_sample in zip(case_ids, dataset_samples):
+                    length = jsonl_writer.write(dataset_sample)
+                    cases[case_id] = {
+                        "stat": case_stats[case_id],
+                        "offset": offset,
+                        "length": length,
+                    }
+                    offset += length
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            # Remove the lines appended so far, including a partial last line.
+            with open(self.dataset_path, "r+b") as f:
+                f.truncate(manifest["dataset_size"])
+            raise
+
+        manifest["cases"].update(cases)
+        manifest["dataset_size"] = offset
+        return manifest
+
+    def _read_manifest(self) -> Optional[dict]:
+        """Reads the manifest of the existing dataset.
+
+        The manifest contains the size of the dataset in bytes, and for each
+        case the state of its processed data (see `ProcessedStore.stat`) and the offset
+        and length (in bytes) of its line in the dataset.
+
+        Returns:
+            manifest (dict or None):
+                Manifest, None if there is no valid manifest.
+        """
+        if not self.manifest_path.exists() or not self.dataset_path.exists():
+            logger.info("No manifest found. Building the full dataset.")
+            return None
+
+        manifest = read_json(self.manifest_path)
+        if self.dataset_path.stat().st_size != manifest["dataset_size"]:
+            logger.warning(
+                "Dataset does not match its manifest. Building the full dataset."
+            )
+            return None
+        return manifest
+
+    def _save_manifest(self, manifest: dict) -> None:
+        """Saves the manifest of the dataset.
+
+        Args:
+            manifest (dict):
+                Manifest.
+        """
+        with atomic_writer(file_name=self.manifest_path, buffer_size=-1) as f:
+            f.write(json.dumps(manifest).encode())
+
+    def _dataset_samples(self, case_ids: List[str]) -> Iterator[dict]:
+        """Yields the dataset samples of processed cases in the given order.
+
+        If `finalize.workers` is larger than 1, the processed cases are read and
+        turned into dataset samples in parallel by a pool of worker processes.
+
+        Args:
+            case_ids (List[str]):
+                IDs of processed cases.
+
+        Yields:
+            dataset_sample (dict):
+                Dataset sample.
+        """
+        workers = self.config.finalize.workers
+        if workers <= 1:
+            for case_id in case_ids:
+                yield self._read_dataset_sample(case_id=case_id)
+            return
+
+        logger.info(f"Building dataset with {workers} workers...")
+        # Use spawn, like the Processor, as the package imports torch.
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            processes=workers, initializer=_init_worker, initargs=(self.config,)
+        ) as pool:
+            # `imap` returns the samples in the order of the cases.
+            yield from pool.imap(
+                _read_dataset_sample_in_worker,
+                case_ids,
+                chunksize=self.config.finalize.chunk_size,
+            )
+
+
+# Reader used by a worker process in `DatasetBuilder._dataset_samples`.
+_worker_reader: Optional[DatasetSampleReader] = None
+
+
+def _init_worker(config: DictConfig) -> None:
+    """Initializes a worker process with its own DatasetSampleReader.
+
+    Args:
+        config (DictConfig):
+            Configuration object.
+    """
+    global _worker_reader
+    _worker_reader = DatasetSampleReader(config=config)
+
+
+def _read_dataset_sample_in_worker(case_id: str) -> dict:
+    """Reads a processed case and makes a dataset sample from it in a worker.
+
+    Args:
+        case_id (str):
+            Case ID
+
+    Returns:
+        dataset_sample (dict):
+            Dataset sample.
+    """
+    assert _worker_reader is not None, "Worker has not been initialized"
+    return _worker_reader._read_dataset_sample(case_id=case_id)
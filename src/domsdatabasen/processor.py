@@ -1,23 +1,33 @@
 """Processor for scraped data from domsdatabasen.dk."""
 
+import multiprocessing
 import os
 import time
 from logging import getLogger
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import torch
 from omegaconf import DictConfig
 
-from ._constants import N_FILES_PROCESSED_CASE_DIR, N_FILES_RAW_CASE_DIR
+from ._case_index import open_case_index
+from ._change_feed import ChangeFeed
+from ._checkpoints import WorkQueue
+from ._exceptions import RawDataNotFoundException
+from ._processed_store import get_processed_store
+from ._profiling import get_trace_exporter, peak_rss_mb, reset_peak_rss
 from ._text_extraction import PDFTextReader
-from ._utils import load_jsonl, read_json, save_dict_to_json
+from ._utils import load_jsonl, read_json
 
 logger = getLogger(__name__)
 
 
-class Processor(PDFTextReader):
-    """Processor for scraped data from the DomsDatabasen website.
+class RawCaseReader(PDFTextReader):
+    """Reads the raw data of cases, and extracts the text from their PDFs.
+
+    Holds only what is needed to read a case, such that worker processes can
+    read cases without opening the case index or any of the other state of a
+    `Processor`.
 
     Args:
         config (DictConfig):
@@ -28,14 +38,10 @@ class Processor(PDFTextReader):
             Config file
         data_raw_dir (Path):
             Path to raw data directory
-        data_processed_dir (Path):
-            Path to processed data directory
-        force (bool):
-            If True, existing data will be overwritten.
     """
 
     def __init__(self, config: DictConfig) -> None:
-        """Initializes the Processor."""
+        """Initializes the RawCaseReader."""
         super().__init__(config=config)
         self.config = config
 
@@ -45,11 +51,137 @@ class Processor(PDFTextReader):
             else Path(self.config.process.paths.test_data_raw_dir)
         )
 
+    def _process_case(self, case_id: str) -> Dict[str, Union[str, Dict[str, str]]]:
+        """Reads the raw data of a case and extracts the text from its PDF.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            processed_data (dict):
+                Processed data
+
+        Raises:
+            RawDataNotFoundException:
+                If the raw data of the case is missing, even though the case
+                index says that the case has been scraped.
+        """
+        logger.info(f"Processing case {case_id}...")
+        start = time.time()
+        self.timer.reset()
+        reset_peak_rss()
+
+        case_dir_raw = self.data_raw_dir / case_id
+        pdf_path = case_dir_raw / self.config.file_names.pdf_document
+        tabular_data_path = case_dir_raw / self.config.file_names.tabular_data
+        # The case index is trusted when looking up cases, so the data on disk
+        # is only checked here, when the case is actually read.
+        for path in [pdf_path, tabular_data_path]:
+            if not path.exists():
+                raise RawDataNotFoundException(f"{path} does not exist")
+
+        tabular_data: Dict[str, str] = read_json(tabular_data_path)
+
+        processed_data: Dict[str, Union[str, Dict[str, str]]] = {}
+        processed_data["case_id"] = case_id
+        processed_data["tabular_data"] = tabular_data
+
+        pdf_data = self.extract_text(
+            pdf_path=pdf_path,
+            boxes_path=(
+                self._boxes_path(case_id=case_id)
+                if self.config.process.save_boxes and not self.config.testing
+                else None
+            ),
+        )
+        processed_data["pdf_data"] = pdf_data
+        processed_data["process_info"] = {
+            "process_time": str(time.time() - start),
+            "hardware_used": "gpu" if torch.cuda.is_available() else "cpu",
+            # Peak RSS of this process, i.e. without page workers.
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.timer.summary(),
+        }
+        return processed_data
+
+    def _boxes_path(self, case_id: str) -> Path:
+        """Path to the saved boxes of a case.
+
+        The boxes are not saved in the processed case directory,
+        as it must only contain the processed data, see `JSONProcessedStore`.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            Path:
+                Path to the saved boxes.
+        """
+        return Path(self.config.process.paths.boxes_dir) / f"{case_id}.npz"
+
+
+class Processor(RawCaseReader):
+    """Processor for scraped data from the DomsDatabasen website.
+
+    Args:
+        config (DictConfig):
+            Config file
+
+    Attributes:
+        config (DictConfig):
+            Config file
+        data_raw_dir (Path):
+            Path to raw data directory
+        data_processed_dir (Path):
+            Path to processed data directory
+        processed_store (ProcessedStore):
+            Storage of processed data, see `processed_store.backend`.
+        case_index (CaseIndex):
+            Index of the status of each case.
+        change_feed (ChangeFeed or None):
+            Feed of the cases saved by the Scraper. None when testing.
+        trace_exporter (TraceExporter or None):
+            Exporter of the timings of processed cases, None if
+            `process.trace_export` is not set.
+        force (bool):
+            If True, existing data will be overwritten.
+    """
+
+    def __init__(self, config: DictConfig) -> None:
+        """Initializes the Processor."""
+        super().__init__(config=config)
+
         self.data_processed_dir = (
             Path(self.config.paths.data_processed_dir)
             if not self.config.testing
             else Path(self.config.process.paths.test_data_processed_dir)
         )
+        self.processed_store = get_processed_store(
+            config=config, dir_path=self.data_processed_dir
+        )
+        self.case_index = open_case_index(
+            config=config,
+            data_raw_dir=self.data_raw_dir,
+            processed_store=self.processed_store,
+        )
+
+        self.change_feed = (
+            ChangeFeed(path=Path(config.paths.change_feed))
+            if not config.testing
+            else None
+        )
+
+        self.trace_exporter = (
+            get_trace_exporter(
+                export_format=config.process.trace_export,
+                jsonl_path=Path(config.process.paths.trace_jsonl),
+                prometheus_path=Path(config.process.paths.trace_prometheus),
+            )
+            if not config.testing
+            else None
+        )
 
         self.force = self.config.process.force
         self.blacklist = self._read_blacklist() if config.process.blacklist_flag else []
@@ -74,116 +206,281 @@ class Processor(PDFTextReader):
         if case_id in self.blacklist:
             logger.info(f"{case_id} is blacklisted.")
             return {}
-        start = time.time()
-        case_id = str(case_id)
-
-        case_dir_raw = self.data_raw_dir / case_id
-        case_dir_processed = self.data_processed_dir / case_id
 
         # Check if raw data for case ID exists.
-        if not self._raw_data_exists(case_dir=case_dir_raw):
+        if not self.case_index.is_scraped(case_id=case_id):
             logger.info(f"Case {case_id} does not exist in raw data directory.")
             return {}
 
         # If case has already been processed, skip, unless force=True.
-        if self._already_processed(case_dir=case_dir_processed) and not self.force:
+        if self._is_processed(case_id=case_id) and not self.force:
             logger.info(
                 f"Case {case_id} has already been processed. Use --force to overwrite."
             )
-            processed_data = read_json(
-                file_path=case_dir_processed / self.config.file_names.processed_data
-            )
+            processed_data = self.processed_store.load(case_id=case_id)
             return processed_data
 
         # Process data for the case.
-        logger.info(f"Processing case {case_id}...")
+        try:
+            processed_data = self._process_case(case_id=case_id)
+        except RawDataNotFoundException as e:
+            self._set_unscraped(case_id=case_id, error=e)
+            return {}
+        self._save_processed_data(processed_data=processed_data)
+        self._export_trace(processed_data=processed_data)
 
-        case_dir_processed.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Done with case: {case_id}")
 
-        tabular_data: Dict[str, str] = read_json(
-            case_dir_raw / self.config.file_names.tabular_data
-        )
+        # Return data for testing purposes.
+        return processed_data
 
-        processed_data["case_id"] = case_id
-        processed_data["tabular_data"] = tabular_data
+    def process_all(self) -> None:
+        """Processes all cases in data/raw.
 
-        pdf_path = case_dir_raw / self.config.file_names.pdf_document
-        pdf_data = self.extract_text(
-            pdf_path=pdf_path,
+        If `process.workers` is larger than 1, the cases are processed in
+        parallel by a pool of worker processes, see `_process_all_parallel`.
+
+        If `process.resume` is True, the cases to process are kept in a durable
+        work queue. If a run is interrupted, the next run processes the cases
+        left in the queue, instead of all cases.
+
+        If `process.from_change_feed` is True, only the cases added to the change
+        feed since the last run are processed. Cases whose raw data has changed
+        are recorded as not processed by the Scraper, so they are processed again.
+        """
+        logger.info("Processing all cases...")
+        work_queue = (
+            WorkQueue(path=Path(self.config.process.paths.work_queue))
+            if self.config.process.resume and not self.config.testing
+            else None
         )
-        processed_data["pdf_data"] = pdf_data
-        processed_data["process_info"] = {
-            "process_time": str(time.time() - start),
-            "hardware_used": "gpu" if torch.cuda.is_available() else "cpu",
-        }
 
-        if not self.config.testing:
-            save_dict_to_json(
-                processed_data,
-                case_dir_processed / self.config.file_names.processed_data,
+        case_ids = work_queue.pending() if work_queue is not None else []
+        # Offset of the change feed up to which all cases are processed by this run.
+        feed_offset = None
+        if case_ids:
+            logger.info(
+                f"Resuming with {len(case_ids)} cases left in the work queue. "
+                f"Delete {self.config.process.paths.work_queue} to start over."
+            )
+        elif self.config.process.from_change_feed:
+            assert self.change_feed is not None
+            case_ids, feed_offset = self.change_feed.read(consumer="process")
+            logger.info(f"Found {len(case_ids)} new or changed cases in the feed")
+            if work_queue is not None:
+                work_queue.put(case_ids=case_ids)
+        else:
+            if self.change_feed is not None and self.change_feed.path.exists():
+                feed_offset = self.change_feed.end()
+            case_ids = self.case_index.scraped_case_ids()
+
+            start_case_id = self.config.process.start_case_id
+            if start_case_id:
+                case_ids = case_ids[case_ids.index(start_case_id) :]
+                feed_offset = None
+
+            if work_queue is not None:
+                work_queue.put(case_ids=case_ids)
+
+        workers = self.config.process.workers
+        if workers > 1:
+            self._process_all_parallel(
+                case_ids=case_ids, workers=workers, work_queue=work_queue
             )
+        else:
+            for case_id in case_ids:
+                self.process(case_id)
+                if work_queue is not None:
+                    work_queue.done(case_id=case_id)
+
+        if work_queue is not None:
+            work_queue.clear()
+        if feed_offset is not None:
+            assert self.change_feed is not None
+            self.change_feed.commit(consumer="process", offset=feed_offset)
+
+    def _process_all_parallel(
+        self, case_ids: List[str], workers: int, work_queue: Optional[WorkQueue]
+    ) -> None:
+        """Processes cases in parallel with a pool of worker processes.
+
+        Each worker builds its own RawCaseReader (and thereby its own easyocr
+        reader) once, and sends the processed data back to this process, which
+        is the only one writing to the processed data directory and the case
+        index.
 
-        logger.info(f"Done with case: {case_id}")
+        Args:
+            case_ids (List[str]):
+                Case IDs to process.
+            workers (int):
+                Number of worker processes.
+            work_queue (WorkQueue or None):
+                Queue in which processed cases are marked as done.
+        """
+        case_ids = [case_id for case_id in case_ids if self._to_be_processed(case_id)]
+        logger.info(f"Processing {len(case_ids)} cases with {workers} workers...")
+
+        # Workers use the Tika server started by this process.
+        self.wait_for_tika_server()
+
+        # Use spawn, as torch does not play well with forked processes.
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(self.config, workers),
+        ) as pool:
+            for case_id, result in pool.imap_unordered(_process_in_worker, case_ids):
+                if isinstance(result, RawDataNotFoundException):
+                    self._set_unscraped(case_id=case_id, error=result)
+                else:
+                    self._save_processed_data(processed_data=result)
+                    self._export_trace(processed_data=result)
+                    logger.info(f"Done with case: {case_id}")
+                if work_queue is not None:
+                    work_queue.done(case_id=case_id)
+
+    def _to_be_processed(self, case_id: str) -> bool:
+        """Checks if a case should be processed.
+
+        Same checks as in `process`: the case must not be blacklisted, its raw data
+        must exist, and it must not already be processed, unless force=True.
 
-        # Return data for testing purposes.
-        return processed_data
+        Args:
+            case_id (str):
+                Case ID
 
-    def process_all(self) -> None:
-        """Processes all cases in data/raw."""
-        logger.info("Processing all cases...")
-        case_ids = sorted(
-            [
-                case_path.name
-                for case_path in self.data_raw_dir.iterdir()
-                if case_path.is_dir()  # Exclude .gitkeep
-            ],
-            key=lambda case_id: int(case_id),
+        Returns:
+            bool:
+                True if case should be processed. False otherwise.
+        """
+        if case_id in self.blacklist:
+            logger.info(f"{case_id} is blacklisted.")
+            return False
+
+        if not self.case_index.is_scraped(case_id=case_id):
+            logger.info(f"Case {case_id} does not exist in raw data directory.")
+            return False
+
+        if self._is_processed(case_id=case_id) and not self.force:
+            logger.info(
+                f"Case {case_id} has already been processed. Use --force to overwrite."
+            )
+            return False
+
+        return True
+
+    def _export_trace(
+        self, processed_data: Dict[str, Union[str, Dict[str, str]]]
+    ) -> None:
+        """Exports the timings of a processed case, if `process.trace_export` is set.
+
+        Args:
+            processed_data (dict):
+                Processed data
+        """
+        if self.trace_exporter is None:
+            return
+        process_info = processed_data["process_info"]
+        assert isinstance(process_info, dict)
+        self.trace_exporter.export(
+            case_id=str(processed_data["case_id"]), process_info=process_info
         )
 
-        start_case_id = self.config.process.start_case_id
-        if start_case_id:
-            case_ids = case_ids[case_ids.index(start_case_id) :]
+    def _save_processed_data(
+        self, processed_data: Dict[str, Union[str, Dict[str, str]]]
+    ) -> None:
+        """Saves processed data for a case.
 
-        for case_id in case_ids:
-            self.process(case_id)
+        Nothing is saved when testing.
 
-    def _already_processed(self, case_dir) -> bool:
-        """Checks if a case has already been processed.
+        Args:
+            processed_data (dict):
+                Processed data
+        """
+        if self.config.testing:
+            return
 
-        If a case has already been processed, the case directory will
-        exist and will contain one file with the tabular data.
+        self.processed_store.save(processed_data=processed_data)
+        case_id = str(processed_data["case_id"])
+        _, size = self.processed_store.stat(case_id=case_id)
+        self.case_index.set_processed(case_id=case_id, size=size)
+
+    def relayout_case(self, case_id: str) -> Dict[str, Union[str, Dict[str, str]]]:
+        """Rebuilds the text of a processed case from its saved boxes.
+
+        The case must have been processed with `process.save_boxes=True`.
+        Only the pages of the processed data are updated.
 
         Args:
-            case_dir (Path):
-                Path to case directory
+            case_id (str):
+                Case ID
 
         Returns:
-            bool:
-                True if case has already been processed. False otherwise.
+            processed_data (dict):
+                Processed data with the rebuilt pages.
         """
-        return (
-            case_dir.exists()
-            and len(os.listdir(case_dir)) == N_FILES_PROCESSED_CASE_DIR
+        case_id = str(case_id)
+        boxes_path = self._boxes_path(case_id=case_id)
+        if not self.processed_store.exists(case_id=case_id) or not boxes_path.exists():
+            logger.info(f"Case {case_id} has no processed data or saved boxes.")
+            return {}
+
+        processed_data = self.processed_store.load(case_id=case_id)
+        processed_data["pdf_data"]["pages"] = self.relayout(boxes_path=boxes_path)
+        self._save_processed_data(processed_data=processed_data)
+        return processed_data
+
+    def relayout_all(self) -> None:
+        """Rebuilds the text of all processed cases with saved boxes."""
+        boxes_dir = Path(self.config.process.paths.boxes_dir)
+        case_ids = sorted(
+            [boxes_path.stem for boxes_path in boxes_dir.glob("*.npz")],
+            key=lambda case_id: int(case_id),
         )
+        logger.info(f"Relayouting {len(case_ids)} cases...")
+        for case_id in case_ids:
+            self.relayout_case(case_id=case_id)
 
-    def _raw_data_exists(self, case_dir) -> bool:
-        """Checks if raw data for a case exists.
+    def _set_unscraped(self, case_id: str, error: Exception) -> None:
+        """Records that the raw data of a case is missing.
 
-        If a case has been scraped successfully, then the case directory exists
-        and contains two files: the PDF document and the tabular data.
+        Args:
+            case_id (str):
+                Case ID
+            error (Exception):
+                Error raised when reading the raw data.
+        """
+        logger.warning(
+            f"Case {case_id} is scraped according to the case index, but its raw "
+            f"data is missing: {error}. Recording it as not scraped."
+        )
+        self.case_index.set_unscraped(case_id=case_id)
 
-        Same code as the method `_already_scraped` from class `Scraper`
-        (src/domsdatabasen/scraper.py).
+    def _is_processed(self, case_id: str) -> bool:
+        """Checks if the processed data of a case exists.
+
+        The case index is checked first. If it says that the case has been
+        processed, the processed store is checked as well, such that the case
+        is processed again if its processed data is missing.
 
         Args:
-            case_dir (Path):
-                Path to case directory
+            case_id (str):
+                Case ID
 
         Returns:
             bool:
-                True if case has already been scraped. False otherwise.
+                True if the processed data of the case exists. False otherwise.
         """
-        return case_dir.exists() and len(os.listdir(case_dir)) == N_FILES_RAW_CASE_DIR
+        if not self.case_index.is_processed(case_id=case_id):
+            return False
+        if not self.processed_store.exists(case_id=case_id):
+            logger.warning(
+                f"Case {case_id} is processed according to the case index, but its "
+                "processed data is missing. Processing it again."
+            )
+            return False
+        return True
 
     def _read_blacklist(self) -> List[str]:
         """Reads the blacklised cases.
@@ -195,3 +492,44 @@ class Processor(PDFTextReader):
         data = load_jsonl(self.config.process.paths.blacklist)
         blacklist = [str(item["case_id"]) for item in data]
         return blacklist
+
+
+# Reader used by a worker process in `Processor._process_all_parallel`.
+_worker_reader: Optional[RawCaseReader] = None
+
+
+def _init_worker(config: DictConfig, workers: int) -> None:
+    """Initializes a worker process with its own RawCaseReader.
+
+    Args:
+        config (DictConfig):
+            Config file
+        workers (int):
+            Number of worker processes. Used to divide the CPU threads
+            between the workers.
+    """
+    global _worker_reader
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _worker_reader = RawCaseReader(config=config)
+
+
+def _process_in_worker(
+    case_id: str,
+) -> Tuple[str, Union[Dict[str, Union[str, Dict[str, str]]], RawDataNotFoundException]]:
+    """Processes a single case in a worker process.
+
+    Args:
+        case_id (str):
+            Case ID
+
+    Returns:
+        case_id (str):
+            Case ID
+        result (dict or RawDataNotFoundException):
+            Processed data, or the error if the raw data of the case is missing.
+    """
+    assert _worker_reader is not None, "Worker has not been initialized"
+    try:
+        return case_id, _worker_reader._process_case(case_id=case_id)
+    except RawDataNotFoundException as e:
+        return case_id, e
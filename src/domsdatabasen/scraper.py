@@ -1,23 +1,34 @@
 """Scraper for domsdatabasen.dk."""
 
+import copy
+import itertools
 import logging
 import os
+import queue
 import re
 import shutil
+import threading
 import time
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
 from omegaconf import DictConfig
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
-from ._constants import N_FILES_RAW_CASE_DIR
-from ._exceptions import PDFDownloadException
-from ._utils import save_dict_to_json
+from ._case_index import hash_tabular_data, open_case_index
+from ._change_feed import ChangeFeed
+from ._constants import PARTIAL_DOWNLOAD_SUFFIXES
+from ._downloader import AsyncPDFDownloader, DownloadJob
+from ._exceptions import HTTPScrapeException, PDFDownloadException
+from ._http_client import HTTPCaseClient
+from ._processed_store import get_processed_store
+from ._rate_limit import RateLimiter
+from ._utils import read_json, save_dict_to_json
 from ._xpaths import XPATHS, XPATHS_TABULAR_DATA
 
 logger = logging.getLogger(__name__)
@@ -37,14 +48,27 @@ class Scraper:
             Path to test directory
         download_dir (Path):
             Path to download directory
+        rate_limiter (RateLimiter):
+            Rate limit of opening case pages.
         data_raw_dir (Path):
             Path to raw data directory
+        case_index (CaseIndex):
+            Index of the status of each case.
+        change_feed (ChangeFeed):
+            Feed to which the cases saved are added.
         force (bool):
             If True, existing data will be overwritten.
         cookies_clicked (bool):
             True if cookies have been clicked. False otherwise.
+        http_client (HTTPCaseClient or None):
+            Client used to scrape cases without a browser, if `scrape.backend`
+            is "http". None otherwise.
+        downloader (AsyncPDFDownloader or None):
+            Downloader of PDF documents in the background, if
+            `scrape.async_downloads` is True and the endpoints of the "http"
+            backend are verified. None otherwise.
         driver (webdriver.Chrome):
-            Chrome webdriver
+            Chrome webdriver, started when it is first used.
     """
 
     def __init__(self, config: DictConfig) -> None:
@@ -53,6 +77,21 @@ class Scraper:
         self.test_dir = Path(self.config.scrape.paths.test_dir)
         self.download_dir = Path(self.config.scrape.paths.download_dir)
         self.data_raw_dir = Path(self.config.paths.data_raw_dir)
+        self.case_index = open_case_index(
+            config=config,
+            data_raw_dir=self.data_raw_dir if not config.testing else self.test_dir,
+            processed_store=get_processed_store(
+                config=config, dir_path=Path(config.paths.data_processed_dir)
+            ),
+        )
+
+        self.change_feed = ChangeFeed(
+            path=Path(config.paths.change_feed)
+            if not config.testing
+            else self.test_dir / Path(config.paths.change_feed).name
+        )
+
+        self.rate_limiter = RateLimiter(rate=self.config.scrape.rate_limit)
 
         self.force = self.config.scrape.force
         self.cookies_clicked = False
@@ -60,86 +99,708 @@ class Scraper:
             0  # Only relevant when scraping all cases.
         )
 
+        self.http_client = (
+            HTTPCaseClient(config=config)
+            if self.config.scrape.backend == "http"
+            else None
+        )
+        if self.http_client is not None and not self.config.scrape.http.verified:
+            logger.warning(
+                "The endpoints in 'scrape.http' have not been verified against the "
+                "site. Cases that can not be read from them are scraped with a browser."
+            )
+        self.downloader: Optional[AsyncPDFDownloader] = None
+        if self.config.scrape.async_downloads:
+            if self.http_client is not None and self.config.scrape.http.verified:
+                self.downloader = AsyncPDFDownloader(
+                    http_client=self.http_client,
+                    concurrency=self.config.scrape.download_concurrency,
+                    max_pending=self.config.scrape.max_pending_downloads,
+                )
+            else:
+                logger.warning(
+                    "PDF documents are only downloaded in the background with the "
+                    "'http' backend, when its endpoints are verified. Downloading "
+                    "them with the browser instead."
+                )
+
         self._intialize_downloader_folder()
-        self.driver = self._start_driver()
+        self._driver: Optional[webdriver.Chrome] = None
+        # True for the browser sessions made by `_new_session`.
+        self._is_session = False
+
+    @property
+    def driver(self) -> webdriver.Chrome:
+        """Chrome webdriver, started when it is first used.
 
-    def scrape(self, case_id: str) -> None:
+        If `scrape.backend` is "http", the browser is only started
+        if a case can not be scraped without it.
+        """
+        if self._driver is None:
+            self._driver = self._start_driver()
+        return self._driver
+
+    def scrape(self, case_id: str, force: bool = False) -> bool:
         """Scrapes a single case from domsdatabasen.dk.
 
+        If `scrape.backend` is "http", the case is scraped from the JSON and PDF
+        endpoints of the site. If that fails, the case is scraped with a browser.
+
+        If `scrape.async_downloads` is True, the PDF document is downloaded in the
+        background, and the case is saved when the download has finished. Call
+        `wait_for_downloads` to wait for all downloads.
+
         Args:
             case_id (str):
                 Case ID
+            force (bool):
+                If True, the case is scraped even if it has been scraped
+                before, like when `scrape.force` is True.
+
+        Returns:
+            bool:
+                False if no case has the given ID. True otherwise.
         """
         case_id = str(case_id)
-        case_dir = (
-            self.data_raw_dir / case_id
-            if not self.config.testing
-            else self.test_dir / case_id
-        )
+        case_dir = self._case_dir(case_id=case_id)
 
-        if self._already_scraped(case_dir) and not self.force:
+        if self.case_index.is_scraped(case_id=case_id) and not (self.force or force):
             logger.info(
                 f"Case {case_id} is already scraped. Use 'scrape.force' to overwrite"
             )
-            return
+            return True
+
+        self._save_downloaded_cases()
+
+        if self._is_known_missing(case_id=case_id):
+            logger.info(f"Case {case_id} did not exist when it was last tried")
+            self.consecutive_nonexistent_page_count += 1
+            return False
 
         logger.info(f"Scraping case {case_id}")
+        self.rate_limiter.wait()
 
-        case_url = f"{self.config.domsdatabasen.url}/{case_id}"
-        self.driver.get(case_url)
-        # Wait for page to load
-        time.sleep(1)
-        if not self.cookies_clicked:
-            self._accept_cookies()
-            self.cookies_clicked = True
-            time.sleep(1)
+        case_exists = None
+        if self.http_client is not None:
+            try:
+                case_exists = self._scrape_with_http(case_id=case_id, case_dir=case_dir)
+            except HTTPScrapeException as e:
+                logger.warning(
+                    f"Could not scrape case {case_id} over HTTP: {e}. "
+                    "Scraping it with a browser instead."
+                )
+        if case_exists is None:
+            case_exists = self._scrape_with_browser(case_id=case_id, case_dir=case_dir)
 
-        if not self._case_id_exists():
+        if not case_exists:
             # This will be triggered if no case has the given ID.
             logger.info(f"Case {case_id} does not exist")
+            self.case_index.set_missing(case_id=case_id)
             self.consecutive_nonexistent_page_count += 1
-            return
+            return False
 
         self.consecutive_nonexistent_page_count = 0
+        return True
+
+    def wait_for_downloads(self) -> None:
+        """Waits for the PDF documents downloaded in the background.
+
+        The cases are saved when their PDF documents have been downloaded.
+
+        Does nothing if PDF documents are not downloaded in the background.
+        """
+        if self.downloader is None:
+            return
+        self.downloader.join()
+        self._save_downloaded_cases()
+
+    def _scrape_with_browser(self, case_id: str, case_dir: Path) -> bool:
+        """Scrapes a case by loading its page in a browser.
+
+        Args:
+            case_id (str):
+                Case ID
+            case_dir (Path):
+                Path to case directory
+
+        Returns:
+            bool:
+                False if no case has the given ID. True otherwise.
+        """
+        if not self._open_case_page(case_id=case_id):
+            return False
 
         if not self._case_is_accessible():
             # Some cases might be unavailable for some reason.
             # A description is usually given on the page for case.
             # Thus if this is the case, just go to the next case.
             logger.info(f"Case {case_id} is not accessible")
-            return
+            return True
 
         # Scrape data for the case.
         case_dir.mkdir(parents=True, exist_ok=True)
 
         self._download_pdf(case_dir)
         tabular_data = self._get_tabular_data()
-        save_dict_to_json(tabular_data, case_dir / self.config.file_names.tabular_data)
+        self._save_case(case_id=case_id, case_dir=case_dir, tabular_data=tabular_data)
+        return True
+
+    def _open_case_page(self, case_id: str) -> bool:
+        """Loads the page of a case in the browser.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                False if no case has the given ID. True otherwise.
+        """
+        case_url = f"{self.config.domsdatabasen.url}/{case_id}"
+        # Cases are found by the fragment of the URL, and going to another
+        # fragment does not load a new page. Thus, a blank page is loaded first,
+        # such that the elements waited for are from the page of this case.
+        self.driver.get("about:blank")
+        self.driver.get(case_url)
+        self._wait_for_case_page()
+        if not self.cookies_clicked:
+            self._accept_cookies()
+            self.cookies_clicked = True
+
+        return self._case_id_exists()
+
+    def _scrape_with_http(self, case_id: str, case_dir: Path) -> bool:
+        """Scrapes a case from the JSON and PDF endpoints of the site.
+
+        Args:
+            case_id (str):
+                Case ID
+            case_dir (Path):
+                Path to case directory
+
+        Returns:
+            bool:
+                False if no case has the given ID. True otherwise.
+
+        Raises:
+            HTTPScrapeException:
+                If the case could not be scraped over HTTP.
+        """
+        assert self.http_client is not None
+        case = self.http_client.get_case(case_id=case_id)
+        if case is None:
+            return False
+
+        tabular_data = self.http_client.tabular_data(case=case)
+        if self.downloader is not None:
+            self._submit_download(
+                case_id=case_id, case_dir=case_dir, tabular_data=tabular_data
+            )
+            return True
+
+        downloaded = self.http_client.download_pdf(
+            case_id=case_id, pdf_path=case_dir / self.config.file_names.pdf_document
+        )
+        if not downloaded:
+            logger.info(f"Case {case_id} is not accessible")
+            return True
+
+        self._save_case(case_id=case_id, case_dir=case_dir, tabular_data=tabular_data)
+        return True
+
+    def _submit_download(
+        self, case_id: str, case_dir: Path, tabular_data: dict
+    ) -> None:
+        """Queues the PDF document of a case for download in the background.
+
+        Args:
+            case_id (str):
+                Case ID
+            case_dir (Path):
+                Path to case directory
+            tabular_data (dict):
+                Tabular data, saved when the PDF document has been downloaded.
+        """
+        assert self.downloader is not None
+        self.downloader.submit(
+            DownloadJob(
+                case_id=case_id,
+                case_dir=case_dir,
+                pdf_path=case_dir / self.config.file_names.pdf_document,
+                tabular_data=tabular_data,
+            )
+        )
+
+    def _save_downloaded_cases(self) -> None:
+        """Saves the cases whose PDF documents have been downloaded in the background.
+
+        If a download failed, the case is scraped again with the browser,
+        which downloads the PDF document itself.
+        """
+        if self.downloader is None:
+            return
+        for job, result in self.downloader.completed():
+            if result is True:
+                self._save_case(
+                    case_id=job.case_id,
+                    case_dir=job.case_dir,
+                    tabular_data=job.tabular_data,
+                )
+            elif result is False:
+                logger.info(f"Case {job.case_id} is not accessible")
+            else:
+                logger.warning(
+                    f"Could not download the PDF of case {job.case_id}: {result}. "
+                    "Scraping it with a browser instead."
+                )
+                self._scrape_with_browser(case_id=job.case_id, case_dir=job.case_dir)
+
+    def _save_case(self, case_id: str, case_dir: Path, tabular_data: dict) -> None:
+        """Saves the tabular data of a case, and records that it has been scraped.
+
+        The PDF document must have been saved in the case directory already.
+        The case is added to the change feed.
+
+        Args:
+            case_id (str):
+                Case ID
+            case_dir (Path):
+                Path to case directory
+            tabular_data (dict):
+                Tabular data
+        """
+        is_new = not self.case_index.is_scraped(case_id=case_id)
+        tabular_data_path = case_dir / self.config.file_names.tabular_data
+        save_dict_to_json(tabular_data, tabular_data_path)
+        changed = self.case_index.set_scraped(
+            case_id=case_id,
+            pdf_path=case_dir / self.config.file_names.pdf_document,
+            tabular_data_path=tabular_data_path,
+            tabular_data=tabular_data,
+        )
+        change = "new" if is_new else "changed" if changed else "unchanged"
+        self.change_feed.append(case_id=case_id, change=change)
 
     def scrape_all(self) -> None:
         """Scrapes all cases from domsdatabasen.dk.
 
         The highest case ID is unknown, and there are IDs between 1 and
-        the highest case ID that do not exist. Thus, the scraper starts
-        at case ID 1, and scraping will stop when a number of consecutive
-        non-existent pages have been encountered.
+        the highest case ID that do not exist. Thus, the case IDs to try
+        are found in one of two ways, given by `scrape.discovery`:
+
+            linear: The scraper starts at case ID 1, and scraping will stop
+                when a number of consecutive non-existent pages have been
+                encountered.
+            probe: The highest case ID is found first, see `_discover_case_ids`,
+                and all case IDs up to it are scraped.
+
+        Case IDs found not to exist in an earlier run are skipped, if
+        `scrape.skip_missing` is True.
+
+        If `scrape.incremental` is True, scraping starts after the highest
+        scraped case ID instead of at `scrape.start_case_id`, such that only
+        new cases are scraped. If `scrape.recheck_scraped` is also True, the
+        scraped cases that have changed are scraped again first, see
+        `_scrape_changed_cases`.
+
+        If `scrape.workers` > 1, cases are scraped by that many browser
+        sessions in parallel, see `_scrape_all_parallel`.
         """
         case_id = (
             1
             if not self.config.scrape.start_case_id
             else int(self.config.scrape.start_case_id)
         )
+        if self.config.scrape.incremental:
+            if self.config.scrape.recheck_scraped:
+                self._scrape_changed_cases()
+            case_id = (self.case_index.last_scraped_case_id() or 0) + 1
+            logger.info(f"Scraping new cases starting at case ID {case_id}")
+        else:
+            logger.info(
+                f"Scraping all cases starting at case ID {case_id}. "
+                "Change 'scrape.start_case_id' to None to start at 1"
+            )
+
+        case_ids: Iterable[int]
+        if self.config.scrape.discovery == "probe":
+            case_ids = self._discover_case_ids(start_case_id=case_id)
+            stop_at_nonexistent = False
+        elif self.config.scrape.discovery == "linear":
+            case_ids = itertools.count(case_id)
+            stop_at_nonexistent = True
+        else:
+            raise ValueError(f"Unknown discovery: {self.config.scrape.discovery}")
+
+        if self.config.scrape.workers > 1:
+            self._scrape_all_parallel(
+                case_ids=case_ids,
+                workers=self.config.scrape.workers,
+                stop_at_nonexistent=stop_at_nonexistent,
+            )
+            return
+
+        max_count = self.config.scrape.max_consecutive_nonexistent_page_count
+        for case_id in case_ids:
+            if (
+                stop_at_nonexistent
+                and self.consecutive_nonexistent_page_count >= max_count
+            ):
+                break
+            self.scrape(str(case_id))
+        self.wait_for_downloads()
+
+    def _scrape_changed_cases(self) -> None:
+        """Scrapes the scraped cases again whose tabular data has changed.
+
+        The tabular data of each scraped case is read from the JSON endpoint
+        of the site, and compared with the tabular data last scraped. Changes
+        to the PDF document alone are not found.
+        """
+        if self.http_client is None:
+            logger.warning(
+                "Can not check the scraped cases for changes without the "
+                "'http' backend. Use 'scrape.backend=http'."
+            )
+            return
+
+        case_ids = self.case_index.scraped_case_ids()
+        logger.info(f"Checking {len(case_ids)} scraped cases for changes...")
+        n_changed = 0
+        for case_id in case_ids:
+            self.rate_limiter.wait()
+            try:
+                case = self.http_client.get_case(case_id=case_id)
+                if case is None:
+                    logger.info(f"Case {case_id} no longer exists")
+                    continue
+                tabular_data = self.http_client.tabular_data(case=case)
+            except HTTPScrapeException as e:
+                logger.warning(f"Could not check case {case_id} for changes: {e}")
+                continue
+
+            if hash_tabular_data(tabular_data=tabular_data) != self._scraped_hash(
+                case_id=case_id
+            ):
+                logger.info(f"Case {case_id} has changed")
+                self.scrape(case_id=case_id, force=True)
+                n_changed += 1
+        self.wait_for_downloads()
+        logger.info(f"{n_changed} scraped cases have changed")
+
+    def _scraped_hash(self, case_id: str) -> str:
+        """Get the hash of the tabular data of a case, as it was last scraped.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            str:
+                Hash, see `hash_tabular_data`.
+        """
+        tabular_data_sha256 = self.case_index.get_tabular_data_sha256(case_id=case_id)
+        if tabular_data_sha256 is not None:
+            return tabular_data_sha256
+        # The case was recorded from the data on disk, without the hash.
+        tabular_data_path = (
+            self._case_dir(case_id=case_id) / self.config.file_names.tabular_data
+        )
+        return hash_tabular_data(tabular_data=read_json(tabular_data_path))
+
+    def _case_dir(self, case_id: str) -> Path:
+        """Get the directory of the raw data of a case.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            Path:
+                Path to case directory
+        """
+        return (
+            self.data_raw_dir / case_id
+            if not self.config.testing
+            else self.test_dir / case_id
+        )
+
+    def _discover_case_ids(self, start_case_id: int) -> List[int]:
+        """Finds the case IDs to scrape, without trying each of them.
+
+        If `scrape.backend` is "http" and `scrape.http.list_path` is set, the case
+        IDs are read from the endpoint listing all cases. Otherwise, the highest
+        case ID is found by probing: from the highest scraped case ID, case IDs are
+        probed at exponentially growing distances until no case is found, and the
+        highest case ID is then found by binary search between the last case found
+        and that point. Each probe tries `scrape.probe_window` consecutive case IDs,
+        as not all case IDs exist.
+
+        Args:
+            start_case_id (int):
+                Lowest case ID to scrape.
+
+        Returns:
+            List[int]:
+                Case IDs to scrape in ascending order. Case IDs found
+                not to exist are left out.
+        """
+        if self.http_client is not None and self.config.scrape.http.list_path:
+            try:
+                case_ids = self.http_client.list_case_ids()
+                logger.info(f"Found {len(case_ids)} cases in the list of cases")
+                return [case_id for case_id in case_ids if case_id >= start_case_id]
+            except HTTPScrapeException as e:
+                logger.warning(
+                    f"Could not read the list of cases: {e}. Probing instead."
+                )
+
+        # Case IDs probed, and whether a case has the ID.
+        probed: Dict[int, bool] = {}
+        last_scraped_case_id = self.case_index.last_scraped_case_id() or 0
+        # A case has the ID `low` (or it is below the start),
+        # and no case has the IDs in the window at `high`.
+        low = max(start_case_id - 1, last_scraped_case_id)
+        high = None
+        step = 1
+        while high is None:
+            found = self._probe(case_id=low + step, probed=probed)
+            if found is None:
+                high = low + step
+            else:
+                low = found
+                step *= 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            found = self._probe(case_id=middle, probed=probed)
+            if found is None:
+                high = middle
+            else:
+                low = found
         logger.info(
-            "Scraping all cases starting at case ID {case_id}. "
-            "Change 'scrape.start_case_id' to None to start at 1"
+            f"Found case ID {low} to be the highest case ID "
+            f"with {len(probed)} probes"
         )
 
-        while (
-            self.consecutive_nonexistent_page_count
-            < self.config.max_consecutive_nonexistent_page_count
-        ):
-            self.scrape(str(case_id))
-            case_id += 1
+        # Case IDs probed in this run are kept or left out by the probe.
+        # Of the other case IDs, those known not to exist are left out.
+        return [
+            case_id
+            for case_id in range(start_case_id, low + 1)
+            if probed.get(case_id)
+            or (
+                case_id not in probed
+                and not self._is_known_missing(case_id=str(case_id))
+            )
+        ]
+
+    def _probe(self, case_id: int, probed: Dict[int, bool]) -> Optional[int]:
+        """Finds the first existing case in a window of case IDs.
+
+        Args:
+            case_id (int):
+                First case ID of the window.
+            probed (dict):
+                Case IDs probed so far, and whether a case has the ID.
+                Updated with the case IDs probed.
+
+        Returns:
+            int or None:
+                First case ID in the window that a case has, None if there is none.
+        """
+        for window_case_id in range(case_id, case_id + self.config.scrape.probe_window):
+            if window_case_id not in probed:
+                probed[window_case_id] = self._case_exists(case_id=str(window_case_id))
+            if probed[window_case_id]:
+                return window_case_id
+        return None
+
+    def _case_exists(self, case_id: str) -> bool:
+        """Checks if a case exists, without scraping it.
+
+        Case IDs found not to exist are recorded in the case index.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if a case has the given ID. False otherwise.
+        """
+        if self.case_index.is_scraped(case_id=case_id):
+            return True
+        if self._is_known_missing(case_id=case_id):
+            return False
+
+        self.rate_limiter.wait()
+        case_exists = None
+        if self.http_client is not None:
+            try:
+                case_exists = self.http_client.get_case(case_id=case_id) is not None
+            except HTTPScrapeException as e:
+                logger.warning(f"Could not probe case {case_id} over HTTP: {e}")
+        if case_exists is None:
+            case_exists = self._open_case_page(case_id=case_id)
+
+        if case_exists:
+            self.case_index.set_exists(case_id=case_id)
+        else:
+            self.case_index.set_missing(case_id=case_id)
+        return case_exists
+
+    def _is_known_missing(self, case_id: str) -> bool:
+        """Checks if a case ID was found not to exist in an earlier try.
+
+        Only case IDs that were below the highest scraped case ID when they were
+        found not to exist are known to be missing, see `CaseIndex.is_missing`.
+
+        Args:
+            case_id (str):
+                Case ID
+
+        Returns:
+            bool:
+                True if the case ID can be skipped. False otherwise.
+        """
+        if not self.config.scrape.skip_missing:
+            return False
+        return self.case_index.is_missing(case_id=case_id)
+
+    def _scrape_all_parallel(
+        self, case_ids: Iterable[int], workers: int, stop_at_nonexistent: bool
+    ) -> None:
+        """Scrapes all cases with a pool of browser sessions.
+
+        Case IDs are put on a shared queue in ascending order, and each session
+        takes the next case ID from the queue. At most `2 * workers` cases are
+        queued or being scraped at a time. If `stop_at_nonexistent` is True,
+        scraping stops when the same number of consecutive non-existent case IDs
+        have been encountered as when scraping with a single session. The
+        sessions share the rate limit, the case index and the change feed, see
+        `_new_session`.
+
+        Args:
+            case_ids (Iterable[int]):
+                Case IDs to scrape in ascending order.
+            workers (int):
+                Number of browser sessions.
+            stop_at_nonexistent (bool):
+                If True, scraping stops after
+                `scrape.max_consecutive_nonexistent_page_count` consecutive
+                non-existent case IDs. Otherwise, all case IDs are scraped.
+        """
+        queued_case_ids: queue.Queue = queue.Queue()
+        results: queue.Queue = queue.Queue()
+        sessions = [self._new_session(session_id=i) for i in range(workers)]
+        threads = [
+            threading.Thread(
+                target=session._scrape_in_session,
+                kwargs=dict(case_ids=queued_case_ids, results=results),
+            )
+            for session in sessions
+        ]
+        for thread in threads:
+            thread.start()
+
+        max_count = self.config.scrape.max_consecutive_nonexistent_page_count
+        case_id_iterator = iter(case_ids)
+        # Position of each queued case ID in `case_ids`.
+        positions: Dict[int, int] = {}
+        next_position = 0
+        # Lowest position that has not been scraped yet. The consecutive
+        # non-existent case IDs are counted up to this position.
+        frontier = 0
+        case_exists: Dict[int, bool] = {}
+        error: Optional[Exception] = None
+        while True:
+            while next_position - frontier < 2 * workers and (
+                not stop_at_nonexistent
+                or self.consecutive_nonexistent_page_count < max_count
+            ):
+                case_id = next(case_id_iterator, None)
+                if case_id is None:
+                    break
+                positions[case_id] = next_position
+                queued_case_ids.put(case_id)
+                next_position += 1
+            if frontier == next_position:
+                break
+
+            case_id, result = results.get()
+            if isinstance(result, Exception):
+                error = result
+                break
+            case_exists[positions.pop(case_id)] = result
+            while frontier in case_exists:
+                if case_exists.pop(frontier):
+                    self.consecutive_nonexistent_page_count = 0
+                else:
+                    self.consecutive_nonexistent_page_count += 1
+                frontier += 1
+
+        # Stop the sessions. Cases still queued are dropped.
+        while not queued_case_ids.empty():
+            queued_case_ids.get_nowait()
+        for _ in threads:
+            queued_case_ids.put(None)
+        for thread in threads:
+            thread.join()
+        # The sessions quit their webdrivers when they are deleted.
+        del sessions, threads
+
+        if error is not None:
+            raise error
+
+    def _new_session(self, session_id: int) -> "Scraper":
+        """Makes a browser session, to scrape cases in parallel with other sessions.
+
+        The session shares the case index, the change feed, the rate limit, the
+        HTTP client and the downloader with this Scraper. Only its webdriver and
+        its download directory are its own.
+
+        Args:
+            session_id (int):
+                ID of the browser session, used to name its download directory.
+
+        Returns:
+            Scraper:
+                Browser session.
+        """
+        session = copy.copy(self)
+        session.download_dir = self.download_dir.with_name(
+            f"{self.download_dir.name}_{session_id}"
+        )
+        session.cookies_clicked = False
+        session.consecutive_nonexistent_page_count = 0
+        session._driver = None
+        session._is_session = True
+        session._intialize_downloader_folder()
+        return session
+
+    def _scrape_in_session(self, case_ids: queue.Queue, results: queue.Queue) -> None:
+        """Scrapes cases from a queue with this browser session.
+
+        Runs in its own thread, until None is taken from the queue.
+
+        Args:
+            case_ids (queue.Queue):
+                Case IDs to scrape.
+            results (queue.Queue):
+                For each case, the case ID and whether the case exists,
+                or the exception raised while scraping it.
+        """
+        while True:
+            case_id = case_ids.get()
+            if case_id is None:
+                break
+            try:
+                results.put((case_id, self.scrape(case_id=str(case_id))))
+            except Exception as e:
+                logger.error(f"Error scraping case {case_id}: {e}")
+                results.put((case_id, e))
+
+        self.wait_for_downloads()
 
     def _start_driver(self) -> webdriver.Chrome:
         """Starts a Chrome webdriver.
@@ -175,46 +836,39 @@ class Scraper:
             shutil.rmtree(self.download_dir)
         self.download_dir.mkdir()
 
-    def _already_scraped(self, case_dir) -> bool:
-        """Checks if a case has already been scraped.
-
-        If a case has already been scraped, the case directory will contain
-        two files: the PDF document and the tabular data.
-
-        Args:
-            case_dir (Path):
-                Path to case directory
-
-        Returns:
-            bool:
-                True if case has already been scraped. False otherwise.
-        """
-        return case_dir.exists() and len(os.listdir(case_dir)) == N_FILES_RAW_CASE_DIR
-
     def _wait_download(self, files_before: set) -> str:
         """Waits for a file to be downloaded to the download directory.
 
+        The download directory is polled with an exponential backoff, starting
+        at `scrape.download_poll_min` seconds and capped at
+        `scrape.download_poll_max` seconds. Files that are still being
+        downloaded are ignored.
+
         Args:
             files_before (set):
                 Set of file names in download folder before download.
-            timeout (int, optional):
-                Number of seconds to wait before timing out. Defaults to 10.
 
         Returns:
             file_name (str):
                 Name of downloaded file (empty string if timeout)
         """
-        time.sleep(1)
-        endtime = time.time() + self.config.scrape.timeout_pdf_download
+        endtime = time.monotonic() + self.config.scrape.timeout_pdf_download
+        delay = self.config.scrape.download_poll_min
         while True:
-            files_now = set(os.listdir(self.download_dir))
-            new_files = files_now - files_before
+            new_files = {
+                file_name
+                for file_name in set(os.listdir(self.download_dir)) - files_before
+                if not file_name.endswith(PARTIAL_DOWNLOAD_SUFFIXES)
+            }
             if len(new_files) == 1:
                 file_name = new_files.pop()
                 return file_name
-            if time.time() > endtime:
+            remaining = endtime - time.monotonic()
+            if remaining <= 0:
                 file_name = ""
                 return file_name
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.config.scrape.download_poll_max)
 
     def _download_pdf(self, case_dir: Path) -> None:
         """Downloads the PDF document of the case.
@@ -226,7 +880,7 @@ class Scraper:
         files_before_download = set(os.listdir(self.download_dir))
 
         download_element = WebDriverWait(self.driver, self.config.scrape.sleep).until(
-            EC.presence_of_element_located((By.XPATH, XPATHS["download_pdf"]))
+            EC.element_to_be_clickable((By.XPATH, XPATHS["download_pdf"]))
         )
 
         download_element.click()
@@ -246,8 +900,18 @@ class Scraper:
                 Tabular data
         """
         self.driver.find_element(By.XPATH, XPATHS["Øvrige sagsoplysninger"]).click()
-        # Wait for section to expand
-        time.sleep(1)
+        # Wait for section to expand, as the text of hidden elements is empty.
+        # The heading of the last field is waited for, as the fields themselves
+        # are empty on many cases.
+        try:
+            WebDriverWait(self.driver, self.config.scrape.sleep).until(
+                EC.visibility_of_element_located((By.XPATH, XPATHS["Sagskomplekser"]))
+            )
+        except TimeoutException:
+            logger.warning(
+                "'Øvrige sagsoplysninger' was not expanded in time. "
+                "Reading the tabular data anyway."
+            )
         tabular_data = {}
         for key, xpath in XPATHS_TABULAR_DATA.items():
             element = self.driver.find_element(By.XPATH, xpath)
@@ -274,12 +938,39 @@ class Scraper:
             date = found.group()
         return date
 
+    def _wait_for_case_page(self) -> None:
+        """Waits until the page of the case has loaded.
+
+        The page has loaded when it contains either the button to download the
+        PDF document, the text "Fejlkode 404" or the text "Sagen er ikke
+        tilgængelig". If the page has not loaded within `scrape.timeout_page_load`
+        seconds, the case is scraped from the page as it is.
+        """
+        try:
+            WebDriverWait(self.driver, self.config.scrape.timeout_page_load).until(
+                EC.any_of(
+                    *[
+                        EC.presence_of_element_located((By.XPATH, XPATHS[key]))
+                        for key in [
+                            "download_pdf",
+                            "Fejlkode 404",
+                            "Sagen er ikke tilgængelig",
+                        ]
+                    ]
+                )
+            )
+        except TimeoutException:
+            logger.warning(f"Timed out waiting for {self.driver.current_url} to load")
+
     def _accept_cookies(self) -> None:
-        """Accepts cookies on the page."""
+        """Accepts cookies on the page, and waits for the cookie dialog to close."""
         element = WebDriverWait(self.driver, self.config.scrape.sleep).until(
-            EC.presence_of_element_located((By.XPATH, XPATHS["Accept cookies"]))
+            EC.element_to_be_clickable((By.XPATH, XPATHS["Accept cookies"]))
         )
         element.click()
+        WebDriverWait(self.driver, self.config.scrape.sleep).until(
+            EC.invisibility_of_element_located((By.XPATH, XPATHS["Accept cookies"]))
+        )
 
     def _case_id_exists(self) -> bool:
         """Checks if the case exists.
@@ -327,6 +1018,10 @@ class Scraper:
 
     def __del__(self):
         """Closes the scraper."""
-        self.driver.quit()
+        # The downloader is shared with the browser sessions.
+        if self.downloader is not None and not self._is_session:
+            self.downloader.close()
+        if self._driver is not None:
+            self._driver.quit()
         shutil.rmtree(self.download_dir)
         logger.info("Scraper closed")
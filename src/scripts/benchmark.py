@@ -0,0 +1,43 @@
+"""Benchmark reading PDFs with the PDFTextReader.
+
+Reads a fixed set of bundled and synthetic PDFs, and reports pages per second,
+OCR calls per page, peak memory and the time spent in each stage. The results
+are compared against the baseline at 'benchmark.paths.baseline'.
+
+Usage:
+    >>> python src/scripts/benchmark.py
+
+    Save the results as the new baseline:
+    >>> python src/scripts/benchmark.py 'benchmark.save_baseline=True'
+
+    Benchmark with 4 page workers, and fail if there are regressions:
+    >>> python src/scripts/benchmark.py 'process.page_workers=4' \
+        'benchmark.fail_on_regression=True'
+"""
+
+import logging
+import sys
+
+import hydra
+from domsdatabasen._benchmark import PDFBenchmark
+from omegaconf import DictConfig
+
+logger = logging.getLogger(__name__)
+
+
+@hydra.main(config_path="../../config", config_name="config")
+def main(config: DictConfig) -> None:
+    """Benchmark reading PDFs with the PDFTextReader.
+
+    Args:
+        config (DictConfig):
+            Hydra config object.
+    """
+    benchmark = PDFBenchmark(config=config)
+    regressions = benchmark.run()
+    if regressions and config.benchmark.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,16 @@ Usage:
 
     Overwrite existing dataset:
     >>> python src/scripts/finalize.py 'finalize.force=True'
+
+    Add new and changed cases to an existing dataset:
+    >>> python src/scripts/finalize.py 'finalize.incremental=True'
+
+    Add the cases processed since the last run, without checking all cases:
+    >>> python src/scripts/finalize.py 'finalize.incremental=True' \
+        'finalize.from_change_feed=True'
+
+    Build the dataset with 8 worker processes:
+    >>> python src/scripts/finalize.py 'finalize.force=True' 'finalize.workers=8'
 """
 
 
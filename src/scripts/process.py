@@ -12,6 +12,19 @@ Examples usages:
 
     Process all cases and overwrite existing data:
     >>> python src/scripts/process.py 'process.force=True' 'process.all=True'
+
+    Process all cases with 8 worker processes:
+    >>> python src/scripts/process.py 'process.all=True' 'process.workers=8'
+
+    Save the boxes read on each page, and rebuild the text from them later:
+    >>> python src/scripts/process.py 'process.all=True' 'process.save_boxes=True'
+    >>> python src/scripts/process.py 'process.all=True' 'process.relayout=True'
+
+    Process the cases scraped since the last run:
+    >>> python src/scripts/process.py 'process.all=True' 'process.from_change_feed=True'
+
+    Process all cases, continuing where an interrupted run stopped:
+    >>> python src/scripts/process.py 'process.all=True' 'process.resume=True'
 """
 
 import logging
@@ -32,7 +45,12 @@ def main(config: DictConfig) -> None:
             Hydra config object.
     """
     processor = Processor(config=config)
-    if config.process.all:
+    if config.process.relayout:
+        if config.process.all:
+            processor.relayout_all()
+        else:
+            processor.relayout_case(case_id=config.process.case_id)
+    elif config.process.all:
         processor.process_all()
     elif config.process.case_id:
         processor.process(case_id=config.process.case_id)
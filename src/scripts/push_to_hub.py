@@ -2,6 +2,9 @@
 
 Usage:
     >>> python src/scripts/push_to_hub.py
+
+    Upload the Parquet shards built with 'finalize.parquet=True' as they are:
+    >>> python src/scripts/push_to_hub.py 'finalize.parquet=True'
 """
 
 
@@ -10,6 +13,9 @@ from pathlib import Path
 
 import hydra
 from datasets import load_dataset
+from domsdatabasen._parquet import count_parquet_rows
+from domsdatabasen._processed_store import get_processed_store
+from huggingface_hub import HfApi
 from omegaconf import DictConfig
 
 logger = logging.getLogger(__name__)
@@ -17,20 +23,41 @@ logger = logging.getLogger(__name__)
 
 @hydra.main(config_path="../../config", config_name="config")
 def main(config: DictConfig) -> None:
-    dataset = load_dataset(config.paths.data_final_dir)
+    data_final_dir = Path(config.paths.data_final_dir)
+    processed_store = get_processed_store(
+        config=config, dir_path=Path(config.paths.data_processed_dir)
+    )
+    n_processed_cases = len(processed_store.case_ids())
+
+    if config.finalize.parquet:
+        # The Parquet shards are already in the format used by the Hub,
+        # so upload them without loading the dataset.
+        parquet_dir = data_final_dir / config.file_names.parquet_dir
+        assert count_parquet_rows(parquet_dir) == n_processed_cases
+
+        api = HfApi()
+        api.create_repo(
+            config.paths.hf_hub, repo_type="dataset", private=True, exist_ok=True
+        )
+        api.upload_folder(
+            repo_id=config.paths.hf_hub,
+            repo_type="dataset",
+            folder_path=parquet_dir,
+            path_in_repo="data",
+            delete_patterns="*.parquet",
+        )
+        return
+
+    dataset = load_dataset(
+        "json", data_files=str(data_final_dir / config.file_names.dataset)
+    )
 
     # Ensure that there is one sample in the
     # dataset for each processed case
-    assert dataset.num_rows["train"] == count_folders_in_dir(
-        Path(config.paths.data_processed_dir)
-    )
+    assert dataset.num_rows["train"] == n_processed_cases
 
     dataset.push_to_hub(config.paths.hf_hub, private=True)
 
 
-def count_folders_in_dir(dir: Path) -> int:
-    return len([f for f in dir.iterdir() if f.is_dir()])
-
-
 if __name__ == "__main__":
     main()
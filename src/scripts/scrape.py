@@ -12,6 +12,18 @@ Examples usages:
 
     Scrape all cases and overwrite existing data:
     >>> python src/scripts/scrape.py 'scrape.force=True' 'scrape.all=True'
+
+    Scrape all cases with 4 browser sessions, opening at most 2 cases per second:
+    >>> python src/scripts/scrape.py 'scrape.all=True' 'scrape.workers=4' \
+        'scrape.rate_limit=2'
+
+    Scrape all cases over HTTP, downloading the PDF documents in the background:
+    >>> python src/scripts/scrape.py 'scrape.all=True' 'scrape.backend=http' \
+        'scrape.http.verified=True' 'scrape.async_downloads=True'
+
+    Scrape new cases, and the scraped cases that have changed:
+    >>> python src/scripts/scrape.py 'scrape.all=True' 'scrape.incremental=True' \
+        'scrape.backend=http' 'scrape.recheck_scraped=True'
 """
 
 import logging
@@ -39,6 +51,7 @@ def main(config: DictConfig) -> None:
         scraper.scrape(config.scrape.case_id)
     else:
         logger.info(config.scrape.messages.give_correct_inputs)
+    scraper.wait_for_downloads()
 
     logger.info(config.scrape.messages.done)
 
@@ -0,0 +1,56 @@
+"""Test the benchmark of reading PDFs."""
+
+from pathlib import Path
+
+from domsdatabasen._benchmark import compare_to_baseline, make_synthetic_pdfs
+from pypdf import PdfReader
+
+
+def _result(pages_per_second, ocr_calls_per_page, peak_rss_mb, ocr_seconds):
+    """Results of a benchmark with a single PDF."""
+    return {
+        "pdfs": {
+            "tables": {
+                "pages_per_second": pages_per_second,
+                "ocr_calls_per_page": ocr_calls_per_page,
+                "peak_rss_mb": peak_rss_mb,
+                "stage_seconds_per_page": {"ocr": ocr_seconds},
+            }
+        }
+    }
+
+
+def test_make_synthetic_pdfs(tmp_path):
+    """Test that a synthetic PDF has a page for each page image."""
+    pdf_paths = make_synthetic_pdfs(
+        pdf_dir=tmp_path,
+        page_image_dir=Path("tests/data/processor"),
+        synthetic_pdfs={"tables": ["page_with_table_1.png", "page_with_table_2.png"]},
+    )
+    assert len(PdfReader(pdf_paths["tables"]).pages) == 2
+
+
+def test_compare_to_baseline():
+    """Test that only changes larger than the thresholds are regressions."""
+    baseline = _result(
+        pages_per_second=1.0, ocr_calls_per_page=10, peak_rss_mb=1000, ocr_seconds=0.5
+    )
+    results = _result(
+        pages_per_second=0.9, ocr_calls_per_page=10, peak_rss_mb=1100, ocr_seconds=0.55
+    )
+    assert (
+        compare_to_baseline(results=results, baseline=baseline, max_regression=0.2)
+        == []
+    )
+
+    results = _result(
+        pages_per_second=0.5, ocr_calls_per_page=11, peak_rss_mb=1500, ocr_seconds=1.0
+    )
+    regressions = compare_to_baseline(
+        results=results, baseline=baseline, max_regression=0.2
+    )
+    assert len(regressions) == 4
+    assert (
+        compare_to_baseline(results=results, baseline={"pdfs": {}}, max_regression=0.2)
+        == []
+    )
@@ -0,0 +1,160 @@
+"""Test the index of the status of each case."""
+
+import pytest
+from domsdatabasen._case_index import CaseIndex, hash_tabular_data
+from domsdatabasen._processed_store import JSONProcessedStore
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """Raw data directory with a scraped and a partially scraped case."""
+    raw_dir = tmp_path / "raw"
+    for case_id, file_names in [
+        ("10", ["document.pdf", "tabular_data.json"]),
+        ("2", ["document.pdf", "tabular_data.json"]),
+        ("3", ["document.pdf"]),
+    ]:
+        (raw_dir / case_id).mkdir(parents=True)
+        for file_name in file_names:
+            (raw_dir / case_id / file_name).write_text(f"{case_id} {file_name}")
+    return raw_dir
+
+
+@pytest.fixture
+def processed_store(tmp_path):
+    """Processed store with one processed case."""
+    processed_store = JSONProcessedStore(
+        dir_path=tmp_path / "processed", file_name="processed_data.json", indent=4
+    )
+    processed_store.save(processed_data={"case_id": "2"})
+    return processed_store
+
+
+def test_sync(raw_dir, processed_store):
+    """Test that the index built from the data on disk has the status of each case."""
+    case_index = CaseIndex(path=None)
+    case_index.sync(
+        data_raw_dir=raw_dir,
+        processed_store=processed_store,
+        pdf_name="document.pdf",
+        tabular_data_name="tabular_data.json",
+    )
+    assert case_index.scraped_case_ids() == ["2", "10"]
+    assert not case_index.is_scraped(case_id="3")
+    assert case_index.is_processed(case_id="2")
+    assert not case_index.is_processed(case_id="10")
+
+
+def test_sync_rebuilds_index(raw_dir, processed_store):
+    """Test that syncing an index records the cases removed from disk."""
+    case_index = CaseIndex(path=None)
+    for case_id in ["2", "10"]:
+        case_index.set_scraped(
+            case_id=case_id,
+            pdf_path=raw_dir / case_id / "document.pdf",
+            tabular_data_path=raw_dir / case_id / "tabular_data.json",
+            tabular_data={"Overskrift": case_id},
+        )
+        case_index.set_processed(case_id=case_id, size=100)
+    for file_path in (raw_dir / "10").iterdir():
+        file_path.unlink()
+
+    case_index.sync(
+        data_raw_dir=raw_dir,
+        processed_store=processed_store,
+        pdf_name="document.pdf",
+        tabular_data_name="tabular_data.json",
+    )
+    assert case_index.scraped_case_ids() == ["2"]
+    assert case_index.is_processed(case_id="2")
+    assert not case_index.is_processed(case_id="10")
+    # The hash of a case whose files are unchanged is kept.
+    assert case_index.get_tabular_data_sha256(case_id="2") == hash_tabular_data(
+        tabular_data={"Overskrift": "2"}
+    )
+
+
+def test_set_unscraped(raw_dir):
+    """Test that a case recorded as not scraped is no longer in the index."""
+    case_index = CaseIndex(path=None)
+    case_index.set_scraped(
+        case_id="10",
+        pdf_path=raw_dir / "10" / "document.pdf",
+        tabular_data_path=raw_dir / "10" / "tabular_data.json",
+    )
+    case_index.set_unscraped(case_id="10")
+    assert not case_index.is_scraped(case_id="10")
+    assert case_index.scraped_case_ids() == []
+
+
+def test_status_is_persisted(tmp_path, raw_dir):
+    """Test that the status of a case is kept when the index is opened again."""
+    path = tmp_path / "case_index.sqlite"
+    case_index = CaseIndex(path=path)
+    assert case_index.created
+    case_index.set_scraped(
+        case_id="10",
+        pdf_path=raw_dir / "10" / "document.pdf",
+        tabular_data_path=raw_dir / "10" / "tabular_data.json",
+    )
+    case_index.set_processed(case_id="10", size=100)
+    case_index.set_finalized(case_ids=["10"])
+
+    case_index = CaseIndex(path=path)
+    assert not case_index.created
+    assert case_index.is_scraped(case_id="10")
+    assert case_index.is_processed(case_id="10")
+    assert case_index.is_finalized(case_id="10")
+
+    case_index.set_finalized(case_ids=[])
+    assert not case_index.is_finalized(case_id="10")
+
+
+def test_missing_case_ids(raw_dir):
+    """Test that only case IDs below the highest scraped case are known missing."""
+    case_index = CaseIndex(path=None)
+    assert case_index.last_scraped_case_id() is None
+    case_index.set_missing(case_id="5")
+    assert not case_index.is_missing(case_id="5")
+
+    case_index.set_scraped(
+        case_id="10",
+        pdf_path=raw_dir / "10" / "document.pdf",
+        tabular_data_path=raw_dir / "10" / "tabular_data.json",
+    )
+    assert case_index.last_scraped_case_id() == 10
+    case_index.set_missing(case_id="5")
+    case_index.set_missing(case_id="6")
+    case_index.set_missing(case_id="11")
+    assert case_index.is_missing(case_id="5")
+    assert not case_index.is_missing(case_id="11")
+
+    case_index.set_exists(case_id="5")
+    assert not case_index.is_missing(case_id="5")
+    case_index.set_scraped(
+        case_id="6",
+        pdf_path=raw_dir / "2" / "document.pdf",
+        tabular_data_path=raw_dir / "2" / "tabular_data.json",
+    )
+    assert not case_index.is_missing(case_id="6")
+
+
+def test_scraping_again_resets_processed(raw_dir):
+    """Test that a case scraped again is only recorded as not processed if changed."""
+    case_index = CaseIndex(path=None)
+    kwargs = dict(
+        case_id="10",
+        pdf_path=raw_dir / "10" / "document.pdf",
+        tabular_data_path=raw_dir / "10" / "tabular_data.json",
+    )
+    assert case_index.set_scraped(**kwargs, tabular_data={"Overskrift": "Sag"})
+    assert case_index.get_tabular_data_sha256(case_id="10") == hash_tabular_data(
+        tabular_data={"Overskrift": "Sag"}
+    )
+    case_index.set_processed(case_id="10", size=100)
+
+    assert not case_index.set_scraped(**kwargs, tabular_data={"Overskrift": "Sag"})
+    assert case_index.is_processed(case_id="10")
+
+    assert case_index.set_scraped(**kwargs, tabular_data={"Overskrift": "Ny"})
+    assert not case_index.is_processed(case_id="10")
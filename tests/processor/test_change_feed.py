@@ -0,0 +1,42 @@
+"""Test the feed of the cases touched by the Scraper."""
+
+from domsdatabasen._change_feed import ChangeFeed
+
+
+def test_read_and_commit(tmp_path):
+    """Test that a consumer only reads the cases added since its last commit."""
+    change_feed = ChangeFeed(path=tmp_path / "change_feed.jsonl")
+    assert change_feed.read(consumer="process") == ([], 0)
+
+    for case_id in ["12", "3", "12"]:
+        change_feed.append(case_id=case_id, change="new")
+    case_ids, offset = change_feed.read(consumer="process")
+    assert case_ids == ["3", "12"]
+    assert offset == change_feed.end()
+    change_feed.commit(consumer="process", offset=offset)
+
+    change_feed.append(case_id="7", change="changed")
+    assert change_feed.read(consumer="process")[0] == ["7"]
+    # A later stage does not read past the offset of an earlier stage.
+    assert change_feed.read(consumer="finalize", until=offset)[0] == ["3", "12"]
+
+
+def test_partial_line_is_not_read(tmp_path):
+    """Test that a line that is still being written is left for the next read."""
+    change_feed = ChangeFeed(path=tmp_path / "change_feed.jsonl")
+    change_feed.append(case_id="1", change="new")
+    with open(change_feed.path, "a") as f:
+        f.write('{"case_id": "2"')
+    case_ids, offset = change_feed.read(consumer="process")
+    assert case_ids == ["1"]
+    assert offset < change_feed.end()
+
+
+def test_unchanged_cases_are_not_read(tmp_path):
+    """Test that cases scraped again without changes are left out."""
+    change_feed = ChangeFeed(path=tmp_path / "change_feed.jsonl")
+    change_feed.append(case_id="1", change="unchanged")
+    change_feed.append(case_id="2", change="changed")
+    case_ids, offset = change_feed.read(consumer="process")
+    assert case_ids == ["2"]
+    assert offset == change_feed.end()
@@ -0,0 +1,60 @@
+"""Test the durable state used to resume processing."""
+
+import numpy as np
+from domsdatabasen._checkpoints import PageCheckpoints, WorkQueue
+
+
+def test_work_queue_is_resumed(tmp_path):
+    """Test that cases not marked as done are left in the queue after a restart."""
+    path = tmp_path / "queue.sqlite"
+    work_queue = WorkQueue(path=path)
+    work_queue.put(case_ids=["10", "2", "3"])
+    work_queue.done(case_id="2")
+
+    work_queue = WorkQueue(path=path)
+    assert work_queue.pending() == ["3", "10"]
+
+    work_queue.clear()
+    assert work_queue.pending() == []
+
+
+def test_page_checkpoints(tmp_path):
+    """Test that checkpointed pages are loaded until the PDF is cleared."""
+    pdf_path = tmp_path / "document.pdf"
+    pdf_path.write_bytes(b"%PDF")
+    path = tmp_path / "checkpoints.sqlite"
+    page_checkpoints = PageCheckpoints(path=path)
+    pdf_key = PageCheckpoints.pdf_key(pdf_path=pdf_path)
+
+    page = {"text": "Første side", "extraction_method": "easyocr"}
+    boxes = [
+        {
+            "coordinates": (1, 2, 3, 4),
+            "text": "Første",
+            "confidence": np.float64(0.5),
+            "origin": "main",
+        }
+    ]
+    page_checkpoints.save(
+        pdf_key=pdf_key,
+        page_number="2",
+        page=page,
+        boxes=boxes,
+        box_anonymization=True,
+        underline_anonymization=False,
+    )
+
+    checkpoints = PageCheckpoints(path=path).load(pdf_key=pdf_key)
+    assert list(checkpoints) == ["2"]
+    page_loaded, boxes_loaded, box_anon, underline_anon = checkpoints["2"]
+    assert page_loaded == page
+    assert boxes_loaded[0]["coordinates"] == [1, 2, 3, 4]
+    assert boxes_loaded[0]["confidence"] == 0.5
+    assert box_anon and not underline_anon
+
+    # A changed PDF does not use the checkpoints of the old one.
+    pdf_path.write_bytes(b"%PDF-1.7")
+    assert page_checkpoints.load(pdf_key=PageCheckpoints.pdf_key(pdf_path)) == {}
+
+    page_checkpoints.clear(pdf_key=pdf_key)
+    assert page_checkpoints.load(pdf_key=pdf_key) == {}
@@ -0,0 +1,91 @@
+"""Test building the final dataset."""
+
+import copy
+
+import pytest
+from domsdatabasen import dataset_builder as dataset_builder_module
+from domsdatabasen.dataset_builder import DatasetBuilder
+
+
+@pytest.fixture
+def dataset_builder(config, tmp_path):
+    """DatasetBuilder for an incremental dataset in a temporary directory."""
+    config = copy.deepcopy(config)
+    config.paths.data_raw_dir = str(tmp_path / "raw")
+    config.paths.data_processed_dir = str(tmp_path / "processed")
+    config.paths.data_final_dir = str(tmp_path / "final")
+    config.finalize.incremental = True
+    return DatasetBuilder(config=config)
+
+
+def save_case(dataset_builder, case_id):
+    """Saves the processed data of a case without anonymization."""
+    dataset_builder.processed_store.save(
+        processed_data={
+            "case_id": case_id,
+            "tabular_data": {"Overskrift": f"Sag {case_id}"},
+            "pdf_data": {
+                "anonymization_method": "none",
+                "text_tika": f"Tekst {case_id}",
+                "pages": {},
+            },
+        }
+    )
+
+
+def test_failed_append_is_rolled_back(dataset_builder, monkeypatch):
+    """Test that the dataset still matches its manifest if appending fails."""
+    for case_id in ["1", "2"]:
+        save_case(dataset_builder=dataset_builder, case_id=case_id)
+    dataset_builder.build_dataset()
+    dataset = dataset_builder.dataset_path.read_bytes()
+
+    for case_id in ["3", "4"]:
+        save_case(dataset_builder=dataset_builder, case_id=case_id)
+    make_dataset_sample = dataset_builder.make_dataset_sample
+
+    def fail_at_case_4(processed_data):
+        if processed_data["case_id"] == "4":
+            raise RuntimeError("Failed to read case 4")
+        return make_dataset_sample(processed_data=processed_data)
+
+    monkeypatch.setattr(dataset_builder, "make_dataset_sample", fail_at_case_4)
+    with pytest.raises(RuntimeError):
+        dataset_builder.build_dataset()
+    assert dataset_builder.dataset_path.read_bytes() == dataset
+
+    monkeypatch.undo()
+    dataset_builder.build_dataset()
+    lines = dataset_builder.dataset_path.read_bytes().splitlines()
+    assert len(lines) == 4
+    assert lines[:2] == dataset.splitlines()
+
+
+def test_unchanged_cases_are_not_read_again(dataset_builder, monkeypatch):
+    """Test that rebuilding the dataset skips the cases that have not changed."""
+    for case_id in ["1", "2"]:
+        save_case(dataset_builder=dataset_builder, case_id=case_id)
+    dataset_builder.build_dataset()
+    dataset = dataset_builder.dataset_path.read_bytes()
+
+    def fail(processed_data):
+        raise RuntimeError(f"Case {processed_data['case_id']} was read again")
+
+    monkeypatch.setattr(dataset_builder, "make_dataset_sample", fail)
+    dataset_builder.build_dataset()
+    assert dataset_builder.dataset_path.read_bytes() == dataset
+
+
+def test_worker_only_reads_processed_data(dataset_builder, monkeypatch):
+    """Test that a worker makes samples without opening the case index."""
+    save_case(dataset_builder=dataset_builder, case_id="1")
+
+    def fail(**kwargs):
+        raise AssertionError("The case index was opened by a worker")
+
+    monkeypatch.setattr(dataset_builder_module, "open_case_index", fail)
+    dataset_builder_module._init_worker(config=dataset_builder.config)
+    sample = dataset_builder_module._read_dataset_sample_in_worker(case_id="1")
+    assert sample == dataset_builder.make_dataset_sample(
+        processed_data=dataset_builder.processed_store.load(case_id="1")
+    )
@@ -0,0 +1,58 @@
+"""Test the cache of easyocr results."""
+
+import numpy as np
+import pytest
+from domsdatabasen._ocr_cache import OCRCache
+
+
+@pytest.fixture
+def ocr_cache(tmp_path):
+    """Return an empty OCRCache instance."""
+    return OCRCache(path=tmp_path / "ocr_cache.sqlite", settings="test", max_size_mb=1)
+
+
+def read_function(images):
+    """Fake easyocr, which reads the sum of the image as text."""
+    return [
+        [([[0, 0], [1, 0], [1, 1], [0, 1]], str(image.sum()), 0.9)] for image in images
+    ]
+
+
+def test_read(ocr_cache):
+    """Test that results are read from the cache the second time."""
+    images = [np.full((10, 10), i, dtype=np.uint8) for i in range(3)]
+    results = ocr_cache.read(
+        method="readtext", images=images, read_function=read_function
+    )
+    results_cached = ocr_cache.read(
+        method="readtext", images=images, read_function=read_function
+    )
+    assert results_cached == results
+    assert ocr_cache.hits == 3
+    assert ocr_cache.misses == 3
+
+
+def test_key(ocr_cache):
+    """Test that the key depends on the pixels, the shape and the method."""
+    image = np.zeros((10, 20), dtype=np.uint8)
+    image_other = image.copy()
+    image_other[0, 0] = 1
+    keys = {
+        ocr_cache._key(method="readtext", image=image),
+        ocr_cache._key(method="readtext", image=image_other),
+        ocr_cache._key(method="readtext", image=image.reshape(20, 10)),
+        ocr_cache._key(method="recognize", image=image),
+    }
+    assert len(keys) == 4
+
+
+def test_evict(ocr_cache):
+    """Test that the least recently used results are evicted."""
+    ocr_cache.max_size = 100
+    images = [np.full((10, 10), i, dtype=np.uint8) for i in range(10)]
+    ocr_cache.read(method="readtext", images=images, read_function=read_function)
+    ocr_cache._evict()
+    (size,) = ocr_cache._connection.execute(
+        "SELECT SUM(size) FROM ocr_cache"
+    ).fetchone()
+    assert size <= 100
@@ -0,0 +1,28 @@
+"""Test the storage of the boxes read on each page of a PDF."""
+
+from domsdatabasen._page_boxes import load_page_boxes, save_page_boxes
+
+
+def test_save_and_load_page_boxes(tmp_path):
+    """Test that pages and boxes are the same after saving and loading them."""
+    pages = {
+        "1": {"text": "Første side", "extraction_method": "easyocr"},
+        "2": {"text": "Anden side", "extraction_method": "pypdf"},
+        "3": {"text": "", "extraction_method": "easyocr"},
+    }
+    page_boxes = {
+        "1": [
+            {
+                "coordinates": (10, 20, 30, 40),
+                "text": "Første",
+                "confidence": 0.75,
+                "origin": "main",
+            },
+            {"coordinates": (10, 50, 30.5, 80), "text": "<anonym>", "origin": "box"},
+        ],
+        "2": [],
+        "3": [],
+    }
+    path = tmp_path / "boxes.npz"
+    save_page_boxes(path=path, pages=pages, page_boxes=page_boxes)
+    assert load_page_boxes(path=path) == (pages, page_boxes)
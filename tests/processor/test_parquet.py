@@ -0,0 +1,36 @@
+"""Test the Parquet output of the final dataset."""
+
+from datetime import date
+
+import pyarrow.parquet as pq
+
+from domsdatabasen._parquet import ParquetDatasetWriter, count_parquet_rows
+
+
+def test_write_shards(tmp_path):
+    """Test that the samples are written to shards with typed columns."""
+    dir_path = tmp_path / "parquet"
+    with ParquetDatasetWriter(
+        dir_path=dir_path, shard_size=2, row_group_size=2, compression="zstd"
+    ) as writer:
+        for case_id, date_str in [("1", "01-02-2023"), ("2", ""), ("3", "31-12-1999")]:
+            writer.write(
+                {
+                    "case_id": case_id,
+                    "Overskrift": f"Sag {case_id}",
+                    "Dato": date_str,
+                    "text": "Tekst",
+                    "text_anonymized": "Tekst",
+                    "text_len": 5,
+                    "text_anon_len": 5,
+                }
+            )
+
+    assert sorted(path.name for path in dir_path.iterdir()) == [
+        "train-00000-of-00002.parquet",
+        "train-00001-of-00002.parquet",
+    ]
+    assert count_parquet_rows(dir_path) == 3
+    table = pq.read_table(dir_path / "train-00000-of-00002.parquet")
+    assert table.column("Dato").to_pylist() == [date(2023, 2, 1), None]
+    assert table.column("Påstandsbeløb").to_pylist() == [None, None]
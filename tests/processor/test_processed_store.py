@@ -0,0 +1,54 @@
+"""Test the storage backends for processed data."""
+
+import pytest
+from domsdatabasen._processed_store import JSONProcessedStore, SQLiteProcessedStore
+
+
+@pytest.fixture(params=["json", "json_compact", "sqlite"])
+def processed_store(request, tmp_path):
+    """Empty processed store for each backend."""
+    if request.param == "sqlite":
+        return SQLiteProcessedStore(
+            path=tmp_path / "processed.sqlite", compression_level=6
+        )
+    return JSONProcessedStore(
+        dir_path=tmp_path,
+        file_name="processed_data.json",
+        indent=4 if request.param == "json" else None,
+    )
+
+
+def test_empty_store(processed_store):
+    """Test that an empty store has no cases."""
+    assert processed_store.case_ids() == []
+    assert not processed_store.exists(case_id="1")
+
+
+def test_save_and_load(processed_store):
+    """Test that processed data is the same after saving and loading it."""
+    processed_data = {
+        "case_id": "12",
+        "tabular_data": {"Sagstype": "Civil sag"},
+        "pdf_data": {"pages": {"1": {"text": "Første side"}}},
+    }
+    processed_store.save(processed_data=processed_data)
+    processed_store.save(processed_data={"case_id": "2"})
+
+    assert processed_store.exists(case_id="12")
+    assert processed_store.load(case_id="12") == processed_data
+    assert processed_store.case_ids() == ["2", "12"]
+
+
+def test_stat_changes_on_save(processed_store):
+    """Test that the state of a case changes when it is saved again."""
+    processed_store.save(processed_data={"case_id": "1", "text": "a"})
+    stat = processed_store.stat(case_id="1")
+    processed_store.save(processed_data={"case_id": "1", "text": "ab"})
+    assert processed_store.stat(case_id="1") != stat
+
+
+def test_stat_is_a_tuple(processed_store):
+    """Test that the state of a case is the same type for every backend."""
+    processed_store.save(processed_data={"case_id": "1"})
+    stat = processed_store.stat(case_id="1")
+    assert isinstance(stat, tuple) and len(stat) == 2
@@ -2,7 +2,8 @@
 
 
 import pytest
-from domsdatabasen.processor import Processor
+from domsdatabasen import processor as processor_module
+from domsdatabasen.processor import Processor, RawCaseReader
 
 
 @pytest.fixture(scope="module")
@@ -26,5 +27,25 @@ def test_tabular_data(processed_data, key):
     assert processed_data[key]
 
 
+@pytest.mark.parametrize(
+    "case_id, to_be_processed_expected",
+    [("1", True), ("0", False)],
+)
+def test_to_be_processed(processor, case_id, to_be_processed_expected):
+    """Test that only cases with raw data are sent to the worker pool."""
+    assert processor._to_be_processed(case_id) == to_be_processed_expected
+
+
+def test_worker_does_not_open_case_index(config, monkeypatch):
+    """Test that a worker process only builds what it needs to read cases."""
+
+    def fail(**kwargs):
+        raise AssertionError("The case index was opened by a worker")
+
+    monkeypatch.setattr(processor_module, "open_case_index", fail)
+    processor_module._init_worker(config=config, workers=1)
+    assert type(processor_module._worker_reader) is RawCaseReader
+
+
 if __name__ == "__main__":
     pytest.main([__file__ + "::test_tabular_data", "-s"])
@@ -0,0 +1,81 @@
+"""Test the timing of the stages of processing a case."""
+
+import builtins
+import json
+import sys
+import time
+
+from domsdatabasen._profiling import StageTimer, TraceExporter, peak_rss_mb
+
+
+def test_nested_stages_are_not_counted_twice():
+    """Test that the time of a nested stage is not counted for the outer stage."""
+    timer = StageTimer()
+    with timer.stage("box_detection"):
+        time.sleep(0.01)
+        with timer.stage("ocr", crops=2, pixels=100):
+            time.sleep(0.05)
+    with timer.stage("ocr", crops=1, pixels=50):
+        pass
+
+    stages = timer.summary()
+    assert list(stages) == ["box_detection", "ocr"]
+    assert stages["box_detection"]["calls"] == 1
+    assert stages["box_detection"]["seconds"] < 0.05
+    assert stages["ocr"]["seconds"] >= 0.05
+    assert stages["ocr"]["calls"] == 2
+    assert stages["ocr"]["crops"] == 3
+    assert stages["ocr"]["pixels"] == 150
+
+    timer.merge(stages=stages)
+    assert timer.summary()["ocr"]["calls"] == 4
+
+    timer.reset()
+    assert timer.summary() == {}
+
+
+def test_export_jsonl(tmp_path):
+    """Test that the process info of each case is appended to the trace."""
+    path = tmp_path / "trace.jsonl"
+    exporter = TraceExporter(export_format="jsonl", path=path)
+    process_info = {"peak_rss_mb": 10.0, "stages": {"ocr": {"seconds": 1.0}}}
+    exporter.export(case_id="1", process_info=process_info)
+    exporter.export(case_id="2", process_info=process_info)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["case_id"] for record in records] == ["1", "2"]
+    assert records[0]["stages"] == process_info["stages"]
+
+
+def test_export_prometheus(tmp_path):
+    """Test that the Prometheus text file has the totals of the run."""
+    path = tmp_path / "process.prom"
+    exporter = TraceExporter(export_format="prometheus", path=path)
+    for _ in range(2):
+        exporter.export(
+            case_id="1",
+            process_info={
+                "peak_rss_mb": 10.0,
+                "stages": {"ocr": {"seconds": 1.5, "calls": 2, "crops": 3}},
+            },
+        )
+
+    lines = path.read_text().splitlines()
+    assert "domsdatabasen_process_cases_total 2" in lines
+    assert 'domsdatabasen_process_stage_seconds_total{stage="ocr"} 3.0' in lines
+    assert 'domsdatabasen_process_stage_crops_total{stage="ocr"} 6' in lines
+
+
+def test_peak_rss_without_proc_or_resource(monkeypatch):
+    """Test that the peak RSS is 0 where neither /proc nor `resource` exists."""
+
+    def open_without_proc(file, *args, **kwargs):
+        if str(file).startswith("/proc/"):
+            raise FileNotFoundError(file)
+        return open_(file, *args, **kwargs)
+
+    open_ = builtins.open
+    monkeypatch.setattr(builtins, "open", open_without_proc)
+    # Importing a module set to None in `sys.modules` raises ImportError.
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert peak_rss_mb() == 0.0
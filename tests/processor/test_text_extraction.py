@@ -3,8 +3,12 @@
 import cv2
 import numpy as np
 import pytest
-from domsdatabasen._text_extraction import PDFTextReader
+from img2table.document import Image as TableImage
 from PIL import Image
+from pypdf import PdfReader, PdfWriter
+
+import domsdatabasen._text_extraction as text_extraction
+from domsdatabasen._text_extraction import PDFTextReader
 
 
 def read_image(image_path):
@@ -42,6 +46,35 @@ def test_extract_text(pdf_text_reader, pdf_path, expected_text):
     assert text == expected_text
 
 
+@pytest.mark.parametrize(
+    "pdf_path, page_numbers",
+    [
+        ("tests/data/processor/no_anonymization.pdf", [1]),
+        ("tests/data/processor/underlines.pdf", [1]),
+    ],
+)
+def test_get_images(pdf_text_reader, pdf_path, page_numbers):
+    """Test that every page is rasterized lazily to a grayscale image."""
+    images = pdf_text_reader._get_images(pdf_path=pdf_path, page_numbers=page_numbers)
+    assert not isinstance(images, list)
+    images = list(images)
+    assert len(images) == len(page_numbers)
+    assert all(image.ndim == 2 for image in images)
+
+
+@pytest.mark.parametrize(
+    "pdf_path, clean_expected",
+    [
+        ("tests/data/processor/no_anonymization.pdf", True),
+        ("tests/data/processor/underlines.pdf", False),
+    ],
+)
+def test_page_is_clean(pdf_text_reader, pdf_path, clean_expected):
+    """Test that pages without anonymization are found from the PDF content."""
+    page = PdfReader(pdf_path).pages[0]
+    assert pdf_text_reader._page_is_clean(page=page) == clean_expected
+
+
 @pytest.mark.parametrize(
     "image_path, n_blobs_expected",
     [("tests/data/processor/blobs.png", 4)],
@@ -216,6 +249,74 @@ def test_read_text_from_anonymized_box(
     assert anonymized_box["text"] == text_expected
 
 
+def test_batched_ocr_is_same_as_unbatched(pdf_text_reader, monkeypatch):
+    """Test that crops read in batches give the same text as crops read one by one."""
+    image = cv2.bitwise_not(read_image("tests/data/processor/get_text_from_box_7.png"))
+    # The first two crops have the same shape, and are read in the same batch.
+    crops = [
+        image[3016:3065, 1063:1159],
+        image[3016:3065, 389:485],
+        image[3016:3065, 389:641],
+    ]
+
+    def read_texts(batch_size):
+        monkeypatch.setattr(
+            pdf_text_reader.config.process, "ocr_batch_size", batch_size
+        )
+        results = pdf_text_reader._detect_and_recognize_batch(crops=crops)
+        return [[text for _, text, _ in result] for result in results]
+
+    texts_unbatched = read_texts(batch_size=1)
+    assert any(texts_unbatched)
+    assert read_texts(batch_size=16) == texts_unbatched
+
+
+def test_recognize_crops_falls_back_to_detection(pdf_text_reader, monkeypatch):
+    """Test that crops the recognizer fails to read are read with detection."""
+
+    class FakeReader:
+        """Easyocr reader, reading the pixel value of the crops."""
+
+        def __init__(self):
+            """Initializes the reader."""
+            self.detected = []
+
+        def recognize(self, image):
+            """Recognizes text, failing on crops with pixel value 0."""
+            value = image[0, 0]
+            if value == 0:
+                raise RuntimeError("Recognizer failed")
+            confidence = 0.1 if value == 1 else 0.9
+            return [([[0, 0]], f"recognized {value}", confidence)]
+
+        def readtext(self, image):
+            """Detects and recognizes text."""
+            value = image[0, 0]
+            self.detected.append(value)
+            return [([[0, 0]], f"detected {value}", 0.9)]
+
+        def readtext_batched(self, images):
+            """Detects and recognizes text in images of the same size."""
+            return [self.readtext(image) for image in images]
+
+    reader = FakeReader()
+    monkeypatch.setattr(pdf_text_reader, "reader", reader)
+    monkeypatch.setattr(pdf_text_reader.config.process, "ocr_recognition_only", True)
+    monkeypatch.setattr(
+        pdf_text_reader.config.process, "ocr_recognition_only_confidence_min", 0.5
+    )
+    crops = [np.full((10, 20), value, dtype=np.uint8) for value in (0, 1, 2)]
+
+    results = pdf_text_reader._readtext_batch(crops=crops)
+
+    assert [result[0][1] for result in results] == [
+        "detected 0",
+        "detected 1",
+        "recognized 2",
+    ]
+    assert reader.detected == [0, 1]
+
+
 @pytest.mark.parametrize(
     "image_path, n_matches_expected",
     [
@@ -368,6 +469,38 @@ def test_find_tables(
         assert all(text in table["text"] for text in texts_in_table_expected)
 
 
+@pytest.mark.parametrize(
+    "image_path, invert",
+    [
+        ("tests/data/processor/image_processed_find_tables_1.png", True),
+        ("tests/data/processor/page_with_table_1.png", False),
+    ],
+)
+def test_find_tables_in_memory_same_as_png(
+    pdf_text_reader, tmp_path, image_path, invert
+):
+    """Test that tables found in the in-memory image are the same as in a PNG."""
+    image = read_image(image_path)
+    if invert:
+        image = cv2.bitwise_not(image)
+    png_path = tmp_path / "image.png"
+    cv2.imwrite(str(png_path), image)
+    tables_png = TableImage(src=str(png_path), detect_rotation=False).extract_tables()
+    tables = pdf_text_reader._find_tables(image=image)
+
+    def layout(tables):
+        return [
+            (
+                table.bbox,
+                [[cell.bbox for cell in row] for row in table.content.values()],
+            )
+            for table in tables
+        ]
+
+    assert tables_png
+    assert layout(tables) == layout(tables_png)
+
+
 @pytest.mark.parametrize(
     "image_path, rows_to_split_expected",
     [
@@ -384,5 +517,94 @@ def test_get_row_indices_to_split(pdf_text_reader, image_path, rows_to_split_exp
     assert rows_to_split == rows_to_split_expected
 
 
+def test_read_pages_parallel_same_as_sequential(pdf_text_reader, monkeypatch, tmp_path):
+    """Test that pages read in parallel are the same as pages read one by one."""
+    pdf_writer = PdfWriter()
+    for _ in range(6):
+        pdf_writer.add_blank_page(width=100, height=100)
+    pdf_path = tmp_path / "case.pdf"
+    pdf_writer.write(pdf_path)
+
+    def read_page(
+        image, page_idx, pdf_reader, box_anonymization, underline_anonymization
+    ):
+        # The third page shows that underlines are used, which ends the first
+        # pages read before the rest of the pages are sent to the page workers.
+        box_anonymization = box_anonymization and page_idx != 2
+        text = f"{image[0, 0]} {box_anonymization} {underline_anonymization}"
+        page = {"text": text, "extraction_method": "easyocr"}
+        return page, [], box_anonymization, underline_anonymization
+
+    class InProcessPool:
+        """Pool of page workers reading the pages in this process."""
+
+        def __init__(self):
+            """Initializes the pool."""
+            self.page_indices = []
+
+        def imap(self, function, tasks):
+            """Reads pages in order, as `Pool.imap`."""
+            for task in tasks:
+                self.page_indices.append(task[1])
+                yield function(task)
+
+    pool = InProcessPool()
+    monkeypatch.setattr(text_extraction, "_worker_reader", pdf_text_reader)
+    monkeypatch.setattr(pdf_text_reader, "_get_page_pool", lambda: pool)
+    monkeypatch.setattr(pdf_text_reader, "_read_page", read_page)
+    monkeypatch.setattr(pdf_text_reader, "_read_text_with_tika_timed", lambda **_: "")
+    monkeypatch.setattr(pdf_text_reader, "_clean_pages", lambda **_: {1})
+    monkeypatch.setattr(
+        pdf_text_reader,
+        "_get_image",
+        lambda pdf_path, page_number: np.full((1, 1), page_number, dtype=np.uint8),
+    )
+    monkeypatch.setattr(
+        pdf_text_reader,
+        "_get_images",
+        lambda pdf_path, page_numbers: (
+            np.full((1, 1), page_number, dtype=np.uint8) for page_number in page_numbers
+        ),
+    )
+    monkeypatch.setattr(pdf_text_reader.config.process, "page_number", False)
+    monkeypatch.setattr(
+        pdf_text_reader.config.process, "pages_to_determine_anonymization", 3
+    )
+
+    monkeypatch.setattr(pdf_text_reader.config.process, "page_workers", 1)
+    pages_sequential = pdf_text_reader.extract_text(pdf_path=pdf_path)["pages"]
+    monkeypatch.setattr(pdf_text_reader.config.process, "page_workers", 2)
+    pages_parallel = pdf_text_reader.extract_text(pdf_path=pdf_path)["pages"]
+
+    # Pages 1 and 3 are read before the anonymization method is known,
+    # page 2 is clean, and the rest are read by the page workers.
+    assert pool.page_indices == [3, 4, 5]
+    assert list(pages_parallel) == ["1", "2", "3", "4", "5", "6"]
+    assert list(pages_parallel.items()) == list(pages_sequential.items())
+
+
+@pytest.mark.parametrize("server_starts", [True, False])
+def test_start_tika_server(pdf_text_reader, monkeypatch, server_starts):
+    """Test that the tika client only skips its server checks if the server runs."""
+
+    class FakeTikaClient:
+        """Tika client, where starting the server can fail."""
+
+        TikaClientOnly = False
+
+        @staticmethod
+        def checkTikaServer(scheme, serverHost, port):
+            """Starts the Tika server."""
+            if not server_starts:
+                raise RuntimeError("Unable to start Tika server")
+
+    monkeypatch.setattr(text_extraction, "tika_client", FakeTikaClient)
+
+    started = pdf_text_reader._start_tika_server(client_only=False)
+
+    assert started == server_starts
+    assert FakeTikaClient.TikaClientOnly == server_starts
+
+
 if __name__ == "__main__":
     pytest.main([__file__ + "::test_find_anonymized_boxes", "-s"])
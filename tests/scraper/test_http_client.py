@@ -0,0 +1,277 @@
+"""Test scraping cases from the JSON and PDF endpoints of the site."""
+
+import copy
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from hydra import compose
+
+from domsdatabasen._exceptions import HTTPScrapeException
+from domsdatabasen._http_client import HTTPCaseClient
+from domsdatabasen.scraper import Scraper
+
+CASE_JSON = Path("tests/data/scraper/case.json").read_bytes()
+CASE_PDF = Path("tests/data/processor/no_anonymization.pdf").read_bytes()
+
+# Responses of the stub server, by path.
+RESPONSES = {
+    "/case/1": (200, "application/json", CASE_JSON),
+    "/case/1/pdf": (200, "application/pdf", CASE_PDF),
+    "/case/2": (200, "application/json", CASE_JSON),
+    "/case/2/pdf": (403, "text/html", b"Sagen er ikke tilgaengelig"),
+    "/case/3": (200, "text/html", b"<html></html>"),
+    "/case/5": (200, "application/json", CASE_JSON),
+    "/case/5/pdf": (200, "application/pdf", CASE_PDF),
+    "/case/10": (200, "application/json", CASE_JSON),
+    "/case/10/pdf": (200, "application/pdf", CASE_PDF),
+    "/case/11": (200, "application/json", CASE_JSON),
+    "/case/11/pdf": (200, "application/pdf", CASE_PDF),
+    "/case/13": (200, "application/json", CASE_JSON),
+    "/case/16": (200, "application/json", CASE_JSON),
+    "/cases": (200, "application/json", b'[{"id": 21}, {"id": 20}, {"id": 8}]'),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the recorded responses, and 404 for all other paths."""
+
+    def do_GET(self):
+        """Serve a response."""
+        status, content_type, body = RESPONSES.get(
+            self.path, (404, "text/html", b"Fejlkode 404")
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Do not log requests."""
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    """Return the URL of a stub server of the site."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture(scope="module")
+def http_config(stub_server):
+    """Return a config for scraping the stub server over HTTP."""
+    return compose(
+        config_name="config",
+        overrides=[
+            "testing=True",
+            "scrape.backend=http",
+            f"scrape.http.base_url={stub_server}",
+            "scrape.http.case_path='/case/{case_id}'",
+            "scrape.http.pdf_path='/case/{case_id}/pdf'",
+            "scrape.http.retries=0",
+            "scrape.paths.download_dir=download_tmp_http/",
+        ],
+    )
+
+
+@pytest.fixture(scope="module")
+def http_client(http_config):
+    """Return an HTTPCaseClient for the stub server."""
+    return HTTPCaseClient(config=http_config)
+
+
+def test_tabular_data(http_client):
+    """Test that the tabular data has the same keys as when scraped in a browser."""
+    case = http_client.get_case(case_id="1")
+    tabular_data = http_client.tabular_data(case=case)
+    assert tabular_data["Rettens sagsnummer"] == "BS-19699/2020-VLR"
+    assert tabular_data["Sagsemner"] == "Skatteret, Indkomstskat"
+    assert tabular_data["Særlige retsskridt"] == ""
+    assert tabular_data["Dørlukning"] == "Nej"
+    assert tabular_data["Dato"] == "18-08-2021"
+
+
+def test_download_pdf(http_client, tmp_path):
+    """Test that the PDF document is downloaded."""
+    pdf_path = tmp_path / "1" / "document.pdf"
+    assert http_client.download_pdf(case_id="1", pdf_path=pdf_path)
+    assert pdf_path.read_bytes() == CASE_PDF
+
+
+def test_case_not_accessible(http_client, tmp_path):
+    """Test that no PDF document is saved for a case that is not accessible."""
+    pdf_path = tmp_path / "2" / "document.pdf"
+    assert not http_client.download_pdf(case_id="2", pdf_path=pdf_path)
+    assert not pdf_path.parent.exists()
+
+
+def test_nonexistent_case(http_client):
+    """Test that a case that does not exist is None."""
+    assert http_client.get_case(case_id="4") is None
+
+
+def test_unexpected_response(http_client):
+    """Test that an unexpected response raises an exception."""
+    with pytest.raises(HTTPScrapeException):
+        http_client.get_case(case_id="3")
+    with pytest.raises(HTTPScrapeException):
+        http_client.tabular_data(case={})
+
+
+def test_scrape_without_browser(http_config):
+    """Test that the Scraper saves a case read over HTTP without a browser."""
+    scraper = Scraper(config=http_config)
+    assert scraper.scrape(case_id="1")
+    assert not scraper.scrape(case_id="4")
+    assert scraper._driver is None
+
+    case_dir = scraper.test_dir / "1"
+    assert (case_dir / http_config.file_names.pdf_document).exists()
+    assert (case_dir / http_config.file_names.tabular_data).exists()
+    assert scraper.case_index.is_scraped(case_id="1")
+
+
+def test_sync_case_index_scrapes_missing_raw_data_again(http_config):
+    """Test that a case whose files are gone is scraped again after a sync."""
+    config = copy.deepcopy(http_config)
+    config.scrape.force = False
+    config.sync_case_index = True
+    assert Scraper(config=config).scrape(case_id="1")
+    scraper = Scraper(config=config)
+    pdf_path = scraper.test_dir / "1" / config.file_names.pdf_document
+    pdf_path.unlink()
+
+    # The case index is trusted when scraping, until it is synced.
+    assert scraper.scrape(case_id="1")
+    assert not pdf_path.exists()
+    assert Scraper(config=config).scrape(case_id="1")
+    assert pdf_path.exists()
+
+
+def test_scrape_with_async_downloads(http_config):
+    """Test that a case is saved when its PDF has been downloaded in the background."""
+    config = copy.deepcopy(http_config)
+    config.scrape.async_downloads = True
+    config.scrape.http.verified = True
+    scraper = Scraper(config=config)
+    assert scraper.scrape(case_id="5")
+    assert scraper.scrape(case_id="2")
+    assert scraper.downloader is not None
+    scraper.wait_for_downloads()
+
+    case_dir = scraper.test_dir / "5"
+    assert (case_dir / config.file_names.pdf_document).exists()
+    assert (case_dir / config.file_names.tabular_data).exists()
+    assert scraper.case_index.is_scraped(case_id="5")
+    assert not scraper.case_index.is_scraped(case_id="2")
+
+
+def test_no_async_downloads_unless_verified(http_config):
+    """Test that PDFs are not downloaded in the background from unverified endpoints."""
+    config = copy.deepcopy(http_config)
+    config.scrape.async_downloads = True
+    assert Scraper(config=config).downloader is None
+    config.scrape.backend = "selenium"
+    config.scrape.http.verified = True
+    assert Scraper(config=config).downloader is None
+
+
+def test_discover_case_ids_by_probing(http_config):
+    """Test that the highest case ID is found, and that missing IDs are recorded."""
+    config = copy.deepcopy(http_config)
+    config.scrape.probe_window = 3
+    config.scrape.rate_limit = 0
+    scraper = Scraper(config=config)
+    assert scraper._discover_case_ids(start_case_id=10) == [10, 11, 13, 14, 16]
+    # Case IDs above the highest scraped case might still be given to a case.
+    assert not scraper.case_index.is_missing(case_id="12")
+
+
+def test_new_cases_in_probed_gaps_are_found(http_config, tmp_path, monkeypatch):
+    """Test that case IDs probed as missing are found when cases get them later."""
+    config = copy.deepcopy(http_config)
+    config.scrape.paths.test_dir = str(tmp_path)
+    config.scrape.discovery = "probe"
+    config.scrape.incremental = True
+    config.scrape.start_case_id = None
+    config.scrape.probe_window = 3
+    config.scrape.rate_limit = 0
+    responses = {}
+    monkeypatch.setattr(f"{__name__}.RESPONSES", responses)
+
+    def publish(case_ids):
+        for case_id in case_ids:
+            responses[f"/case/{case_id}"] = (200, "application/json", CASE_JSON)
+            responses[f"/case/{case_id}/pdf"] = (200, "application/pdf", CASE_PDF)
+
+    # The same scraper is used for both runs, as the case index is kept in
+    # memory when testing.
+    scraper = Scraper(config=config)
+    publish(["1", "2"])
+    scraper.scrape_all()
+    assert scraper.case_index.scraped_case_ids() == ["1", "2"]
+
+    # Cases are published with the case IDs probed as missing in the first run.
+    publish(["3", "4", "5"])
+    scraper.scrape_all()
+    assert scraper.case_index.scraped_case_ids() == ["1", "2", "3", "4", "5"]
+
+
+def test_discover_case_ids_from_list(http_config):
+    """Test that the case IDs are read from the list of cases, if there is one."""
+    config = copy.deepcopy(http_config)
+    config.scrape.http.list_path = "/cases"
+    assert HTTPCaseClient(config=config).list_case_ids() == [8, 20, 21]
+    scraper = Scraper(config=config)
+    assert scraper._discover_case_ids(start_case_id=10) == [20, 21]
+
+
+def test_scrape_all_with_sessions(http_config, tmp_path):
+    """Test that parallel sessions save their cases to the shared case index."""
+    config = copy.deepcopy(http_config)
+    config.scrape.paths.test_dir = str(tmp_path)
+    config.scrape.start_case_id = "10"
+    config.scrape.workers = 2
+    config.scrape.max_consecutive_nonexistent_page_count = 2
+    config.scrape.rate_limit = 0
+    scraper = Scraper(config=config)
+    scraper.scrape_all()
+
+    assert scraper.case_index.scraped_case_ids() == ["10", "11"]
+    case_ids, _ = scraper.change_feed.read(consumer="test")
+    assert case_ids == ["10", "11"]
+    # The download directories of the sessions are removed with the sessions.
+    download_dir = scraper.download_dir
+    assert not list(download_dir.parent.glob(f"{download_dir.name}_*"))
+
+
+def test_incremental_scrape(http_config, tmp_path, monkeypatch):
+    """Test that only new and changed cases are scraped and added to the feed."""
+    config = copy.deepcopy(http_config)
+    config.scrape.paths.test_dir = str(tmp_path)
+    config.scrape.incremental = True
+    config.scrape.recheck_scraped = True
+    config.scrape.max_consecutive_nonexistent_page_count = 2
+    config.scrape.rate_limit = 0
+    scraper = Scraper(config=config)
+    assert scraper.scrape(case_id="10")
+    scraper.scrape_all()
+    assert scraper.case_index.scraped_case_ids() == ["10", "11"]
+    case_ids, offset = scraper.change_feed.read(consumer="test")
+    assert case_ids == ["10", "11"]
+    scraper.change_feed.commit(consumer="test", offset=offset)
+
+    case = json.loads(CASE_JSON)
+    case["headline"] = "Ny overskrift"
+    monkeypatch.setitem(
+        RESPONSES, "/case/10", (200, "application/json", json.dumps(case).encode())
+    )
+    scraper.scrape_all()
+    case_ids, _ = scraper.change_feed.read(consumer="test")
+    assert case_ids == ["10"]
@@ -0,0 +1,36 @@
+"""Test the rate limit shared by browser sessions."""
+
+import threading
+import time
+
+from domsdatabasen._rate_limit import RateLimiter
+
+
+def test_rate_limit_across_threads():
+    """Test that requests from multiple threads are spaced out."""
+    rate_limiter = RateLimiter(rate=50)
+    times = []
+
+    def send_requests():
+        for _ in range(5):
+            rate_limiter.wait()
+            times.append(time.monotonic())
+
+    threads = [threading.Thread(target=send_requests) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    times.sort()
+    assert len(times) == 15
+    assert times[-1] - times[0] >= 14 * rate_limiter.interval * 0.9
+
+
+def test_no_rate_limit():
+    """Test that no rate limit does not wait."""
+    rate_limiter = RateLimiter(rate=None)
+    start = time.monotonic()
+    for _ in range(100):
+        rate_limiter.wait()
+    assert time.monotonic() - start < 0.1
@@ -1,9 +1,16 @@
 """Test the scraper module."""
 
+import copy
+import os
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
+from domsdatabasen._xpaths import XPATHS, XPATHS_TABULAR_DATA
+from domsdatabasen.scraper import Scraper
+
 
 @pytest.fixture(scope="module")
 def test_case_path(config):
@@ -21,5 +28,66 @@ def test_case_contains_tabular_data(config, test_case_path):
     assert (test_case_path / config.file_names.tabular_data).exists()
 
 
+def test_wait_download(scraper):
+    """Test that a download is only returned when it is complete."""
+    files_before = set(os.listdir(scraper.download_dir))
+    partial_path = scraper.download_dir / "document.pdf.crdownload"
+
+    def download():
+        partial_path.write_bytes(b"%PDF")
+        time.sleep(0.2)
+        partial_path.rename(scraper.download_dir / "document.pdf")
+
+    thread = threading.Thread(target=download)
+    thread.start()
+    file_name = scraper._wait_download(files_before=files_before)
+    thread.join()
+    assert file_name == "document.pdf"
+    (scraper.download_dir / file_name).unlink()
+
+
+class FakeElement:
+    """Element of a page, with the text it shows."""
+
+    def __init__(self, text: str, displayed: bool) -> None:
+        """Initializes the FakeElement."""
+        self.text = text
+        self.displayed = displayed
+
+    def click(self) -> None:
+        """Clicks the element, which does nothing."""
+
+    def is_displayed(self) -> bool:
+        """Checks if the element is shown."""
+        return self.displayed
+
+
+class FakeDriver:
+    """Driver of a case page, on which 'Øvrige sagsoplysninger' never expands."""
+
+    def find_element(self, by: str, xpath: str) -> FakeElement:
+        """Finds an element of the page. Only the title and the date have text."""
+        if xpath == XPATHS["Dato"]:
+            return FakeElement(text="Dom afsagt 01-02-2023", displayed=True)
+        if xpath == XPATHS_TABULAR_DATA["Overskrift"]:
+            return FakeElement(text=" Sag om arv ", displayed=True)
+        return FakeElement(text="", displayed=False)
+
+    def quit(self) -> None:
+        """Closes the browser, which does nothing."""
+
+
+def test_get_tabular_data_of_section_not_expanded(config):
+    """Test that the tabular data is read, even if the fields are not shown."""
+    config = copy.deepcopy(config)
+    config.scrape.sleep = 0.1
+    scraper = Scraper(config=config)
+    scraper._driver = FakeDriver()
+    tabular_data = scraper._get_tabular_data()
+    assert tabular_data["Overskrift"] == "Sag om arv"
+    assert tabular_data["Sagskomplekser"] == ""
+    assert tabular_data["Dato"] == "01-02-2023"
+
+
 if __name__ == "__main__":
     pytest.main([f"{__file__}::test_case_contains_pdf", "-s"])